@@ -0,0 +1,46 @@
+from django import forms
+from django.utils.translation import gettext_lazy as _
+
+
+class ExportForm(forms.Form):
+    start = forms.DateField(
+        required=False,
+        label=_('Start date'),
+    )
+    end = forms.DateField(
+        required=False,
+        label=_('End date'),
+    )
+    after = forms.IntegerField(
+        required=False,
+        min_value=0,
+        label=_('After ID'),
+    )
+    limit = forms.IntegerField(
+        required=False,
+        min_value=1,
+        label=_('Limit'),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        if any(self.errors):
+            return cleaned_data
+
+        start = cleaned_data['start']
+        end = cleaned_data['end']
+
+        if start and end and start > end:
+            self.add_error(
+                'start',
+                forms.ValidationError(
+                    _('This value must be less than or equal to %(end)s'),
+                    code='invalid',
+                    params={
+                        'end': end,
+                    },
+                ),
+            )
+
+        return cleaned_data
@@ -1,3 +1,139 @@
+import json
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
 from django.test import TestCase
+from django.urls import reverse, reverse_lazy
+
+from employee.models import Employee, Employment
+from schedule.models import ProjectAssignment
+from schedule.tests import ScheduleMixin
 
 # Create your tests here.
+
+
+class EmploymentListEmployeeTest(ScheduleMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_user('user')
+        cls.employee = Employee.objects_plain.get()
+        # Должность, которую сотрудник не занимает
+        cls.employments[1].count = 0
+        cls.employments[1].save()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get_url(self, pk):
+        return reverse('api:employee:employment:list', kwargs={'pk': pk})
+
+    def test_data(self):
+        """Занимаемые должности сотрудника с наименованием,
+        совпадающим с наименованием модели.
+        """
+        response = self.client.get(self.get_url(self.employee.pk))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {'id': employment.pk, 'label': str(employment)}
+            for employment in Employment.objects.filter(
+                pk__in=(self.employments[0].pk, self.employments[2].pk),
+            ).order_by('number')
+        ])
+
+    def test_not_modified(self):
+        """Запрос с ETag неизмененных данных получает ответ 304,
+        после изменения данных - новые данные.
+        """
+        url = self.get_url(self.employee.pk)
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+
+        self.employments[0].number = 'N10'
+        self.employments[0].save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_found(self):
+        response = self.client.get(self.get_url(self.employee.pk + 1))
+        self.assertEqual(response.status_code, 404)
+
+        # Сотрудник без занимаемых должностей
+        employee = Employee.objects.create(last_name='Other', first_name='Other')
+        response = self.client.get(self.get_url(employee.pk))
+        self.assertEqual(response.json(), [])
+
+
+class ProjectAssignmentBulkUpsertTest(ScheduleMixin, TestCase):
+    url = reverse_lazy('api:schedule:projectassignment:bulk')
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_user('user')
+        cls.user.user_permissions.add(*Permission.objects.filter(
+            codename__in=('add_projectassignment', 'change_projectassignment'),
+        ))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post(self, data, **params):
+        return self.client.post(
+            '{}?{}'.format(self.url, urlencode(params)),
+            data=json.dumps(data),
+            content_type='application/json',
+        )
+
+    def test_upsert(self):
+        self.create_assignment(self.employments[0], self.weeks[0], P0=10)
+
+        response = self.post([
+            {'employment': 'N0', 'week': str(self.weeks[0]), 'project': 'P0', 'hours': 12},
+            {'employment': 'N0', 'week': str(self.weeks[0]), 'project': 'P1', 'hours': 8},
+            {'employment': 'N0', 'week': str(self.weeks[0]), 'project': 'P1', 'hours': 9},
+            {'employment': 'N1', 'week': str(self.weeks[1]), 'project': 'P1', 'hours': 40},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['created'], data['updated']), (1, 1))
+        # Повторяющаяся строка и превышение часов (ставка 0.5)
+        self.assertEqual([error['row'] for error in data['errors']], [3, 4])
+
+        response = self.post([
+            {'employment': 'N1', 'week': str(self.weeks[1]), 'project': 'P1', 'hours': 40},
+        ], check_hours=0)
+        self.assertEqual(response.json()['created'], 1)
+
+    def test_invalid_body(self):
+        for body in ('{', '{}', '[1]'):
+            response = self.client.post(
+                self.url, data=body, content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(ProjectAssignment.objects.exists())
+
+    def test_permission_denied(self):
+        """Пользователь без прав на добавление и изменение
+        назначений на проекты получает ответ 403.
+        """
+        self.user.user_permissions.remove(*Permission.objects.filter(
+            codename='change_projectassignment',
+        ))
+        # Права пользователя кэшируются в объекте
+        self.client.force_login(get_user_model().objects.get(pk=self.user.pk))
+
+        response = self.post([
+            {'employment': 'N0', 'week': str(self.weeks[0]), 'project': 'P0', 'hours': 1},
+        ])
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ProjectAssignment.objects.exists())
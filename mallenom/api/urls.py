@@ -1,3 +1,4 @@
+from django.contrib.auth.decorators import permission_required
 from django.urls import path, include
 
 from . import views
@@ -13,6 +14,35 @@ employee = [
     path('<int:pk>/employment/', include((employment, 'employment'))),
 ]
 
+report = [
+    path('bundle/', views.ReportBundle.as_view(), name='bundle'),
+]
+
+export = [
+    path('assignment/', views.AssignmentExport.as_view(), name='assignment'),
+    path('projectassignment/', views.ProjectAssignmentExport.as_view(), name='projectassignment'),
+    path('absence/', views.AbsenceExport.as_view(), name='absence'),
+    path('employment/', views.EmploymentExport.as_view(), name='employment'),
+]
+
+projectassignment = [
+    path(
+        'bulk/',
+        permission_required(
+            ('schedule.add_projectassignment', 'schedule.change_projectassignment'),
+            raise_exception=True,
+        )(views.ProjectAssignmentBulkUpsert.as_view()),
+        name='bulk',
+    ),
+]
+
+schedule = [
+    path('projectassignment/', include((projectassignment, 'projectassignment'))),
+]
+
 urlpatterns = [
     path('employee/', include((employee, 'employee'))),
+    path('reports/', include((report, 'report'))),
+    path('export/', include((export, 'export'))),
+    path('schedule/', include((schedule, 'schedule'))),
 ]
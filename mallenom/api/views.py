@@ -1,31 +1,229 @@
-from django.core import serializers
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    set_response_etag,
+)
+from django.utils.translation import gettext as _
 from django.views import View
 
 from employee.models import Employee, Employment
+from schedule.models import Assignment, ProjectAssignment, Absence
+from schedule.upsert import bulk_upsert
+from staffing.models import Staffing
+from reports.forms import ReportBundleForm
+from reports.models import ReportJob
+from reports.reports import ReportBuilder
+from reports.views import ReportBundleMixin
+
+from .forms import ExportForm
 
 # Create your views here.
 
 class EmploymentListEmployee(View):
+    def get_data(self, employee_pk):
+        """Возвращает список должностей сотрудника вида
+        [{'id': pk, 'label': название должности},...].
+        """
+        employments = Employment._base_manager.filter(
+            employee=employee_pk,
+            count__gt=0,
+        ).values_list(
+            'pk', 'number',
+            'staffing__position__name',
+            'staffing__department__name',
+        ).order_by('number')
+
+        return [
+            {
+                'id': pk,
+                'label': Employment.get_label(
+                    Staffing.get_label(position, department), number,
+                ),
+            } for pk, number, position, department in employments
+        ]
+
     def get(self, request, *args, **kwargs):
         """Возвращает response c JSON содержащим
         все записи о должностях сотрудника.
+
+        Ответ содержит ETag, при совпадении с переданным
+        в If-None-Match возвращается ответ 304 без данных.
         """
         employee_pk = kwargs.get('pk')
-        employee = get_object_or_404(
-            Employee,
-            pk=employee_pk,
+        data = self.get_data(employee_pk)
+        if not data and not Employee.objects_plain.filter(
+                pk=employee_pk,
+        ).exists():
+            raise Http404
+
+        response = JsonResponse(data, safe=False)
+        set_response_etag(response)
+        # Браузер проверяет актуальность данных при каждом запросе
+        patch_cache_control(response, private=True, no_cache=True)
+
+        return get_conditional_response(
+            request, etag=response['ETag'], response=response,
         )
-        employments = Employment.objects.filter(
-            employee=employee,
-            count__gt=0,
+
+
+class ProjectAssignmentBulkUpsert(View):
+    def post(self, request, *args, **kwargs):
+        """Добавляет или изменяет назначения на проекты
+        (см. schedule.upsert.bulk_upsert).
+
+        Тело запроса - JSON со списком строк вида
+        [{"employment": "табельный номер", "week": "YYYY-MM-DD",
+        "project": "название проекта", "hours": часы},...],
+        параметр запроса check_hours=0 отключает проверку часов.
+
+        Возвращает response c JSON, содержащим колличество
+        добавленных и измененных записей и ошибки по строкам.
+        """
+        try:
+            rows = json.loads(request.body.decode(request.encoding or 'utf-8'))
+        except (UnicodeDecodeError, ValueError) as error:
+            return JsonResponse({'errors': str(error)}, status=400)
+
+        if not isinstance(rows, list) or not all(
+                isinstance(row, dict) for row in rows
+        ):
+            return JsonResponse(
+                {'errors': _("List of objects expected")}, status=400,
+            )
+
+        created, updated, errors = bulk_upsert(
+            rows, check_hours=request.GET.get('check_hours') != '0',
         )
-        json_employments = serializers.serialize(
-            "json",
-            employments,
+
+        return JsonResponse({
+            'created': len(created),
+            'updated': len(updated),
+            'errors': [
+                {'row': row, 'error': error} for row, item, error in errors
+            ],
+        })
+
+
+class ReportBundle(ReportBundleMixin, View):
+    def post(self, request, *args, **kwargs):
+        """Возвращает response c архивом отчетов за период
+        (параметры запроса - поля ReportBundleForm) или
+        JSON с адресами задания на формирование архива.
+
+        Запрос может создать задание, поэтому
+        используется метод POST.
+        """
+        form = ReportBundleForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+
+        content = self.get_bundle(form)
+        if isinstance(content, ReportJob):
+            return JsonResponse({
+                'status_url': content.get_status_url(),
+                'download_url': content.get_download_url(),
+            }, status=202)
+
+        report = ReportBuilder(
+            form.cleaned_data['start'],
+            form.cleaned_data['end'],
         )
-        return HttpResponse(
-            json_employments,
-            content_type="application/json; encoding=utf-8",
+        return report.get_content_response(*content)
+
+
+class ExportView(View):
+    """Выгрузка записей модели в формате NDJSON
+    (одна запись JSON в каждой строке).
+
+    Записи упорядочены по id и выгружаются потоком, частями
+    по chunk_size записей, поэтому память не зависит от
+    колличества записей. Параметры запроса (см. ExportForm):
+        start, end - интервал дат (записи, пересекающиеся с ним)
+        after - выгружать записи с id больше заданного
+            (следующая страница начинается после последнего
+            полученного id)
+        limit - максимальное колличество записей
+    """
+
+    model = None
+    # Поля записи (аргументы values())
+    fields = ()
+    expressions = {}
+    # Поля начала и конца интервала дат записи
+    start_field = None
+    end_field = None
+
+    chunk_size = 2000
+
+    def get_queryset(self, start=None, end=None, after=None, limit=None):
+        queryset = self.model._base_manager.values(
+            *self.fields, **self.expressions,
+        ).order_by('pk')
+
+        if start is not None and self.end_field:
+            queryset = queryset.filter(**{
+                '{}__gte'.format(self.end_field): start,
+            })
+        if end is not None and self.start_field:
+            queryset = queryset.filter(**{
+                '{}__lte'.format(self.start_field): end,
+            })
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        if limit is not None:
+            queryset = queryset[:limit]
+
+        return queryset
+
+    def get_lines(self, queryset):
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for item in queryset.iterator(chunk_size=self.chunk_size):
+            yield encoder.encode(item) + '\n'
+
+    def get(self, request, *args, **kwargs):
+        form = ExportForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+
+        queryset = self.get_queryset(**form.cleaned_data)
+
+        return StreamingHttpResponse(
+            self.get_lines(queryset),
+            content_type='application/x-ndjson; charset=utf-8',
         )
+
+
+class AssignmentExport(ExportView):
+    model = Assignment
+    fields = ('id', 'employment', 'start', 'end')
+    start_field = 'start'
+    end_field = 'end'
+
+
+class ProjectAssignmentExport(ExportView):
+    model = ProjectAssignment
+    fields = ('id', 'assignment', 'project', 'hours')
+    expressions = {
+        'employment': F('assignment__employment'),
+        'start': F('assignment__start'),
+        'end': F('assignment__end'),
+    }
+    start_field = 'assignment__start'
+    end_field = 'assignment__end'
+
+
+class AbsenceExport(ExportView):
+    model = Absence
+    fields = ('id', 'employment', 'start', 'end', 'hours', 'reason')
+    start_field = 'start'
+    end_field = 'end'
+
+
+class EmploymentExport(ExportView):
+    model = Employment
+    fields = ('id', 'number', 'employee', 'staffing', 'count')
@@ -0,0 +1,101 @@
+import datetime
+
+from django import forms
+from django.db import models
+from django.http.request import QueryDict
+from django.utils.translation import gettext_lazy as _
+
+import django_filters as filters
+from django_filters.constants import EMPTY_VALUES
+
+
+def get_period(value):
+    """Преобразует строку вида [MM/]YYYY в интервал дат.
+
+    Args:
+        value - строка с месяцем и годом или только годом
+
+    Returns:
+        tuple вида (начало, конец), конец не входит в интервал
+
+    Raises:
+        ValueError, OverflowError - строка не соответствует формату
+    """
+    # Разделяем строку фильтра [MM/]YYYY на месяц и год
+    values = list(map(int, value.split('/')))
+    if len(values) == 1:
+        # Задано только одно значение - значит это год
+        values.insert(0, None)
+    month, year = values
+
+    if not month:
+        return datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+
+    start = datetime.date(year, month, 1)
+    if month == 12:
+        return start, datetime.date(year + 1, 1, 1)
+    return start, datetime.date(year, month + 1, 1)
+
+
+class PeriodFilter(filters.CharFilter):
+    """Фильтр по месяцу или году ([MM/]YYYY).
+
+    Выбирает записи, которые начинаются или заканчиваются
+    в заданном периоде. Период преобразуется в интервалы дат
+    полей начала и конца, поэтому запрос может использовать
+    индексы этих полей (в отличие от выделения месяца и года
+    из даты).
+    """
+
+    def __init__(self, *args, start_field='start', end_field='end', **kwargs):
+        """
+        Kwargs:
+            start_field - поле начала записи
+            end_field - поле конца записи
+        """
+        kwargs.setdefault('label', _('Month/Year'))
+        kwargs.setdefault('widget', forms.TextInput(
+            attrs={'placeholder': _('[MM/]YYYY')},
+        ))
+        super().__init__(*args, **kwargs)
+
+        self.start_field = start_field
+        self.end_field = end_field
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+
+        try:
+            start, end = get_period(value)
+        except (ValueError, OverflowError):
+            return qs.none()
+
+        return qs.filter(
+            models.Q(**{
+                '{}__gte'.format(self.start_field): start,
+                '{}__lt'.format(self.start_field): end,
+            }) |
+            models.Q(**{
+                '{}__gte'.format(self.end_field): start,
+                '{}__lt'.format(self.end_field): end,
+            })
+        )
+
+
+class PeriodFilterSetMixin:
+    """Задает фильтр по текущему месяцу,
+    если фильтры не заданы.
+    """
+    period_filter = 'year_month'
+
+    def __init__(self, data=None, *args, **kwargs):
+        if data is None:
+            today = datetime.date.today()
+            data = QueryDict("{}={}/{}".format(
+                self.period_filter,
+                today.month,
+                today.year,
+            ))
+
+        super().__init__(data, *args, **kwargs)
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Отправляется менеджерами моделей после массового изменения
+# данных (bulk_create, bulk_update, update), для которых
+# не отправляются сигналы post_save и post_delete.
+# sender - класс модели
+bulk_changed = Signal()
@@ -0,0 +1,42 @@
+from django.db.models import QuerySet, Sum
+
+
+class TotalsTableMixin:
+    """Вычисляет итоги столбцов таблицы (для footer).
+
+    Итоги по всем полям из totals вычисляются одним запросом
+    к БД по всем записям таблицы (с учетом фильтров, но без
+    учета разбиения на страницы) при первом обращении.
+    """
+    totals = ()
+
+    def get_total(self, field):
+        """Возвращает сумму значений поля по всем записям таблицы.
+
+        Args:
+            field - поле из totals
+
+        Returns:
+            сумма значений
+        """
+        if getattr(self, '_totals', None) is None:
+            self._totals = self._get_totals()
+        return self._totals[field]
+
+    def _get_totals(self):
+        data = self.data.data
+
+        if isinstance(data, QuerySet):
+            totals = data.order_by().aggregate(**{
+                # Имена агрегатов не должны совпадать с полями
+                'total_{}'.format(field): Sum(field) for field in self.totals
+            })
+            return {
+                field: totals['total_{}'.format(field)] or 0
+                for field in self.totals
+            }
+
+        return {
+            field: sum(getattr(item, field) for item in data)
+            for field in self.totals
+        }
@@ -1,3 +1,86 @@
+from unittest import mock
+
 from django.test import TestCase
 
+from staffing.models import Position
+
+from . import utils
+from .utils import get_unique_slug, set_unique_slugs
+
 # Create your tests here.
+
+
+class UniqueSlugTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Записи с заданными slug (без Position.save)
+        Position.objects.bulk_create(
+            Position(name=name, slug=slug) for name, slug in (
+                ('Name', 'name'),
+                ('Name 1', 'name-1'),
+                ('Name 3', 'name-3'),
+                ('Other', 'other-name'),
+            )
+        )
+
+    def get_slugs(self, names, **kwargs):
+        positions = set_unique_slugs(
+            [Position(name=name) for name in names], 'slug', 'name', **kwargs,
+        )
+        return [position.slug for position in positions]
+
+    def test_existing(self):
+        """Занятые суффиксы slug-N пропускаются."""
+        self.assertEqual(self.get_slugs(['Name']), ['name-2'])
+        self.assertEqual(self.get_slugs(['Other']), ['other'])
+
+    def test_batch_duplicates(self):
+        """Slug уникальны и среди экземпляров списка."""
+        self.assertEqual(
+            self.get_slugs(['Name', 'name', 'NAME', 'New', 'new']),
+            ['name-2', 'name-4', 'name-5', 'new', 'new-1'],
+        )
+
+    def test_prohibit(self):
+        self.assertEqual(
+            self.get_slugs(['Create', 'Create', 'Free'], prohibit='free'),
+            ['create-1', 'create-2', 'free-1'],
+        )
+
+    def test_unique_for(self):
+        """Slug уникален в пределах значений полей unique_for."""
+        positions = set_unique_slugs(
+            [Position(name='Other'), Position(name='New'), Position(name='New')],
+            'slug', 'other-name', unique_for='name',
+        )
+        self.assertEqual(
+            [position.slug for position in positions],
+            ['other-name-1', 'other-name', 'other-name-1'],
+        )
+
+    def test_saved_instance(self):
+        """Slug сохраненной записи не считается занятым ею самой."""
+        position = Position.objects.get(slug='name')
+        self.assertEqual(get_unique_slug(position, 'slug', 'name'), 'name')
+
+    def test_hidden_by_manager(self):
+        """Записи, скрытые менеджером модели по умолчанию,
+        учитываются при проверке уникальности.
+        """
+        with mock.patch.object(
+                Position.objects, 'get_queryset',
+                return_value=Position.objects.none(),
+        ):
+            self.assertEqual(self.get_slugs(['Name']), ['name-2'])
+
+    def test_query_count(self):
+        """Существующие slug получаются одним запросом
+        на каждые slug_query_size различных slug.
+        """
+        names = ['Name {}'.format(index) for index in range(450)]
+        with self.assertNumQueries(3):
+            slugs = self.get_slugs(names + names)
+
+        self.assertEqual(len(set(slugs)), len(slugs))
+        self.assertEqual(slugs[:4], ['name-0', 'name-1-1', 'name-2', 'name-3-1'])
+        self.assertEqual(utils.slug_query_size, 200)
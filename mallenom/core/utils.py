@@ -1,5 +1,127 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches, DEFAULT_CACHE_ALIAS
+from django.db.models import Q
 from django.utils.text import slugify
 
+# Наибольшее колличество различных slug в одном запросе
+# существующих slug (ограничение на размер запроса в SQLite)
+slug_query_size = 200
+
+
+def _tuple_from_kwarg(name, **kwargs):
+    """Создает tuple из значения именованного аргумента.
+    Значение должно быть строкой или списком строк.
+    """
+    value = kwargs.get(name, None)
+    if value is None:
+        return tuple()
+    if isinstance(value, str):
+        return (value, )
+    if any([isinstance(value, item) for item in (list, tuple, set)]):
+        if all([isinstance(item, str) for item in value]):
+            return tuple(set(value))
+
+    raise ValueError(
+        "'{}' argument must be str or iterable of str.".format(name)
+    )
+
+
+def _get_unique_slugs(instances, slug_field, *args, **kwargs):
+    """Генерирует уникальные slug для списка экземпляров
+    одной модели (см. get_unique_slug).
+
+    Существующие slug, с которыми возможно совпадение, получаются
+    одним запросом на каждые slug_query_size различных slug,
+    свободный суффикс подбирается в памяти.
+
+    Returns:
+        список slug в порядке экземпляров
+    """
+    # Получаем значения полей экземпляров из которых создается slug
+    if not (args and all([isinstance(arg, str) for arg in args])):
+        raise ValueError("Slug source must be str type.")
+
+    # Составляем список запрещенных slug
+    prohibit = ['create', 'update', 'delete']
+    prohibit.extend(_tuple_from_kwarg('prohibit', **kwargs))
+
+    # Должен ли slug быть уникальным
+    unique = kwargs.get('unique', True)
+    unique_for = _tuple_from_kwarg('unique_for', **kwargs)
+
+    # Создаем slug
+    slugs = [
+        slugify(
+            '-'.join([str(getattr(instance, arg, arg)) for arg in args]),
+            allow_unicode=True,
+        ) for instance in instances
+    ]
+
+    # Уникальность slug не требуется
+    if not (unique or unique_for):
+        return [
+            "{}-1".format(slug) if slug in prohibit else slug
+            for slug in slugs
+        ]
+
+    if not instances:
+        return []
+
+    # Значения полей, с учетом которых slug должен быть уникальным
+    scopes = [
+        tuple(instance.serializable_value(field) for field in unique_for)
+        for instance in instances
+    ]
+
+    # Существующие slug вида slug и slug-n по областям уникальности:
+    # {scope: set(slug,...)}
+    slugs_exists = {}
+    # Менеджер без аннотаций и связанных объектов
+    queryset = type(instances[0])._base_manager.exclude(
+        id__in=[instance.id for instance in instances if instance.id is not None],
+    )
+
+    keys = list(set(zip(slugs, scopes)))
+    for index in range(0, len(keys), slug_query_size):
+        condition = Q()
+        for slug, scope in keys[index:index + slug_query_size]:
+            scope_filter = dict(zip(unique_for, scope))
+            condition |= Q(**{slug_field: slug}, **scope_filter)
+            condition |= Q(
+                **{slug_field + '__startswith': slug + '-'}, **scope_filter,
+            )
+
+        for slug, *scope in queryset.filter(condition).values_list(
+                slug_field, *unique_for,
+        ).order_by():
+            slugs_exists.setdefault(tuple(scope), set()).add(slug)
+
+    # Для уникальности будем создавать slug вида slug-1, slug-2, slug-n
+    result = []
+    for slug, scope in zip(slugs, scopes):
+        exists = slugs_exists.setdefault(scope, set())
+        slugExtension = 1
+
+        if slug in prohibit:
+            unique_slug = '{}-{}'.format(slug, slugExtension)
+            slugExtension += 1
+        else:
+            unique_slug = slug
+
+        # Пока slug не будет уникальным
+        while unique_slug in exists:
+            # Генерируем новый slug
+            unique_slug = '{}-{}'.format(slug, slugExtension)
+            slugExtension += 1
+
+        # Slug занят и для следующих экземпляров списка
+        exists.add(unique_slug)
+        result.append(unique_slug)
+
+    return result
+
 
 def get_unique_slug(instance, slug_field, *args, **kwargs):
     """ Генерирует уникальный slug.
@@ -20,72 +142,84 @@ def get_unique_slug(instance, slug_field, *args, **kwargs):
     Returns:
         строку с уникальным slug
     """
-    def tuple_from_kwarg(name, **kwargs):
-        """Создает tuple из значения именованного аргумента.
-        Значение должно быть строкой или списком строк.
-        """
-        value = kwargs.get(name, None)
-        if value is None:
-            return tuple()
-        if isinstance(value, str):
-            return (value, )
-        if any([isinstance(value, item) for item in (list, tuple, set)]):
-            if all([isinstance(item, str) for item in value]):
-                return tuple(set(value))
-
-        raise ValueError(
-            "'{}' argument must be str or iterable of str.".format(name)
-        )
-
-    # Получаем значения полей экземпляра из которых создается slug
-    if args and all([isinstance(arg, str) for arg in args]):
-        source = [getattr(instance, arg, arg) for arg in args]
-    else:
-        raise ValueError("Slug source must be str type.")
+    return _get_unique_slugs([instance], slug_field, *args, **kwargs)[0]
 
-    # Составляем список запрещенных slug
-    prohibit = ['create', 'update', 'delete']
-    prohibit.extend(tuple_from_kwarg('prohibit', **kwargs))
 
-    # Должен ли slug быть уникальным
-    unique = kwargs.get('unique', True)
-    unique_for = tuple_from_kwarg('unique_for', **kwargs)
+def set_unique_slugs(instances, slug_field, *args, **kwargs):
+    """Генерирует уникальные slug для списка экземпляров одной
+    модели (например, перед bulk_create) и записывает их
+    в поле slug_field экземпляров.
 
-    # Для уникальности будем создавать slug вида slug-1, slug-2, slug-n
-    slugExtension = 1
+    Slug уникальны как среди сохраненных записей, так и
+    среди экземпляров списка.
 
-    # Создаем slug
-    slug = slugify(
-        '-'.join([str(item) for item in source]),
-        allow_unicode=True,
-    )
+    Args:
+        instances - список экземпляров модели
+        slug_field - строка с именем поля в котором хранится slug
+        args - источник для создания slug (см. get_unique_slug)
 
-    # Уникальность slug не требуется
-    if not (unique or unique_for):
-        if slug in prohibit:
-            return "{}-{}".format(slug, slugExtension)
-        return slug
-
-    # Создаем уникальный slug
-    if slug in prohibit:
-        unique_slug = '{}-{}'.format(slug, slugExtension)
-        slugExtension += 1
-    else:
-        unique_slug = slug
-
-    # Формируем словарь для фильтра модели
-    filter_dict = {slug_field: unique_slug}
-    filter_dict.update(
-        {field: getattr(instance, field) for field in unique_for}
-    )
+    Kwargs:
+        см. get_unique_slug
+
+    Returns:
+        список экземпляров
+    """
+    slugs = _get_unique_slugs(instances, slug_field, *args, **kwargs)
+    for instance, slug in zip(instances, slugs):
+        setattr(instance, slug_field, slug)
+    return instances
 
-    # Пока slug не будет уникальным
-    while instance.__class__.objects.filter(
-        **filter_dict,
-    ).exclude(id=instance.id).exists():
-        # Генерируем новый slug
-        unique_slug = '{}-{}'.format(slug, slugExtension)
-        filter_dict.update({slug_field: unique_slug})
-        slugExtension += 1
 
-    return unique_slug
+def get_shared_cache():
+    """Возвращает кэш, общий для всех процессов
+    (settings.SHARED_CACHE_ALIAS).
+
+    Кэш хранит номера версий данных, поэтому должен быть доступен
+    всем процессам веб-сервера и обработчика заданий (например,
+    FileBasedCache или DatabaseCache). Если кэш не настроен,
+    используется кэш по умолчанию.
+
+    Returns:
+        кэш
+    """
+    alias = getattr(settings, 'SHARED_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)
+    if alias in settings.CACHES:
+        return caches[alias]
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+def get_cache_version(cache, key):
+    """Возвращает номер версии данных, хранящийся в кэше.
+
+    Номер версии используется в ключах кэша, зависящих
+    от данных: после изменения номера такие записи
+    больше не используются.
+
+    Args:
+        cache - кэш
+        key - ключ номера версии
+
+    Returns:
+        номер версии
+    """
+    version = cache.get(key)
+    if version is None:
+        # Начальное значение отличается от значений,
+        # которые могли быть вытеснены из кэша ранее
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key, 0)
+    return version
+
+
+def incr_cache_version(cache, key):
+    """Изменяет номер версии данных, хранящийся в кэше.
+
+    Args:
+        cache - кэш
+        key - ключ номера версии
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Номер версии отсутствует в кэше
+        get_cache_version(cache, key)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.core.paginator import (
     Paginator,
@@ -9,6 +10,8 @@ from django.http import HttpResponseRedirect
 from django.db.models import ProtectedError
 from django.utils.translation import ugettext_lazy as _
 
+from django_tables2.paginators import LazyPaginator
+
 # Create your views here.
 
 class ActionTableDeleteMixin:
@@ -99,6 +102,37 @@ class ActionTableDeleteMixin:
         return HttpResponseRedirect(request.path)
 
 
+class PaginatedTableMixin:
+    """Разбивает таблицу (SingleTableMixin) на страницы
+    на стороне сервера, по settings.TABLE_PAGINATE_BY записей.
+
+    Если задан table_lazy_pagination, общее колличество записей
+    не вычисляется (наличие следующей страницы определяется
+    по записям, следующим за текущей страницей), поэтому
+    страница большой таблицы формируется без COUNT по всем
+    ее записям.
+    """
+    table_lazy_pagination = False
+
+    def get_table(self, **kwargs):
+        """Отмечает таблицу атрибутом data-server-side: таблица
+        упорядочивается и разбивается на страницы только на стороне
+        сервера, в том числе если состоит из одной страницы
+        (см. core-action-table.js).
+        """
+        table = super().get_table(**kwargs)
+        table.attrs['data-server-side'] = 'true'
+        return table
+
+    def get_table_pagination(self, table):
+        paginate = {
+            'per_page': settings.TABLE_PAGINATE_BY,
+        }
+        if self.table_lazy_pagination:
+            paginate['paginator_class'] = LazyPaginator
+        return paginate
+
+
 class DeleteMessageMixin:
     """Выводит сообщение о результате удаления записи.
     """
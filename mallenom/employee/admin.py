@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Employee, Employment
+from .models import Employee, Employment, EmployeeSearchToken
 
 # Register your models here.
 
@@ -12,7 +12,13 @@ class EmploymentInline(admin.StackedInline):
 
 class EmployeeAdmin(admin.ModelAdmin):
     inlines = (EmploymentInline, )
-    search_fields = ('full_name', )
+    search_fields = ('last_name', 'first_name', 'middle_name')
+
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет сотрудников по поисковому индексу."""
+        if not search_term:
+            return queryset, False
+        return EmployeeSearchToken.objects.search(queryset, search_term), False
 
 
 class EmploymentAdmin(admin.ModelAdmin):
@@ -5,3 +5,7 @@ from django.utils.translation import gettext_lazy as _
 class EmployeeConfig(AppConfig):
     name = 'employee'
     verbose_name = _('Employees')
+
+    def ready(self):
+        # Подключаем обработчики сигналов
+        from . import signals
@@ -1,15 +1,14 @@
-from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
 
 import django_filters as filters
 
-from .models import Employee, Employment
+from .models import Employee, Employment, EmployeeSearchToken
 
 
 class EmployeeFilter(filters.FilterSet):
     full_name = filters.CharFilter(
         label=_('Employee'),
-        lookup_expr='icontains',
+        method='full_name_filter',
     )
     staff_units = filters.ChoiceFilter(
         label=_('Staff units'),
@@ -27,6 +26,9 @@ class EmployeeFilter(filters.FilterSet):
             **{'staff_units_count__gt' if int(value) else 'staff_units_count': 0}
         )
 
+    def full_name_filter(self, queryset, name, value):
+        return EmployeeSearchToken.objects.search(queryset, value)
+
 
 class EmploymentFilter(filters.FilterSet):
     number = filters.CharFilter(
@@ -63,8 +65,7 @@ class EmploymentFilter(filters.FilterSet):
         )
 
     def employee_filter(self, queryset, name, value):
-        for word in value.split():
-            queryset = queryset.filter(
-                Q(employee__first_name__icontains=word) | Q(employee__middle_name__icontains=word) | Q(employee__last_name__icontains=word)
-            )
-        return queryset
+        return EmployeeSearchToken.objects.search(
+            queryset, value,
+            field='employee',
+        )
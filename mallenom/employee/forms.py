@@ -23,7 +23,10 @@ class EmploymentForm(forms.ModelForm):
         """В форме должны отображаться только действующие штатные еденицы.
         """
         super().__init__(*args, **kwargs)
-        self.fields['staffing'].queryset = Staffing.objects.filter(count__gt=0)
+        self.fields['employee'].queryset = Employee.objects_plain.all()
+        self.fields['staffing'].queryset = Staffing.objects_plain.select_related(
+            'department', 'position',
+        ).filter(count__gt=0)
 
     def clean(self):
         """Колличество штатных едениц назначаемых сотруднику
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from employee.models import EmployeeSearchToken
+
+
+class Command(BaseCommand):
+    help = "Rebuilds employee search index"
+
+    def handle(self, *args, **options):
+        count = EmployeeSearchToken.objects.refresh()
+
+        self.stdout.write(self.style.SUCCESS(
+            "Employee search index rebuilt: {} tokens".format(count)
+        ))
@@ -0,0 +1,60 @@
+# Generated by Django 2.2.7 on 2026-10-18 09:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_search_tokens(apps, schema_editor):
+    # Копия EmployeeSearchTokenManager.get_name_tokens (token_length = 3)
+    # на момент создания миграции: миграция не должна зависеть
+    # от последующих изменений кода модели
+    Employee = apps.get_model('employee', 'Employee')
+    EmployeeSearchToken = apps.get_model('employee', 'EmployeeSearchToken')
+
+    tokens = []
+    for employee in Employee.objects.all():
+        words = ' '.join((
+            employee.last_name,
+            employee.first_name,
+            employee.middle_name,
+        )).lower().split()
+        employee_tokens = set()
+        for word in words:
+            for length in range(1, 4):
+                employee_tokens.update(
+                    word[index:index + length]
+                    for index in range(len(word) - length + 1)
+                )
+        tokens.extend(
+            EmployeeSearchToken(employee=employee, token=token)
+            for token in employee_tokens
+        )
+
+    EmployeeSearchToken.objects.bulk_create(tokens)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0002_change_count_verbose_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeSearchToken',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=3, verbose_name='Token')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='employee.Employee', verbose_name='Employee')),
+            ],
+            options={
+                'verbose_name': 'Employee search token',
+                'verbose_name_plural': 'Employee search tokens',
+                'unique_together': {('token', 'employee')},
+            },
+        ),
+        migrations.RunPython(
+            fill_search_tokens,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import (
@@ -14,9 +14,12 @@ from staffing.models import Staffing
 
 # Create your models here.
 
-class EmployeeManager(models.Manager):
-    def get_queryset(self):
-        return super().get_queryset().annotate(
+class EmployeeQuerySet(models.QuerySet):
+    def with_stats(self):
+        """Добавляет полное имя сотрудника, колличество подразделений,
+        должностей и занимаемых штатных едениц.
+        """
+        return self.annotate(
             full_name=models.functions.LTrim(
                 models.functions.Concat(
                     'last_name', models.Value(' '),
@@ -42,6 +45,11 @@ class EmployeeManager(models.Manager):
         )
 
 
+class EmployeeManager(models.Manager.from_queryset(EmployeeQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().with_stats()
+
+
 class Employee(models.Model):
     last_name = models.CharField(
         max_length=64,
@@ -84,6 +92,9 @@ class Employee(models.Model):
     )
 
     objects = EmployeeManager()
+    # Без аннотаций (для форм, API и поиска по ключу),
+    # статистика добавляется методом with_stats()
+    objects_plain = EmployeeQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('Employee')
@@ -176,9 +187,23 @@ class Employment(models.Model):
         ordering = ['number', ]
 
     def __str__(self):
+        return self.get_label(self.staffing, self.number)
+
+    @staticmethod
+    def get_label(staffing, number):
+        """Возвращает наименование занимаемой должности (см. __str__).
+
+        Args:
+            staffing - штатная единица или ее наименование
+                (см. Staffing.get_label)
+            number - табельный номер
+
+        Returns:
+            наименование занимаемой должности
+        """
         return "{staffing} [{number}]".format(
-            staffing=self.staffing,
-            number=self.number,
+            staffing=staffing,
+            number=number,
         )
 
     def get_absolute_url(self):
@@ -207,3 +232,150 @@ class Employment(models.Model):
                 'slug': self.employee.slug,
             },
         )
+
+
+class EmployeeSearchTokenManager(models.Manager):
+    # Длина токенов (n-грамм)
+    token_length = 3
+
+    @classmethod
+    def get_tokens(cls, word):
+        """Возвращает токены слова для поиска.
+
+        Слово приводится к нижнему регистру, токены - все
+        подстроки слова длиной token_length (или слово
+        целиком, если оно короче).
+
+        Args:
+            word - слово
+
+        Returns:
+            множество токенов
+        """
+        word = word.lower()
+        length = min(cls.token_length, len(word))
+        return {
+            word[index:index + length]
+            for index in range(len(word) - length + 1)
+        }
+
+    @classmethod
+    def get_name_tokens(cls, *names):
+        """Возвращает токены имени сотрудника: все подстроки
+        длиной до token_length каждого слова имени, поэтому
+        любое слово поиска, входящее в имя, имеет все свои
+        токены в индексе.
+
+        Args:
+            *names - фамилия, имя, отчество
+
+        Returns:
+            множество токенов
+        """
+        tokens = set()
+        for word in ' '.join(names).lower().split():
+            for length in range(1, cls.token_length + 1):
+                tokens.update(
+                    word[index:index + length]
+                    for index in range(len(word) - length + 1)
+                )
+        return tokens
+
+    def refresh(self, employees=None):
+        """Обновляет индекс для сотрудников.
+
+        Args:
+            employees - список id сотрудников, если не задан -
+                индекс строится заново для всех сотрудников
+
+        Returns:
+            колличество добавленных токенов
+        """
+        names = Employee._base_manager.values_list(
+            'pk', 'last_name', 'first_name', 'middle_name',
+        ).order_by()
+        tokens = self.all()
+        if employees is not None:
+            names = names.filter(pk__in=employees)
+            tokens = tokens.filter(employee__in=employees)
+
+        with transaction.atomic(using=self.db):
+            # Токены не имеют зависимостей, поэтому удаляются
+            # одним запросом (без сигналов post_delete)
+            tokens._raw_delete(self.db)
+            return len(self.bulk_create(
+                EmployeeSearchToken(employee_id=pk, token=token)
+                for pk, *name in names
+                for token in self.get_name_tokens(*name)
+            ))
+
+    def search(self, queryset, value, field='pk'):
+        """Фильтрует queryset по словам поиска в имени сотрудника.
+
+        Сотрудники выбираются только по индексу: слово найдено,
+        если имя сотрудника содержит все токены слова. Слово до
+        token_length символов должно входить в одно из слов имени,
+        для более длинных слов проверяется наличие всех их подстрок
+        длиной token_length. Регистр букв не учитывается, в том
+        числе для кириллицы (в отличие от icontains в SQLite).
+
+        Args:
+            queryset - queryset
+            value - строка поиска
+
+        Kwargs:
+            field - поле queryset, ссылающееся на сотрудника
+
+        Returns:
+            queryset
+        """
+        for word in value.split():
+            tokens = self.get_tokens(word)
+            employees = self.filter(
+                token__in=tokens,
+            ).values('employee').annotate(
+                tokens_count=models.Count('token'),
+            ).filter(
+                tokens_count=len(tokens),
+            ).values('employee')
+
+            queryset = queryset.filter(**{'{}__in'.format(field): employees})
+        return queryset
+
+
+class EmployeeSearchToken(models.Model):
+    """Индекс для поиска сотрудников по имени.
+
+    Содержит подстроки (до трех символов) слов фамилии, имени
+    и отчества сотрудника в нижнем регистре. Обновляется при
+    сохранении сотрудника (см. signals), может быть построен
+    заново командой rebuild_employee_search.
+    """
+
+    employee = models.ForeignKey(
+        Employee,
+        null=False,
+        blank=False,
+        on_delete=models.CASCADE,
+        related_name='search_tokens',
+        verbose_name=_('Employee'),
+    )
+    token = models.CharField(
+        max_length=3,
+        null=False,
+        blank=False,
+        verbose_name=_('Token'),
+    )
+
+    objects = EmployeeSearchTokenManager()
+
+    class Meta:
+        verbose_name = _('Employee search token')
+        verbose_name_plural = _('Employee search tokens')
+        unique_together = (('token', 'employee'),)
+
+    def __str__(self):
+        return "{token}: {employee}".format(
+            token=self.token,
+            employee=self.employee,
+        )
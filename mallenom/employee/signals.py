@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Employee, EmployeeSearchToken
+
+
+@receiver(post_save, sender=Employee)
+def refresh_employee_search(sender, instance, **kwargs):
+    """Обновляет поисковый индекс при изменении сотрудника."""
+    EmployeeSearchToken.objects.refresh([instance.pk])
@@ -2,10 +2,14 @@ from django.utils.translation import gettext_lazy as _
 
 import django_tables2 as tables
 
+from core.tables import TotalsTableMixin
+
 from .models import Employee, Employment
 
 
-class EmployeeTable(tables.Table):
+class EmployeeTable(TotalsTableMixin, tables.Table):
+    totals = ('staff_units_count', )
+
     full_name = tables.LinkColumn(
         verbose_name=_('Employee'),
     )
@@ -18,7 +22,7 @@ class EmployeeTable(tables.Table):
     staff_units_count = tables.Column(
         verbose_name=_("Staff units count"),
         footer=lambda table: _('Total: {}').format(
-            sum(x.staff_units_count for x in table.data)
+            table.get_total('staff_units_count')
         )
     )
     delete = tables.CheckBoxColumn(accessor="pk")
@@ -34,7 +38,9 @@ class EmployeeTable(tables.Table):
         empty_text = _("There are no records available")
 
 
-class EmploymentTable(tables.Table):
+class EmploymentTable(TotalsTableMixin, tables.Table):
+    totals = ('count', )
+
     employee = tables.LinkColumn()
     department = tables.Column(
         linkify=(
@@ -50,7 +56,7 @@ class EmploymentTable(tables.Table):
     )
     count = tables.Column(
         footer=lambda table: _('Total: {}').format(
-            sum(x.count for x in table.data)
+            table.get_total('count')
         )
     )
     delete = tables.CheckBoxColumn(accessor="pk")
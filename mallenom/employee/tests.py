@@ -1,3 +1,56 @@
+from importlib import import_module
+
+from django.apps import apps
 from django.test import TestCase
 
+from .models import Employee, EmployeeSearchToken
+
 # Create your tests here.
+
+
+class EmployeeSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employees = [
+            Employee.objects.create(
+                last_name=last_name, first_name=first_name, middle_name=middle_name,
+            ) for last_name, first_name, middle_name in (
+                ('Иванов', 'Петр', 'Сергеевич'),
+                ('Петров', 'Иван', ''),
+                ('Smith', 'John', ''),
+            )
+        ]
+
+    def search(self, value):
+        return set(EmployeeSearchToken.objects.search(Employee.objects_plain.all(), value))
+
+    def test_search(self):
+        ivanov, petrov, smith = self.employees
+
+        self.assertEqual(self.search('иван'), {ivanov, petrov})
+        self.assertEqual(self.search('ПЕТР'), {ivanov, petrov})
+        self.assertEqual(self.search('иван серг'), {ivanov})
+        self.assertEqual(self.search('mit'), {smith})
+        self.assertEqual(self.search('в'), {ivanov, petrov})
+        self.assertEqual(self.search('ивановы'), set())
+
+    def test_search_updated(self):
+        """Индекс обновляется при изменении сотрудника."""
+        smith = self.employees[2]
+        smith.last_name = 'Smithson'
+        smith.save()
+
+        self.assertEqual(self.search('hson'), {smith})
+
+    def test_migration_tokens(self):
+        """Токены, созданные миграцией, совпадают с токенами
+        EmployeeSearchTokenManager.refresh.
+        """
+        migration = import_module('employee.migrations.0003_create_employeesearchtoken_model')
+        tokens = EmployeeSearchToken.objects.values_list('employee', 'token')
+        expected = set(tokens)
+
+        EmployeeSearchToken.objects.all().delete()
+        migration.fill_search_tokens(apps, None)
+
+        self.assertEqual(set(tokens), expected)
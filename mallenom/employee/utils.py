@@ -28,7 +28,7 @@ class EmployeeContextMixin():
             employee_slug = self.kwargs.get(self.employee_slug_url_kwarg)
             # Получаем объект
             employee = get_object_or_404(
-                Employee,
+                Employee.objects_plain,
                 slug__iexact=employee_slug,
             )
             # Добавляем в контекст
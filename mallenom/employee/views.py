@@ -14,6 +14,7 @@ from django_filters.views import FilterView
 from core.views import (
     ActionTableDeleteMixin,
     DeleteMessageMixin,
+    PaginatedTableMixin,
     SingleFormSetMixin,
 )
 
@@ -29,10 +30,9 @@ from .utils import EmployeeContextMixin, EmploymentGetObjectMixin
 
 # Create your views here.
 
-class EmployeeList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class EmployeeList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = Employee
     table_class = EmployeeTable
-    table_pagination = False
     filterset_class = EmployeeFilter
     template_name = 'employee/employee_list.html'
     action_table_model = Employee
@@ -80,10 +80,9 @@ class EmployeeDelete(DeleteMessageMixin, DeleteView):
     success_url = reverse_lazy('employee:employee:list')
 
 
-class EmploymentList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class EmploymentList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = Employment
     table_class = EmploymentTable
-    table_pagination = False
     filterset_class = EmploymentFilter
     template_name = 'employee/employment_list.html'
     action_table_model = Employment
@@ -118,7 +117,7 @@ class EmploymentListEmployee(
 
     def get_table_data(self):
         employee_slug = self.kwargs.get(self.employee_slug_url_kwarg)
-        employee = Employee.objects.get(slug__iexact=employee_slug)
+        employee = Employee.objects_plain.get(slug__iexact=employee_slug)
         return self.model.objects.filter(employee=employee)
 
 
@@ -136,7 +135,7 @@ class EmploymentCreate(
         employee_slug = self.kwargs.get(
             self.employee_slug_url_kwarg)
         self.employee = get_object_or_404(
-            Employee, slug__iexact=employee_slug)
+            Employee.objects_plain, slug__iexact=employee_slug)
         initial = {
             self.employee_context_object_name:
                 self.employee,
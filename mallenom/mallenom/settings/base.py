@@ -163,3 +163,17 @@ FLOAT_TOLERANCE = 7
 
 # Work day length in hours
 WORK_DAY_HOURS = 8
+
+# Number of rows per page in list tables
+TABLE_PAGINATE_BY = 50
+
+# Cache shared by all processes (web server, report jobs),
+# stores versions of cached data (see core.utils.get_shared_cache)
+SHARED_CACHE_ALIAS = 'reports'
+
+# Reports are rendered by background jobs (see run_report_jobs command)
+REPORTS_BACKGROUND = False
+
+# Maximum size in bytes of a rendered report kept in the reports cache,
+# larger reports are streamed from a temporary file and not cached
+REPORTS_CACHE_MAX_SIZE = 1024 * 1024
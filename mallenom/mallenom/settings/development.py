@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from ..log_filters import ManagementFilter
 
@@ -31,6 +32,28 @@ DATABASES = {
     }
 }
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Кэш отчетов (см. reports.cache) и номеров версий данных,
+    # общий для всех процессов (см. SHARED_CACHE_ALIAS)
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'mallenom', 'reports'),
+        'TIMEOUT': 24 * 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 300,
+        },
+    },
+}
+
+# Report jobs
+
+REPORT_JOBS_ROOT = os.path.join(tempfile.gettempdir(), 'mallenom', 'jobs')
+
 # Logging
 
 verbose = (
@@ -19,6 +19,34 @@ DATABASES = {
     }
 }
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Кэш отчетов (см. reports.cache) и номеров версий данных,
+    # общий для всех процессов (см. SHARED_CACHE_ALIAS), может
+    # быть заменен на django.core.cache.backends.db.DatabaseCache
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/var/lib/mallenomTimeSheet/cache/reports',
+        'TIMEOUT': 7 * 24 * 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+}
+
+# Report jobs
+
+# Отчеты формируются при запросе. Для формирования отчетов
+# в фоне требуется запущенный обработчик заданий:
+# manage.py run_report_jobs, иначе задания не будут выполнены
+REPORTS_BACKGROUND = False
+
+REPORT_JOBS_ROOT = '/var/lib/mallenomTimeSheet/reports'
+
 # Logging
 
 verbose = (
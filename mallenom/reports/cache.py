@@ -0,0 +1,118 @@
+import functools
+import hashlib
+
+from django.db import transaction
+
+from core.utils import (
+    get_cache_version,
+    get_shared_cache,
+    incr_cache_version,
+)
+from workcal.index import calendar_index
+
+
+class ReportCache:
+    """Кэш отчетов.
+
+    Хранит данные для отчетов (результаты методов DataBuilder)
+    и сформированные документы. Используется кэш, общий для
+    всех процессов (см. core.utils.get_shared_cache), поэтому
+    номер версии данных, измененный в одном процессе, проверяется
+    всеми процессами (в том числе обработчиком заданий).
+
+    Ключи записей содержат номер версии данных, который
+    изменяется при изменении сотрудников, штатного расписания
+    и назначений (см. signals), и номер версии производственного
+    календаря. Устаревшие записи не используются и вытесняются
+    из кэша, при обращении к записи время ее жизни продлевается.
+    """
+
+    # Ключ номера версии данных в кэше
+    version_key = 'reports:version'
+
+    @property
+    def cache(self):
+        return get_shared_cache()
+
+    @property
+    def version(self):
+        """Номер версии данных."""
+        return get_cache_version(self.cache, self.version_key)
+
+    def invalidate(self):
+        """Изменяет номер версии данных (в том числе
+        после завершения текущей транзакции).
+        """
+        self._incr_version()
+        transaction.on_commit(self._incr_version)
+
+    def _incr_version(self):
+        incr_cache_version(self.cache, self.version_key)
+
+    def make_key(self, *args):
+        """Возвращает ключ записи для текущих версий данных.
+
+        Args:
+            args - параметры записи (тип записи, отчет, даты и т.д.)
+
+        Returns:
+            строку с ключом
+        """
+        # Параметры могут содержать пробелы и символы юникода
+        params = hashlib.md5(
+            ':'.join(str(arg) for arg in args).encode('utf-8'),
+        ).hexdigest()
+
+        return 'reports:{}:{}:{}'.format(
+            self.version, calendar_index.version, params,
+        )
+
+    def get(self, key):
+        """Возвращает запись из кэша или None."""
+        value = self.cache.get(key)
+        if value is not None:
+            # Продлеваем время жизни используемой записи
+            self.cache.touch(key)
+        return value
+
+    def set(self, key, value):
+        """Сохраняет запись в кэше."""
+        self.cache.set(key, value)
+
+
+class CachedDataBuilder:
+    """Обертка DataBuilder, кэширующая данные для отчетов.
+    """
+
+    def __init__(self, data_builder, cache):
+        """
+        Args:
+            data_builder - экземпляр DataBuilder
+            cache - экземпляр ReportCache
+        """
+        self.data_builder = data_builder
+        self.cache = cache
+
+    def __getattr__(self, name):
+        attr = getattr(self.data_builder, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def method(*args):
+            key = self.cache.make_key(
+                'data', name,
+                self.data_builder.start, self.data_builder.end,
+                *args,
+            )
+            data = self.cache.get(key)
+            if data is None:
+                data = attr(*args)
+                self.cache.set(key, data)
+            return data
+
+        return method
+
+
+# Кэш, общий для процесса
+report_cache = ReportCache()
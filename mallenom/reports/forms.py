@@ -4,19 +4,21 @@ from django import forms
 from django.utils.translation import gettext_lazy as _
 
 
+# Результатом выбора должен быть метод ReportBuilder
+REPORT_CHOICES = (
+    ('assignment_report', _("Employees' assignments")),
+    ('assignment_matrix_report', _("Employees' assignments matrix")),
+    ('assignment_matrix_report_xlsx', _("Employees' assignments matrix (Excel)")),
+    ('assignment_hours_check_xlsx', _("Employees' work hours check")),
+    ('index_of_labor_distribution_xlsx', _("Employees' indexes of labor distribution")),
+    ('index_of_labor_distribution_per_project_xlsx', _("Employees' indexes of labor distribution per project")),
+)
+
+
 class ReportDownloadForm(forms.Form):
     report = forms.ChoiceField(
         required=True,
-        choices=(
-            # Результатом выбора должен быть метод ReportBuilder
-            ('', '---------'),
-            ('assignment_report', _("Employees' assignments")),
-            ('assignment_matrix_report', _("Employees' assignments matrix")),
-            ('assignment_matrix_report_xlsx', _("Employees' assignments matrix (Excel)")),
-            ('assignment_hours_check_xlsx', _("Employees' work hours check")),
-            ('index_of_labor_distribution_xlsx', _("Employees' indexes of labor distribution")),
-            ('index_of_labor_distribution_per_project_xlsx', _("Employees' indexes of labor distribution per project")),
-        ),
+        choices=(('', '---------'), *REPORT_CHOICES),
         label=_('Report'),
     )
     start = forms.DateField(
@@ -100,3 +102,16 @@ class ReportDownloadForm(forms.Form):
             )
 
         return cleaned_data
+
+
+class ReportBundleForm(ReportDownloadForm):
+    report = None
+    reports = forms.MultipleChoiceField(
+        required=True,
+        choices=REPORT_CHOICES,
+        initial=list(dict(REPORT_CHOICES)),
+        widget=forms.CheckboxSelectMultiple,
+        label=_('Reports'),
+    )
+
+    field_order = ['reports', 'start', 'end', 'orientation']
@@ -0,0 +1,244 @@
+import sys
+
+
+class ReportFrame:
+    """Таблица данных для отчетов, хранящаяся по столбцам.
+
+    Каждый столбец - список значений, строки (имена сотрудников,
+    подразделений, проектов и т.д.) интернируются, поэтому
+    повторяющиеся значения хранятся в памяти один раз.
+    Типы значений сохраняются (целые часы остаются целыми).
+    """
+
+    def __init__(self, columns=None):
+        """Создает таблицу.
+
+        Args:
+            columns - словарь вида {field: [value,...]}
+        """
+        self.columns = {}
+        self._length = 0
+
+        for field, values in (columns or {}).items():
+            self[field] = values
+
+    @classmethod
+    def from_rows(cls, rows, fields):
+        """Создает таблицу из последовательности строк
+        (например, результата values_list).
+
+        Args:
+            rows - последовательность кортежей значений
+            fields - поля таблицы (по порядку значений в строке)
+
+        Returns:
+            ReportFrame
+        """
+        columns = list(zip(*rows)) or [()] * len(fields)
+        return cls(dict(zip(fields, columns)))
+
+    @staticmethod
+    def _intern(values):
+        return [
+            sys.intern(value) if type(value) is str else value
+            for value in values
+        ]
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, field):
+        return field in self.columns
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def __setitem__(self, field, values):
+        """Добавляет или заменяет столбец.
+
+        Args:
+            field - поле
+            values - значения (список или одно значение
+                для всех строк)
+        """
+        if isinstance(values, (list, tuple)):
+            values = self._intern(values)
+        else:
+            values = [values] * self._length
+
+        if self.columns and len(values) != self._length:
+            raise ValueError(
+                "Column '{}' length must be {}".format(field, self._length)
+            )
+
+        self.columns[field] = values
+        self._length = len(values)
+
+    @property
+    def fields(self):
+        return tuple(self.columns)
+
+    def _keys(self, fields):
+        return list(zip(*(self.columns[field] for field in fields)))
+
+    def rows(self, fields):
+        """Возвращает строки таблицы.
+
+        Args:
+            fields - поля строки
+
+        Returns:
+            список вида [[value,...],...]
+        """
+        return [list(row) for row in zip(*(self.columns[field] for field in fields))]
+
+    def concat(self, other):
+        """Возвращает таблицу со строками обеих таблиц.
+        Поля, отсутствующие в одной из таблиц,
+        заполняются значением None.
+
+        Args:
+            other - ReportFrame
+
+        Returns:
+            ReportFrame
+        """
+        fields = list(self.fields)
+        fields.extend(field for field in other.fields if field not in self)
+
+        return ReportFrame({
+            field: (
+                self.columns.get(field, [None] * len(self)) +
+                other.columns.get(field, [None] * len(other))
+            ) for field in fields
+        })
+
+    def group_sum(self, keys, field):
+        """Суммирует значения столбца по группам.
+
+        Значения суммируются в порядке строк таблицы.
+
+        Args:
+            keys - поля, определяющие группу
+            field - поле со значениями
+
+        Returns:
+            словарь вида {(key, ...): сумма}
+        """
+        result = {}
+        for key, value in zip(self._keys(keys), self.columns[field]):
+            result[key] = result.get(key, 0) + value
+        return result
+
+    def transform_sum(self, keys, field):
+        """Возвращает для каждой строки сумму значений
+        столбца по ее группе (см. group_sum).
+
+        Args:
+            keys - поля, определяющие группу
+            field - поле со значениями
+
+        Returns:
+            список сумм
+        """
+        sums = self.group_sum(keys, field)
+        return [sums[key] for key in self._keys(keys)]
+
+    def select(self, fields):
+        """Возвращает таблицу из столбцов fields.
+
+        Args:
+            fields - поля таблицы
+
+        Returns:
+            ReportFrame
+        """
+        return ReportFrame({field: self.columns[field] for field in fields})
+
+    def update(self, other, keys, fields, factor=1):
+        """Добавляет к таблице строки другой таблицы.
+
+        Значения столбцов fields другой таблицы умножаются на
+        factor и суммируются со значениями первой строки таблицы
+        с теми же значениями ключевых полей, строки без пары
+        добавляются в конец таблицы. Строки индексируются по
+        ключу, поэтому обновление выполняется за один проход.
+
+        Args:
+            other - ReportFrame (с теми же полями)
+            keys - ключевые поля
+            fields - суммируемые поля
+
+        Kwargs:
+            factor - множитель значений fields другой таблицы
+
+        Returns:
+            ReportFrame
+        """
+        columns = {
+            field: list(self.columns.get(field, ()))
+            for field in (self.fields or other.fields)
+        }
+
+        # Позиции строк таблицы по ключу
+        index = {}
+        if self.columns:
+            for position, key in enumerate(self._keys(keys)):
+                index.setdefault(key, position)
+
+        length = len(self)
+        for position, key in enumerate(other._keys(keys)):
+            row = index.get(key)
+            if row is None:
+                # Строка без пары
+                index[key] = length
+                length += 1
+                for field, values in columns.items():
+                    value = other[field][position]
+                    values.append(value * factor if field in fields else value)
+            else:
+                for field in fields:
+                    columns[field][row] += other[field][position] * factor
+
+        return ReportFrame(columns)
+
+    def join(self, other, keys, fields):
+        """Присоединяет к таблице столбцы другой таблицы.
+
+        Строка другой таблицы присоединяется к первой строке
+        таблицы с теми же значениями ключевых полей, строки
+        без пары добавляются в конец таблицы.
+
+        Args:
+            other - ReportFrame
+            keys - ключевые поля
+            fields - присоединяемые поля другой таблицы
+
+        Returns:
+            ReportFrame
+        """
+        # Позиции строк таблицы по ключу
+        index = {}
+        for position, key in enumerate(self._keys(keys)):
+            index.setdefault(key, position)
+
+        columns = {field: list(values) for field, values in self.columns.items()}
+        for field in fields:
+            columns.setdefault(field, [None] * len(self))
+
+        # Поля, отсутствующие в другой таблице
+        missing = [field for field in columns if field not in other]
+
+        for position, key in enumerate(other._keys(keys)):
+            row = index.get(key)
+            if row is None:
+                # Строка без пары
+                for field in columns:
+                    columns[field].append(
+                        None if field in missing else other[field][position]
+                    )
+            else:
+                for field in fields:
+                    columns[field][row] = other[field][position]
+
+        return ReportFrame(columns)
@@ -0,0 +1,216 @@
+import io
+import os
+import zipfile
+
+from django.conf import settings
+from django.utils import timezone, translation
+
+from core.logger import log
+
+from .cache import report_cache
+from .models import ReportJob
+from .reports import ReportBuilder
+from .utils import DataBuilder
+
+
+def _get_document_key(report, start, end, orientation, language):
+    return report_cache.make_key(
+        'document', report, start, end, orientation, language,
+    )
+
+
+def get_cached_report_content(report, start, end, orientation, language):
+    """Возвращает сформированный ранее отчет из кэша.
+
+    Args:
+        report - метод ReportBuilder, формирующий отчет
+        start, end - даты отчета
+        orientation - ориентация страницы
+        language - язык отчета
+
+    Returns:
+        tuple вида (содержимое файла, тип контента, расширение файла)
+        или None, если отчет отсутствует в кэше
+    """
+    return report_cache.get(
+        _get_document_key(report, start, end, orientation, language),
+    )
+
+
+def get_report_content(report, start, end, orientation, language):
+    """Формирует отчет (или получает его из кэша).
+
+    Args:
+        report - метод ReportBuilder, формирующий отчет
+        start, end - даты отчета
+        orientation - ориентация страницы
+        language - язык отчета
+
+    Returns:
+        tuple вида (содержимое файла, тип контента, расширение файла)
+    """
+    # Ключ получаем до формирования отчета: при изменении
+    # данных во время формирования отчет не будет использован
+    key = _get_document_key(report, start, end, orientation, language)
+    content = report_cache.get(key)
+
+    if content is None:
+        with translation.override(language):
+            builder = ReportBuilder(start, end, cache=report_cache)
+            document = getattr(builder, report)(orientation=orientation)
+            content = builder.get_content(document)
+        report_cache.set(key, content)
+
+    return content
+
+
+def get_report_response(report, start, end, orientation, language):
+    """Возвращает response с отчетом (сформированным
+    или полученным из кэша).
+
+    Сформированный отчет сохраняется во временный файл
+    и передается частями. В кэш помещаются только отчеты
+    размером не более settings.REPORTS_CACHE_MAX_SIZE.
+
+    Args:
+        report - метод ReportBuilder, формирующий отчет
+        start, end - даты отчета
+        orientation - ориентация страницы
+        language - язык отчета
+
+    Returns: response
+    """
+    # Ключ получаем до формирования отчета: при изменении
+    # данных во время формирования отчет не будет использован
+    key = _get_document_key(report, start, end, orientation, language)
+    content = report_cache.get(key)
+
+    builder = ReportBuilder(start, end, cache=report_cache)
+    if content is not None:
+        return builder.get_content_response(*content)
+
+    with translation.override(language):
+        document = getattr(builder, report)(orientation=orientation)
+        file, size, content_type, file_extension = builder.get_file(document)
+
+    if size <= settings.REPORTS_CACHE_MAX_SIZE:
+        report_cache.set(key, (file.read(), content_type, file_extension))
+        file.seek(0)
+
+    return builder.get_file_response(file, size, content_type, file_extension)
+
+
+def render_document(report, data_builder, orientation, language):
+    """Формирует отчет, используя общий экземпляр DataBuilder.
+
+    Args:
+        report - метод ReportBuilder, формирующий отчет
+        data_builder - экземпляр DataBuilder
+        orientation - ориентация страницы
+        language - язык отчета
+
+    Returns:
+        tuple вида (содержимое файла, тип контента, расширение файла)
+    """
+    with translation.override(language):
+        builder = ReportBuilder(
+            data_builder.start,
+            data_builder.end,
+            cache=report_cache,
+            data_builder=data_builder,
+        )
+        document = getattr(builder, report)(orientation=orientation)
+        return builder.get_content(document)
+
+
+def get_bundle_content(reports, start, end, orientation, language):
+    """Формирует архив с несколькими отчетами за один период.
+
+    Отчеты, отсутствующие в кэше, формируются последовательно.
+    Данные о назначениях и отсутствиях получаются из БД один
+    раз и используются всеми отчетами. Задания на формирование
+    архивов выполняются параллельно обработчиком заданий
+    (см. команду run_report_jobs).
+
+    Args:
+        reports - список методов ReportBuilder, формирующих отчеты
+        start, end - даты отчетов
+        orientation - ориентация страницы
+        language - язык отчетов
+
+    Returns:
+        tuple вида (содержимое файла, тип контента, расширение файла)
+    """
+    if len(reports) == 1:
+        # Архив из одного отчета не требуется
+        return get_report_content(reports[0], start, end, orientation, language)
+
+    keys = {
+        report: _get_document_key(report, start, end, orientation, language)
+        for report in reports
+    }
+    contents = {report: report_cache.get(key) for report, key in keys.items()}
+    missing = [report for report, content in contents.items() if content is None]
+
+    if missing:
+        # Получаем данные для всех отчетов
+        data_builder = DataBuilder(start, end)
+        data_builder.prefetch()
+
+        rendered = {
+            report: render_document(
+                report, data_builder, orientation, language,
+            ) for report in missing
+        }
+
+        for report, content in rendered.items():
+            report_cache.set(keys[report], content)
+            contents[report] = content
+
+    # Упаковываем отчеты в архив
+    file = io.BytesIO()
+    with zipfile.ZipFile(file, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for report in reports:
+            content, content_type, file_extension = contents[report]
+            archive.writestr(
+                '{}_{}_{}.{}'.format(report, start, end, file_extension),
+                content,
+            )
+
+    return file.getvalue(), 'application/zip', 'zip'
+
+
+def render_report_job(pk):
+    """Формирует отчет задания и сохраняет его в файл
+    в каталоге REPORT_JOBS_ROOT.
+
+    Args:
+        pk - id задания
+
+    Returns:
+        tuple вида (id задания, статус задания)
+    """
+    job = ReportJob.objects.get(pk=pk)
+
+    try:
+        content, content_type, file_extension = get_bundle_content(
+            job.reports, job.start, job.end, job.orientation, job.language,
+        )
+
+        os.makedirs(settings.REPORT_JOBS_ROOT, exist_ok=True)
+        filename = 'report_job_{}.{}'.format(job.pk, file_extension)
+        with open(os.path.join(settings.REPORT_JOBS_ROOT, filename), 'wb') as file:
+            file.write(content)
+
+        job.file = filename
+        job.content_type = content_type
+        job.status = ReportJob.DONE
+    except Exception as error:
+        log.exception("Report job {} failed".format(job.pk))
+        job.error = "{}: {}".format(type(error).__name__, error)
+        job.status = ReportJob.FAILED
+
+    job.finished = timezone.now()
+    job.save()
+
+    return job.pk, job.status
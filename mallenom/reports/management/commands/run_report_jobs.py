@@ -0,0 +1,137 @@
+import datetime
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reports import worker
+from reports.models import ReportJob
+
+
+class Command(BaseCommand):
+    help = "Renders pending report jobs in a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jobs', type=int, default=2,
+            help="Number of processes used to render reports",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2,
+            help="Seconds between checks for new jobs",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Render pending jobs and exit",
+        )
+        parser.add_argument(
+            '--keep-days', type=int, default=7,
+            help="Delete finished jobs and their files after this many days",
+        )
+        parser.add_argument(
+            '--stale-minutes', type=float, default=60,
+            help="Requeue jobs left running longer than this many minutes"
+                 " (e.g. after a crash of the job runner) on startup",
+        )
+
+    def handle(self, *args, **options):
+        self.jobs = max(options['jobs'], 1)
+        self.options = options
+        self.cleanup_time = 0
+
+        # Задания, оставшиеся выполняемыми после
+        # аварийного завершения обработчика
+        requeued = ReportJob.objects.requeue_stale(
+            datetime.timedelta(minutes=options['stale_minutes']),
+        )
+        if requeued:
+            self.stdout.write("Report jobs requeued: {}".format(requeued))
+
+        # Пул создается заново, если процесс
+        # пула завершился аварийно
+        while not self._run():
+            self.stderr.write("Process pool is broken, restarting")
+
+    def _run(self):
+        """Передает задания процессам пула.
+
+        Returns:
+            True, если все задания выполнены (--once),
+            False, если пул процессов неработоспособен
+        """
+        # {future: id задания}
+        running = {}
+
+        # Процессы пула запускаются заново (spawn)
+        # и не используют соединения с БД основного процесса
+        with ProcessPoolExecutor(
+                max_workers=self.jobs,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=worker.init,
+        ) as executor:
+            while True:
+                # Удаляем устаревшие задания не чаще раза в час
+                if time.monotonic() - self.cleanup_time > 60 * 60:
+                    self._cleanup(self.options['keep_days'])
+                    self.cleanup_time = time.monotonic()
+
+                # Передаем ожидающие задания свободным процессам
+                claimed = ReportJob.objects.claim(self.jobs - len(running))
+                for index, pk in enumerate(claimed):
+                    try:
+                        running[executor.submit(worker.render, pk)] = pk
+                    except BrokenProcessPool:
+                        # Непереданные задания будут выполнены новым пулом,
+                        # выполняемые завершились с ошибкой вместе с пулом
+                        ReportJob.objects.requeue(claimed[index:])
+                        for future in wait(running).done:
+                            self._report(future, running.pop(future))
+                        return False
+
+                if not running:
+                    if self.options['once']:
+                        return True
+                    time.sleep(self.options['interval'])
+                    continue
+
+                done, _ = wait(
+                    running,
+                    timeout=self.options['interval'],
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    self._report(future, running.pop(future))
+
+    def _report(self, future, pk):
+        try:
+            pk, status = future.result()
+        except Exception as error:
+            # Процесс пула завершился аварийно
+            ReportJob.objects.filter(pk=pk).update(
+                status=ReportJob.FAILED,
+                error="{}: {}".format(type(error).__name__, error),
+                finished=timezone.now(),
+            )
+            status = ReportJob.FAILED
+
+        message = "Report job {}: {}".format(pk, status)
+        if status == ReportJob.DONE:
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(self.style.ERROR(message))
+
+    def _cleanup(self, keep_days):
+        """Удаляет завершенные задания старше keep_days дней."""
+        outdated = ReportJob.objects.filter(
+            status__in=(ReportJob.DONE, ReportJob.FAILED),
+            finished__lt=timezone.now() - datetime.timedelta(days=keep_days),
+        )
+
+        for job in outdated:
+            if job.path and os.path.exists(job.path):
+                os.remove(job.path)
+            job.delete()
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.7 on 2026-10-18 09:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report', models.CharField(max_length=64, verbose_name='Report')),
+                ('start', models.DateField(verbose_name='Start date')),
+                ('end', models.DateField(verbose_name='End date')),
+                ('orientation', models.CharField(max_length=16, verbose_name='Page orientation')),
+                ('language', models.CharField(max_length=16, verbose_name='Language')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='pending', max_length=16, verbose_name='Status')),
+                ('file', models.CharField(blank=True, editable=False, max_length=256, verbose_name='File')),
+                ('content_type', models.CharField(blank=True, editable=False, max_length=128)),
+                ('error', models.TextField(blank=True, editable=False, verbose_name='Error')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='Started')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Finished')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_jobs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Report job',
+                'verbose_name_plural': 'Report jobs',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
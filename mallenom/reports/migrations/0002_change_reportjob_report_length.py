@@ -0,0 +1,18 @@
+# Generated by Django 2.2.7 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_create_reportjob_model'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='report',
+            field=models.CharField(max_length=512, verbose_name='Report'),
+        ),
+    ]
@@ -1,3 +1,207 @@
-from django.db import models
+import os
+
+from django.db import models, transaction
+from django.db.models import Q
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
 # Create your models here.
+
+class ReportJobManager(models.Manager):
+    def claim(self, count):
+        """Отмечает ожидающие задания как выполняемые.
+
+        Задание, отмеченное другим обработчиком,
+        повторно не отмечается.
+
+        Args:
+            count - максимальное колличество заданий
+
+        Returns:
+            список id отмеченных заданий
+        """
+        result = []
+
+        pending = self.filter(
+            status=ReportJob.PENDING,
+        ).order_by('created').values_list('pk', flat=True)[:count]
+
+        for pk in pending:
+            with transaction.atomic():
+                if self.filter(
+                        pk=pk,
+                        status=ReportJob.PENDING,
+                ).update(status=ReportJob.RUNNING, started=timezone.now()):
+                    result.append(pk)
+
+        return result
+
+    def requeue(self, pks):
+        """Возвращает выполняемые задания в очередь
+        (например, если задание не было передано пулу
+        процессов).
+
+        Args:
+            pks - список id заданий
+
+        Returns:
+            колличество заданий
+        """
+        return self.filter(
+            pk__in=pks,
+            status=ReportJob.RUNNING,
+        ).update(status=ReportJob.PENDING, started=None)
+
+    def requeue_stale(self, timeout):
+        """Возвращает в очередь задания, выполнение которых
+        начато более timeout назад. Такие задания остаются
+        выполняемыми, если обработчик заданий был завершен
+        аварийно.
+
+        Args:
+            timeout - datetime.timedelta
+
+        Returns:
+            колличество заданий
+        """
+        return self.filter(
+            Q(started__isnull=True) | Q(started__lt=timezone.now() - timeout),
+            status=ReportJob.RUNNING,
+        ).update(status=ReportJob.PENDING, started=None)
+
+
+class ReportJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = (
+        (PENDING, _('Pending')),
+        (RUNNING, _('Running')),
+        (DONE, _('Done')),
+        (FAILED, _('Failed')),
+    )
+
+    # Метод ReportBuilder или несколько методов через запятую
+    report = models.CharField(
+        max_length=512,
+        verbose_name=_('Report'),
+    )
+    start = models.DateField(
+        verbose_name=_('Start date'),
+    )
+    end = models.DateField(
+        verbose_name=_('End date'),
+    )
+    orientation = models.CharField(
+        max_length=16,
+        verbose_name=_('Page orientation'),
+    )
+    language = models.CharField(
+        max_length=16,
+        verbose_name=_('Language'),
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        db_index=True,
+        verbose_name=_('Status'),
+    )
+    file = models.CharField(
+        max_length=256,
+        blank=True,
+        editable=False,
+        verbose_name=_('File'),
+    )
+    content_type = models.CharField(
+        max_length=128,
+        blank=True,
+        editable=False,
+    )
+    error = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name=_('Error'),
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='report_jobs',
+        verbose_name=_('User'),
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created'),
+    )
+    started = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Started'),
+    )
+    finished = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Finished'),
+    )
+
+    objects = ReportJobManager()
+
+    class Meta:
+        verbose_name = _('Report job')
+        verbose_name_plural = _('Report jobs')
+        ordering = ['-created', ]
+
+    def __str__(self):
+        return "{report}: {start} - {end}".format(
+            report=self.report,
+            start=self.start,
+            end=self.end,
+        )
+
+    @property
+    def reports(self):
+        """Список методов ReportBuilder, формирующих отчеты."""
+        return self.report.split(',')
+
+    @property
+    def path(self):
+        """Путь к файлу с отчетом."""
+        if not self.file:
+            return None
+        return os.path.join(settings.REPORT_JOBS_ROOT, self.file)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    def get_filename(self):
+        """Имя файла отчета для загрузки."""
+        return 'report_{}_{}{}'.format(
+            self.start,
+            self.end,
+            os.path.splitext(self.file)[1],
+        )
+
+    def get_absolute_url(self):
+        return reverse(
+            'reports:job:detail',
+            kwargs={'pk': self.pk},
+        )
+
+    def get_status_url(self):
+        return reverse(
+            'reports:job:status',
+            kwargs={'pk': self.pk},
+        )
+
+    def get_download_url(self):
+        return reverse(
+            'reports:job:download',
+            kwargs={'pk': self.pk},
+        )
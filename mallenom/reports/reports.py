@@ -1,44 +1,59 @@
+import io
+import tempfile
+from wsgiref.util import FileWrapper
+
 from docx import Document
 from docx.shared import Mm
 from docx.enum.table import WD_ALIGN_VERTICAL
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Border, Font, Side
 from openpyxl.utils.cell import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.worksheet import Worksheet
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils.translation import gettext, gettext_lazy as _
 from django.template.defaultfilters import date as date_filter
 
-from .utils import DataBuilder
+from .utils import DataBuilder, ReportMatrix
+from .cache import CachedDataBuilder
 
 
 class ReportBuilder:
     empty_text = gettext("There are no records available")
 
-    def __init__(self, start, end):
+    def __init__(self, start, end, *, cache=None, data_builder=None):
         """Создает отчеты в форматах docx, xlsx.
 
         Args:
             start - начальная дата отчета
             end - конечная дата отчетаа
+
+        Kwargs:
+            cache - кэш данных для отчетов (ReportCache)
+            data_builder - экземпляр DataBuilder, общий для
+                нескольких отчетов (по умолчанию создается новый)
         """
 
         self.start = start
         self.end = end
-        self.data_builder = DataBuilder(self.start, self.end)
+        self.data_builder = data_builder or DataBuilder(self.start, self.end)
 
-    def get_response(self, document, *, filename=None):
-        """Возвращает объект http responce с отчетом.
+        if cache is not None:
+            self.data_builder = CachedDataBuilder(self.data_builder, cache)
+
+    @staticmethod
+    def _get_content_type(document):
+        """Определяет тип документа.
 
         Args:
             document - документ с отчетом
 
-        Kwargs:
-            filename - имя файла отчета
-
-        Returns: response
+        Returns:
+            tuple вида (тип контента, расширение файла)
         """
 
         # Определяем дип документа
@@ -49,23 +64,121 @@ class ReportBuilder:
 
         # Задаем тип контента и расширение файла
         if document_type == 'Document':
-            content_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            file_extension = 'docx'
-        elif document_type == 'Workbook':
-            content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            file_extension = 'xlsx'
-        else:
-            raise ValueError("Invalid document type: {}".format(type(document)))
+            return (
+                'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+                'docx',
+            )
+        if document_type == 'Workbook':
+            return (
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                'xlsx',
+            )
+
+        raise ValueError("Invalid document type: {}".format(type(document)))
+
+    def _set_filename(self, response, file_extension, filename=None):
+        """Добавляет к ответу имя файла отчета.
+        """
 
         # При необходимости, формируем имя файла
         if filename is None:
             filename = 'report_{}_{}'.format(self.start, self.end)
             filename = '.'.join([filename, file_extension])
 
-        # Создаем ответ
-        response = HttpResponse(content_type=content_type)
         response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
-        document.save(response)
+
+    def get_content(self, document):
+        """Сохраняет документ с отчетом.
+
+        Args:
+            document - документ с отчетом
+
+        Returns:
+            tuple вида (содержимое файла, тип контента, расширение файла)
+        """
+        content_type, file_extension = self._get_content_type(document)
+
+        file = io.BytesIO()
+        document.save(file)
+
+        return file.getvalue(), content_type, file_extension
+
+    def get_file(self, document):
+        """Сохраняет документ с отчетом во временный файл.
+
+        Args:
+            document - документ с отчетом
+
+        Returns:
+            tuple вида (временный файл, размер файла,
+            тип контента, расширение файла)
+        """
+        content_type, file_extension = self._get_content_type(document)
+
+        file = tempfile.TemporaryFile()
+        document.save(file)
+        size = file.tell()
+        file.seek(0)
+
+        return file, size, content_type, file_extension
+
+    def get_file_response(self, file, size, content_type, file_extension,
+                          *, filename=None):
+        """Возвращает объект http responce, передающий
+        сохраненный отчет частями.
+
+        Args:
+            file, size, content_type, file_extension - сохраненный
+                во временный файл отчет (см. get_file)
+
+        Kwargs:
+            filename - имя файла отчета
+
+        Returns: response
+        """
+        response = StreamingHttpResponse(
+            FileWrapper(file),
+            content_type=content_type,
+        )
+        response['Content-Length'] = size
+        self._set_filename(response, file_extension, filename)
+
+        return response
+
+    def get_response(self, document, *, filename=None):
+        """Возвращает объект http responce с отчетом.
+
+        Документ сохраняется во временный файл и передается
+        частями, поэтому содержимое файла не хранится в памяти.
+
+        Args:
+            document - документ с отчетом
+
+        Kwargs:
+            filename - имя файла отчета
+
+        Returns: response
+        """
+        return self.get_file_response(
+            *self.get_file(document),
+            filename=filename,
+        )
+
+    def get_content_response(self, content, content_type, file_extension,
+                             *, filename=None):
+        """Возвращает объект http responce с сохраненным отчетом.
+
+        Args:
+            content, content_type, file_extension - сохраненный
+                отчет (см. get_content)
+
+        Kwargs:
+            filename - имя файла отчета
+
+        Returns: response
+        """
+        response = HttpResponse(content, content_type=content_type)
+        self._set_filename(response, file_extension, filename)
 
         return response
 
@@ -105,25 +218,32 @@ class ReportBuilder:
         return document
 
     @staticmethod
-    def _get_xlsx_document(*, orientation='portrait'):
+    def _get_xlsx_document(title, *, orientation='portrait'):
         """Создает и настраивает пустой документ xlsx.
 
+        Документ создается в режиме write-only: строки
+        записываются в таблицу последовательно и не хранятся
+        в памяти.
+
+        Args:
+            title - название таблицы
+
         Kwargs:
             orientation - ориентация документа
 
         Returns: xlsx документ
         """
 
-        document = Workbook()
-        sheet = document.active
+        document = Workbook(write_only=True)
+        sheet = document.create_sheet(title=title)
 
         # Размер листа А4
-        sheet.page_setup.paperSize = sheet.PAPERSIZE_A4
+        sheet.page_setup.paperSize = Worksheet.PAPERSIZE_A4
 
         # Ориентация страницы
-        sheet.page_setup.orientation = sheet.ORIENTATION_PORTRAIT
+        sheet.page_setup.orientation = Worksheet.ORIENTATION_PORTRAIT
         if orientation == 'landscape':
-            sheet.page_setup.orientation = sheet.ORIENTATION_LANDSCAPE
+            sheet.page_setup.orientation = Worksheet.ORIENTATION_LANDSCAPE
 
         return document
 
@@ -149,6 +269,9 @@ class ReportBuilder:
     def _add_xlsx_title(self, sheet, title, width):
         """Добавляет заголовок в документы xlsx.
 
+        Заголовок занимает первые четыре строки таблицы,
+        поэтому добавляется до остальных строк.
+
         Args:
             sheet - таблица с отчетом
             title - название отчета
@@ -157,25 +280,150 @@ class ReportBuilder:
         Returns: None
         """
 
-        sheet.insert_rows(1)
-        sheet.merge_cells(start_row=1, start_column=1, end_row=1, end_column=width)
-        cell = sheet.cell(row=1, column=1)
-        cell.value = title
-        cell.font = Font(size=12, bold=True, italic=True)
-
-        sheet.insert_rows(2)
-        sheet.merge_cells(start_row=2, start_column=1, end_row=2, end_column=width)
-
-        sheet.insert_rows(3)
-        sheet.merge_cells(start_row=3, start_column=1, end_row=3, end_column=width)
-        cell = sheet.cell(row=3, column=1)
-        cell.value = gettext("From {start} to {end}:").format(
-            start=date_filter(self.start, "SHORT_DATE_FORMAT"),
-            end=date_filter(self.end, "SHORT_DATE_FORMAT"),
+        title_cell = WriteOnlyCell(sheet, value=title)
+        title_cell.font = Font(size=12, bold=True, italic=True)
+
+        rows = (
+            [title_cell],
+            [],
+            [gettext("From {start} to {end}:").format(
+                start=date_filter(self.start, "SHORT_DATE_FORMAT"),
+                end=date_filter(self.end, "SHORT_DATE_FORMAT"),
+            )],
+            [],
+        )
+
+        for row_num, row in enumerate(rows, 1):
+            sheet.merged_cells.add(CellRange(
+                min_row=row_num, min_col=1, max_row=row_num, max_col=width,
+            ))
+            sheet.append(row)
+
+    def _add_xlsx_empty_text(self, sheet, title, width):
+        """Добавляет в документ xlsx заголовок и
+        сообщение об отсутствии данных.
+
+        Args:
+            sheet - таблица с отчетом
+            title - название отчета
+            width - число ячеек под заголовок и сообщение
+
+        Returns: None
+        """
+
+        self._add_xlsx_title(sheet, title, width)
+        sheet.merged_cells.add(CellRange(
+            min_row=5, min_col=1, max_row=5, max_col=width,
+        ))
+        sheet.append([self.empty_text])
+
+    def _add_xlsx_table(self, sheet, title, header, rows, *,
+                        centered=(), total_from=None):
+        """Добавляет в документ xlsx заголовок отчета
+        и таблицу с данными.
+
+        Ширина столбцов вычисляется до записи строк,
+        строки записываются в документ последовательно.
+
+        Args:
+            sheet - таблица с отчетом
+            title - название отчета
+            header - заголовок таблицы
+            rows - строки таблицы (списки значений)
+
+        Kwargs:
+            centered - номера столбцов, значения которых
+                выравниваются по центру
+            total_from - номер столбца, начиная с которого в строку
+                Total добавляются суммы по столбцам (если не задан,
+                строка Total не добавляется)
+
+        Returns: None
+        """
+
+        width = len(header)
+
+        # Строка Total
+        total = None
+        if total_from is not None:
+            # Данные таблицы начинаются с шестой строки
+            # (после заголовка отчета и заголовка таблицы)
+            total = [gettext('Total')] + [None] * (width - 1)
+            for col_num in range(total_from, width + 1):
+                total[col_num - 1] = "=SUM({col}{start_row}:{col}{end_row})".format(
+                    col=get_column_letter(col_num),
+                    start_row=6,
+                    end_row=len(rows) + 5,
+                )
+
+        # Устанавливаем ширину столбцов
+        lengths = [len(str(value)) for value in header]
+        for row in rows if total is None else (*rows, total):
+            for col, value in enumerate(row):
+                lengths[col] = max(lengths[col], len(str(value)))
+        for col_num, length in enumerate(lengths, 1):
+            sheet.column_dimensions[get_column_letter(col_num)].width = length + 3
+
+        # Добавляем заголовок отчета
+        self._add_xlsx_title(sheet, title, width)
+
+        # Стили ячеек
+        header_font = Font(bold=True)
+        center_alignment = Alignment(horizontal='center', vertical='center')
+        border = Border(
+            left=Side(border_style='thin', color='FF000000'),
+            right=Side(border_style='thin', color='FF000000'),
+            top=Side(border_style='thin', color='FF000000'),
+            bottom=Side(border_style='thin', color='FF000000'),
         )
 
-        sheet.insert_rows(4)
-        sheet.merge_cells(start_row=4, start_column=1, end_row=4, end_column=width)
+        def get_cell(value, *, font=None, alignment=None):
+            cell = WriteOnlyCell(sheet, value=value)
+            cell.border = border
+            if font is not None:
+                cell.font = font
+            if alignment is not None:
+                cell.alignment = alignment
+            return cell
+
+        # Добавляем заголовок в таблицу
+        sheet.append([
+            get_cell(value, font=header_font, alignment=center_alignment)
+            for value in header
+        ])
+
+        # Добавляем строки в таблицу
+        for row in rows:
+            sheet.append([
+                get_cell(
+                    value,
+                    alignment=center_alignment
+                    if col_num in centered and value is not None
+                    else None,
+                )
+                for col_num, value in enumerate(row, 1)
+            ])
+
+        if total is None:
+            return
+
+        # Добавляем строку Total
+        row_num = len(rows) + 6
+        sheet.append([
+            get_cell(
+                value,
+                font=header_font if value is not None else None,
+                alignment=center_alignment if col_num >= total_from else None,
+            )
+            for col_num, value in enumerate(total, 1)
+        ])
+
+        # Объединяем ячейки заголовка строки Total
+        if total_from > 2:
+            sheet.merged_cells.add(CellRange(
+                min_row=row_num, min_col=1,
+                max_row=row_num, max_col=total_from - 1,
+            ))
 
     def assignment_report(self, **kwargs):
         """Формирует отчет.
@@ -299,27 +547,30 @@ class ReportBuilder:
             hdr_cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
             hdr_cell.paragraphs[0].add_run(value).bold = True
 
-        # Добавляем вертикальный заголовок
-        for value in employes:
+        # Заполняем матрицу
+        matrix = ReportMatrix(employes, header[1:])
+        for employee, number, project, hours in data:
+            matrix['{} [{}]'.format(employee, number), project] = hours
+
+        # Добавляем строки матрицы в таблицу
+        for employee, *values in matrix:
             row_cells = table.add_row().cells
-            row_cells[0].text = str(value)
+            # Добавляем вертикальный заголовок
+            row_cells[0].text = str(employee)
 
-        # Заполняем таблицу (матрицу)
-        for employee, number, project, hours in data:
-            # Определяем ячейку для записи
-            row = employes.index('{} [{}]'.format(employee, number)) + 1
-            col = header.index(project)
-
-            # Добавляем данные в ячейку
-            hours_cell = table.cell(row, col)
-            hours_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-            hours_cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            # Значение Hours преобразуем в целое
-            # (при отсутствии дробной части)
-            if isinstance(hours, float) and hours.is_integer():
-                hours_cell.paragraphs[0].add_run(str(int(hours)))
-            else:
-                hours_cell.paragraphs[0].add_run(str(hours))
+            for hours_cell, hours in zip(row_cells[1:], values):
+                if hours is None:
+                    continue
+
+                # Добавляем данные в ячейку
+                hours_cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
+                hours_cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+                # Значение Hours преобразуем в целое
+                # (при отсутствии дробной части)
+                if isinstance(hours, float) and hours.is_integer():
+                    hours_cell.paragraphs[0].add_run(str(int(hours)))
+                else:
+                    hours_cell.paragraphs[0].add_run(str(hours))
 
         return document
 
@@ -335,17 +586,14 @@ class ReportBuilder:
 
         # Создаем пустой документ
         document = self._get_xlsx_document(
+            title,
             orientation=kwargs.get('orientation'),
         )
         sheet = document.active
-        sheet.title = title
 
         if not data:
             # Возвращаем пустой отчет
-            self._add_xlsx_title(sheet, title, 9)
-            sheet.merge_cells(start_row=5, start_column=1, end_row=5, end_column=9)
-            cell = sheet.cell(row=5, column=1)
-            cell.value = self.empty_text
+            self._add_xlsx_empty_text(sheet, title, 9)
             return document
 
         # Список сотрудников с табельными номерами
@@ -360,48 +608,16 @@ class ReportBuilder:
         header.insert(0, gettext('Employees'))
         header.append(absence_name)
 
-        # Добавяем заголовок в таблицу
-        header_font = Font(bold=True)
-        center_alignment = Alignment(horizontal='center', vertical='center')
-
-        for col_num, column_title in enumerate(header, 1):
-            cell = sheet.cell(row=1, column=col_num)
-            cell.value = column_title
-            cell.alignment = center_alignment
-            cell.font = header_font
-
-        # Добавляем вертикальный заголовок
-        for row_num, value in enumerate(employes, 2):
-            cell = sheet.cell(row=row_num, column=1)
-            cell.value = value
-
         # Заполняем таблицу (матрицу)
+        matrix = ReportMatrix(employes, header[1:])
         for employee, number, project, hours in data:
-            row = employes.index('{} [{}]'.format(employee, number)) + 2
-            col = header.index(project) + 1
-
-            cell = sheet.cell(row=row, column=col)
-            cell.value = hours
-            cell.alignment = center_alignment
-
-        # Устанавливаем ширину столбцов
-        for column_cells in sheet.columns:
-            length = max(len(str(cell.value)) for cell in column_cells)
-            sheet.column_dimensions[column_cells[0].column_letter].width = length + 3
+            matrix['{} [{}]'.format(employee, number), project] = hours
 
-        # Границы таблицы
-        border = Border(
-            left=Side(border_style='thin', color='FF000000'),
-            right=Side(border_style='thin', color='FF000000'),
-            top=Side(border_style='thin', color='FF000000'),
-            bottom=Side(border_style='thin', color='FF000000'),
+        # Добавляем заголовок отчета и таблицу
+        self._add_xlsx_table(
+            sheet, title, header, matrix,
+            centered=range(2, len(header) + 1),
         )
-        for row in sheet.iter_rows():
-            for cell in row:
-                cell.border = border
-
-        # Добавляем заголовок отчета
-        self._add_xlsx_title(sheet, title, len(header))
 
         return document
 
@@ -416,17 +632,14 @@ class ReportBuilder:
 
         # Создаем пустой документ
         document = self._get_xlsx_document(
+            title,
             orientation=kwargs.get('orientation'),
         )
         sheet = document.active
-        sheet.title = title
 
         if not data:
             # Возвращаем пустой отчет
-            self._add_xlsx_title(sheet, title, 10)
-            sheet.merge_cells(start_row=5, start_column=1, end_row=5, end_column=10)
-            cell = sheet.cell(row=5, column=1)
-            cell.value = self.empty_text
+            self._add_xlsx_empty_text(sheet, title, 10)
             return document
 
         # Заголовок таблицы
@@ -436,60 +649,13 @@ class ReportBuilder:
             gettext('Hours assigned'), gettext('Absence hours'),
             gettext('Hours total'), gettext('Work hours'), gettext('Difference'),
         )
-        header_font = Font(bold=True)
-        center_alignment = Alignment(horizontal='center', vertical='center')
-
-        # Добавляем заголовок в таблицу
-        for col_num, column_title in enumerate(header, 1):
-            cell = sheet.cell(row=1, column=col_num)
-            cell.value = column_title
-            cell.alignment = center_alignment
-            cell.font = header_font
-
-        # Добавляем строки в таблицу
-        for row_num, item in enumerate(data, 2):
-            for col_num, value in enumerate(item, 1):
-                cell = sheet.cell(row=row_num, column=col_num)
-                cell.value = value
-                if col_num >= 5 or col_num == 2:
-                    cell.alignment = center_alignment
-
-        # Добавляем строку Total
-        row_num = len(data) + 2
-        cell = sheet.cell(row=row_num, column=1)
-        cell.value = gettext('Total')
-        cell.font = header_font
-        for col_num, value in enumerate(header[4:], 5):
-            cell = sheet.cell(row=row_num, column=col_num)
-            cell.value = "=SUM({col}{start_row}:{col}{end_row})".format(
-                col=get_column_letter(col_num),
-                start_row=6,
-                end_row=row_num + 3,
-            )
-            cell.alignment = center_alignment
-            cell.font = header_font
-
-        # Устанавливаем ширину столбцов
-        for column_cells in sheet.columns:
-            length = max(len(str(cell.value)) for cell in column_cells)
-            sheet.column_dimensions[column_cells[0].column_letter].width = length + 3
 
-        # Границы таблицы
-        border = Border(
-            left=Side(border_style='thin', color='FF000000'),
-            right=Side(border_style='thin', color='FF000000'),
-            top=Side(border_style='thin', color='FF000000'),
-            bottom=Side(border_style='thin', color='FF000000'),
+        # Добавляем заголовок отчета и таблицу со строкой Total
+        self._add_xlsx_table(
+            sheet, title, header, data,
+            centered=(2, *range(5, len(header) + 1)),
+            total_from=5,
         )
-        for row in sheet.iter_rows():
-            for cell in row:
-                cell.border = border
-
-        # Добавляем заголовок
-        self._add_xlsx_title(sheet, title, len(header))
-
-        # Объединяем ячейки заголовка строки Total
-        sheet.merge_cells(start_row=row_num + 4, start_column=1, end_row=row_num + 4, end_column=4)
 
         return document
 
@@ -509,17 +675,14 @@ class ReportBuilder:
 
         # Создаем пустой документ
         document = self._get_xlsx_document(
+            title,
             orientation=kwargs.get('orientation'),
         )
         sheet = document.active
-        sheet.title = title
 
         if not data:
             # Возвращаем пустой отчет
-            self._add_xlsx_title(sheet, title, 9)
-            sheet.merge_cells(start_row=5, start_column=1, end_row=5, end_column=9)
-            cell = sheet.cell(row=5, column=1)
-            cell.value = self.empty_text
+            self._add_xlsx_empty_text(sheet, title, 9)
             return document
 
         # Список сторудников с табельными номерами
@@ -534,73 +697,20 @@ class ReportBuilder:
         header.insert(0, gettext('Employees'))
         header.extend((absence_name, total_hours_name, staff_units_name))
 
-        header_font = Font(bold=True)
-        center_alignment = Alignment(horizontal='center', vertical='center')
-
-        # Добавляем заголовок в таблицу
-        for col_num, column_title in enumerate(header, 1):
-            cell = sheet.cell(row=1, column=col_num)
-            cell.value = column_title
-            cell.alignment = center_alignment
-            cell.font = header_font
-
-        # Добавляем сотрудников в таблицу
-        for row_num, value in enumerate(employes, 2):
-            cell = sheet.cell(row=row_num, column=1)
-            cell.value = value
-
-        # Добавляем данные в таблицу
+        # Добавляем данные в таблицу (матрицу)
+        matrix = ReportMatrix(employes, header[1:])
         for employee, number, staff_units, project, hours, total_hours in data:
-            row = employes.index('{} [{}]'.format(employee, number)) + 2
-            col = header.index(project) + 1
-
-            cell = sheet.cell(row=row, column=col)
-            cell.value = hours
-            cell.alignment = center_alignment
-
-            col = header.index(staff_units_name) + 1
-            cell = sheet.cell(row=row, column=col)
-            cell.value = staff_units
-            cell.alignment = center_alignment
-
-            col = header.index(total_hours_name) + 1
-            cell = sheet.cell(row=row, column=col)
-            cell.value = total_hours
-            cell.alignment = center_alignment
-
-        # Добавляем строку Total
-        row_num = len(employes) + 2
-        cell = sheet.cell(row=row_num, column=1)
-        cell.value = gettext('Total')
-        cell.font = header_font
-        for col_num, value in enumerate(header[1:], 2):
-            cell = sheet.cell(row=row_num, column=col_num)
-            cell.value = "=SUM({col}{start_row}:{col}{end_row})".format(
-                col=get_column_letter(col_num),
-                start_row=6,
-                end_row=row_num + 3,
-            )
-            cell.alignment = center_alignment
-            cell.font = header_font
-
-        # Устанавливаем ширину столбцов
-        for column_cells in sheet.columns:
-            length = max(len(str(cell.value)) for cell in column_cells)
-            sheet.column_dimensions[column_cells[0].column_letter].width = length + 3
-
-        # Границы таблицы
-        border = Border(
-            left=Side(border_style='thin', color='FF000000'),
-            right=Side(border_style='thin', color='FF000000'),
-            top=Side(border_style='thin', color='FF000000'),
-            bottom=Side(border_style='thin', color='FF000000'),
+            row = '{} [{}]'.format(employee, number)
+            matrix[row, project] = hours
+            matrix[row, staff_units_name] = staff_units
+            matrix[row, total_hours_name] = total_hours
+
+        # Добавляем заголовок отчета и таблицу со строкой Total
+        self._add_xlsx_table(
+            sheet, title, header, matrix,
+            centered=range(2, len(header) + 1),
+            total_from=2,
         )
-        for row in sheet.iter_rows():
-            for cell in row:
-                cell.border = border
-
-        # Добавляем заголовок
-        self._add_xlsx_title(sheet, title, len(header))
 
         return document
 
@@ -615,17 +725,14 @@ class ReportBuilder:
 
         # Создаем пустой документ
         document = self._get_xlsx_document(
+            title,
             orientation=kwargs.get('orientation'),
         )
         sheet = document.active
-        sheet.title = title
 
         if not data:
             # Возвращаем пустой отчет
-            self._add_xlsx_title(sheet, title, 9)
-            sheet.merge_cells(start_row=5, start_column=1, end_row=5, end_column=9)
-            cell = sheet.cell(row=5, column=1)
-            cell.value = self.empty_text
+            self._add_xlsx_empty_text(sheet, title, 9)
             return document
 
         # Список сторудников с табельными номерами
@@ -637,62 +744,16 @@ class ReportBuilder:
         header = sorted(list(set(item[2] for item in data)))
         header.insert(0, gettext('Employees'))
 
-        header_font = Font(bold=True)
-        center_alignment = Alignment(horizontal='center', vertical='center')
-
-        # Добавляем заголовок в таблицу
-        for col_num, column_title in enumerate(header, 1):
-            cell = sheet.cell(row=1, column=col_num)
-            cell.value = column_title
-            cell.alignment = center_alignment
-            cell.font = header_font
-
-        # Добавляем сотрудников в таблицу
-        for row_num, value in enumerate(employes, 2):
-            cell = sheet.cell(row=row_num, column=1)
-            cell.value = value
-
-        # Добавляем данные в таблицу
+        # Добавляем данные в таблицу (матрицу)
+        matrix = ReportMatrix(employes, header[1:])
         for employee, number, project, hours in data:
-            row = employes.index('{} [{}]'.format(employee, number)) + 2
-            col = header.index(project) + 1
+            matrix['{} [{}]'.format(employee, number), project] = hours
 
-            cell = sheet.cell(row=row, column=col)
-            cell.value = hours
-            cell.alignment = center_alignment
-
-        # Добавляем строку Total
-        row_num = len(employes) + 2
-        cell = sheet.cell(row=row_num, column=1)
-        cell.value = gettext('Total')
-        cell.font = header_font
-        for col_num, value in enumerate(header[1:], 2):
-            cell = sheet.cell(row=row_num, column=col_num)
-            cell.value = "=SUM({col}{start_row}:{col}{end_row})".format(
-                col=get_column_letter(col_num),
-                start_row=6,
-                end_row=row_num + 3,
-            )
-            cell.alignment = center_alignment
-            cell.font = header_font
-
-        # Устанавливаем ширину столбцов
-        for column_cells in sheet.columns:
-            length = max(len(str(cell.value)) for cell in column_cells)
-            sheet.column_dimensions[column_cells[0].column_letter].width = length + 3
-
-        # Границы таблицы
-        border = Border(
-            left=Side(border_style='thin', color='FF000000'),
-            right=Side(border_style='thin', color='FF000000'),
-            top=Side(border_style='thin', color='FF000000'),
-            bottom=Side(border_style='thin', color='FF000000'),
+        # Добавляем заголовок отчета и таблицу со строкой Total
+        self._add_xlsx_table(
+            sheet, title, header, matrix,
+            centered=range(2, len(header) + 1),
+            total_from=2,
         )
-        for row in sheet.iter_rows():
-            for cell in row:
-                cell.border = border
-
-        # Добавляем заголовок
-        self._add_xlsx_title(sheet, title, len(header))
 
         return document
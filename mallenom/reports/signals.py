@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from core.signals import bulk_changed
+
+from .cache import report_cache
+
+# Приложения, данные которых используются в отчетах
+REPORT_APPS = ('staffing', 'employee', 'schedule', 'workcal')
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(m2m_changed)
+@receiver(bulk_changed)
+def invalidate_report_cache(sender, **kwargs):
+    """Изменяет номер версии данных для отчетов
+    при изменении данных, используемых в отчетах
+    (в том числе массовом, см. core.signals.bulk_changed).
+    """
+    if sender._meta.app_label in REPORT_APPS:
+        report_cache.invalidate()
@@ -1,3 +1,453 @@
-from django.test import TestCase
+import datetime
+import os
+import random
+import time
+import tracemalloc
+from copy import deepcopy
+from unittest import skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .cache import report_cache
+from .frame import ReportFrame
+from .jobs import get_cached_report_content, get_report_response
+from .models import ReportJob
+from .utils import DataBuilder
+
+# Тесты производительности зависят от нагрузки на систему
+# и запускаются только при заданной переменной окружения BENCHMARK
+benchmark = skipUnless(
+    os.environ.get('BENCHMARK'), "Set BENCHMARK=1 to run benchmarks",
+)
+
+
+def update_data_reference(data, addition, key_fields, update_fields, factor=1):
+    """Прежняя реализация DataBuilder._update_data (копирование
+    списков и поиск элемента перебором data), используется
+    для проверки результатов.
+    """
+    data = deepcopy(data)
+    addition = deepcopy(addition)
+
+    for item in addition:
+        for field in update_fields:
+            item[field] *= factor
+
+        index = next((
+            index for index, value in enumerate(data)
+            if all([value[field] == item[field] for field in key_fields])
+        ), None)
+
+        if index is not None:
+            for field in update_fields:
+                data[index][field] += item[field]
+        else:
+            data.append(item)
+
+    return data
+
+
+def get_assignment_rows(employments, projects, seed=0):
+    """Возвращает строки назначений вида
+    [{'number': номер, 'project': проект, 'hours': часы},...]
+    для employments табельных номеров и projects проектов.
+    """
+    generator = random.Random(seed)
+    return [
+        {
+            'number': 'N{}'.format(number),
+            'project': 'P{}'.format(project),
+            'hours': generator.randint(1, 40),
+        }
+        for number in range(employments)
+        for project in range(projects)
+    ]
+
+
+def get_frame(rows, fields=('number', 'project', 'hours')):
+    """Возвращает ReportFrame со строками rows
+    (см. get_assignment_rows).
+    """
+    return ReportFrame.from_rows(
+        [tuple(row[field] for field in fields) for row in rows], fields,
+    )
+
+
+def get_assignment_query_rows(employments, projects, seed=0):
+    """Возвращает строки запроса о назначениях
+    (см. DataBuilder._get_assignment_queryset).
+    """
+    generator = random.Random(seed)
+    return sorted((
+        (
+            number,
+            'Employee {}'.format(number),
+            'N{}'.format(number),
+            'Department {}'.format(number % 10),
+            'Position {}'.format(number % 20),
+            1.0,
+            'P{}'.format(project),
+            generator.randint(1, 40),
+        )
+        for number in range(employments)
+        for project in range(projects)
+    ), key=lambda row: (row[1], row[2], row[6]))
+
+
+def assignment_data_reference(rows, fields):
+    """Прежняя реализация DataBuilder._get_assignment_rows
+    (словарь для каждой строки запроса, затем столбцы
+    ReportFrame), используется для проверки результатов.
+    """
+    rows = [dict(zip(DataBuilder.assignment_fields, row)) for row in rows]
+
+    employment_hours = {}
+    for row in rows:
+        employment = row['employment']
+        employment_hours[employment] = employment_hours.get(
+            employment, 0,
+        ) + row['project_hours']
+
+    data = {}
+    for row in rows:
+        row['employment_hours'] = employment_hours[row['employment']]
+        item = {field: row[field] for field in fields}
+        data.setdefault(tuple(item.values()), item)
+    records = list(data.values())
+
+    return ReportFrame({
+        field: [record.get(field) for record in records] for field in fields
+    })
+
+
+def round_iterable_reference(iterable, whole, precision=2):
+    """Прежняя реализация DataBuilder._round_iterable (округление
+    значений одной группы), используется для проверки результатов.
+    """
+    result = [
+        [index, *divmod(item * 10 ** precision, 1)]
+        for index, item in enumerate(iterable)
+    ]
+    delta = int(whole * 10 ** precision) - sum([int(item[1]) for item in result])
+
+    if delta > len(result):
+        raise ValueError("Iterable sum must be"
+                         " almost equal whole value: {whole}".format(
+                             whole=whole,
+                         ))
+
+    result = sorted(result, key=lambda i: i[-1], reverse=True)
+    for index in range(delta):
+        result[index][1] += 1
+
+    result = sorted(result, key=lambda i: i[0])
+    return [item[1] / 10 ** precision for item in result]
+
+
+def round_groups_reference(values, groups, wholes, precision=2):
+    """Прежнее округление данных отчета: значения каждой группы
+    выбираются перебором всех данных и округляются отдельно.
+    """
+    result = list(values)
+    for group, whole in wholes.items():
+        indexes, items = zip(*[
+            (index, item)
+            for index, item in enumerate(values)
+            if groups[index] == group
+        ])
+        for index, item in zip(
+                indexes, round_iterable_reference(items, whole, precision),
+        ):
+            result[index] = item
+    return result
+
+
+def get_share_rows(employments, projects, seed=0, scale=False):
+    """Возвращает доли часов по проектам вида (values, groups)
+    для employments табельных номеров и projects проектов.
+    Доли внутри группы часто совпадают (одинаковые остатки
+    при округлении). Сумма долей группы равна 1, если не
+    задан scale.
+    """
+    generator = random.Random(seed)
+    values = []
+    groups = []
+    for number in range(employments):
+        hours = [generator.choice((8, 8, 12, 20, 40)) for _ in range(projects)]
+        total = sum(hours)
+        if scale:
+            total *= generator.choice((1, 3, 7))
+        values.extend(item / total for item in hours)
+        groups.extend(['N{}'.format(number)] * projects)
+    return values, groups
+
+
+def get_wholes(values, groups, precision=2):
+    """Возвращает округленные суммы значений групп."""
+    wholes = {}
+    for group, item in zip(groups, values):
+        wholes[group] = wholes.get(group, 0) + item
+    return {group: round(item, precision) for group, item in wholes.items()}
+
+
+class UpdateDataTest(SimpleTestCase):
+    fields = ('number', 'project', 'hours')
+    key_fields = ('number', 'project')
+    update_fields = ('hours', )
+
+    def test_matches_reference(self):
+        """Результат совпадает с прежней реализацией, в том числе
+        для отсутствующих в data и повторяющихся элементов.
+        """
+        generator = random.Random(1)
+        data = get_assignment_rows(50, 5, seed=2)
+        addition = get_assignment_rows(80, 4, seed=3)
+        # Повторяющиеся элементы addition
+        addition.extend(deepcopy(generator.sample(addition, 40)))
+        generator.shuffle(addition)
+
+        for factor in (1, 0.6):
+            expected = update_data_reference(
+                data, addition, self.key_fields, self.update_fields, factor,
+            )
+            result = get_frame(data).update(
+                get_frame(addition),
+                self.key_fields, self.update_fields, factor,
+            )
+            self.assertEqual(result.rows(self.fields), [
+                [item[field] for field in self.fields] for item in expected
+            ])
+
+    def test_empty(self):
+        """Строки добавляются в пустую таблицу
+        без полей, повторяющиеся - суммируются.
+        """
+        addition = get_assignment_rows(3, 2)
+        result = ReportFrame().update(
+            get_frame(addition + addition), self.key_fields, self.update_fields,
+        )
+        self.assertEqual(result.rows(self.fields), [
+            [item['number'], item['project'], item['hours'] * 2]
+            for item in addition
+        ])
+
+
+@benchmark
+class UpdateDataBenchmark(SimpleTestCase):
+    """Время обновления данных отчета по 5000 табельных номеров
+    и 20 проектов растет линейно с колличеством строк.
+    """
+    projects = 20
+    employments = (1000, 5000)
+
+    def _measure(self, employments, repeat=3):
+        result = []
+        for _ in range(repeat):
+            data = get_frame(get_assignment_rows(employments, self.projects, seed=1))
+            addition = get_frame(get_assignment_rows(employments, self.projects, seed=2))
+
+            started = time.perf_counter()
+            data.update(addition, ('number', 'project'), ('hours', ), 0.6)
+            result.append(time.perf_counter() - started)
+        return min(result)
+
+    def test_linear_scaling(self):
+        small, large = self.employments
+        small_time = self._measure(small)
+        large_time = self._measure(large)
+
+        # При линейном росте время увеличивается в 5 раз
+        # (при переборе data - в 25 раз)
+        self.assertLess(large_time, small_time * (large / small) * 2.5)
+
+
+class AssignmentDataTest(SimpleTestCase):
+    """Данные о назначениях формируются из строк запроса
+    сразу по столбцам, без словаря для каждой строки.
+    """
+    # Отчет без неполных недель (без запросов к БД)
+    start = datetime.date(2019, 1, 7)
+    end = datetime.date(2019, 2, 3)
+    fields = ('employee', 'number', 'project', 'project_hours', 'employment_hours')
+
+    def _get_builder(self, rows):
+        builder = DataBuilder(self.start, self.end)
+        builder._queries[('assignment', self.start, self.end)] = rows
+        return builder
+
+    def _get_peak(self, function):
+        tracemalloc.start()
+        try:
+            function()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_matches_reference(self):
+        rows = get_assignment_query_rows(50, 5)
+        # Повторяющиеся строки
+        rows.extend(rows[:10])
+
+        for fields in (self.fields, ('number', 'employment_hours')):
+            self.assertEqual(
+                self._get_builder(rows)._get_assignment_data(fields).columns,
+                assignment_data_reference(rows, fields).columns,
+            )
+
+    def test_memory(self):
+        rows = get_assignment_query_rows(2000, 10)
+
+        reference_peak = self._get_peak(
+            lambda: assignment_data_reference(rows, self.fields)
+        )
+        builder = self._get_builder(rows)
+        peak = self._get_peak(
+            lambda: builder._get_assignment_data(self.fields)
+        )
+
+        self.assertLess(peak, reference_peak / 2)
+
+
+class RoundGroupsTest(SimpleTestCase):
+    def test_matches_reference(self):
+        """Результат совпадает с прежним округлением
+        каждой группы отдельно, в том числе при равных
+        отбрасываемых частях.
+        """
+        builder = DataBuilder(None, None)
+        for seed in range(5):
+            for scale in (False, True):
+                values, groups = get_share_rows(40, 6, seed=seed, scale=scale)
+                # Группы не обязательно идут подряд
+                rows = list(zip(values, groups))
+                random.Random(seed).shuffle(rows)
+                values, groups = map(list, zip(*rows))
+
+                wholes = get_wholes(values, groups)
+                self.assertEqual(
+                    builder._round_groups(values, groups, wholes),
+                    round_groups_reference(values, groups, wholes),
+                )
+
+    def test_invalid_whole(self):
+        builder = DataBuilder(None, None)
+        with self.assertRaises(ValueError):
+            builder._round_groups([0.1, 0.2], ['N1', 'N1'], {'N1': 1})
+
+
+@benchmark
+class RoundGroupsBenchmark(SimpleTestCase):
+    """Округление данных отчета по 2000 табельных номеров
+    и 10 проектов за один проход быстрее округления
+    каждой группы отдельно.
+    """
+    projects = 10
+    employments = 2000
+
+    def test_faster_than_reference(self):
+        builder = DataBuilder(None, None)
+        values, groups = get_share_rows(self.employments, self.projects)
+        wholes = {group: 1 for group in groups}
+
+        started = time.perf_counter()
+        expected = round_groups_reference(values, groups, wholes)
+        reference_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = builder._round_groups(values, groups, wholes)
+        result_time = time.perf_counter() - started
+
+        self.assertEqual(result, expected)
+        self.assertLess(result_time, reference_time)
+
+
+class ReportResponseTest(TestCase):
+    params = {
+        'report': 'assignment_matrix_report_xlsx',
+        'start': datetime.date(2019, 1, 1),
+        'end': datetime.date(2019, 1, 31),
+        'orientation': 'portrait',
+        'language': 'en',
+    }
+
+    def setUp(self):
+        report_cache.invalidate()
+
+    def _get_content(self, response):
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def test_streamed_and_cached(self):
+        """Сформированный отчет передается частями и помещается
+        в кэш, повторный запрос использует кэш.
+        """
+        response = get_report_response(**self.params)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        content = self._get_content(response)
+        self.assertEqual(int(response['Content-Length']), len(content))
+
+        self.assertEqual(get_cached_report_content(**self.params)[0], content)
+        response = get_report_response(**self.params)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content, content)
+
+    @override_settings(REPORTS_CACHE_MAX_SIZE=0)
+    def test_large_not_cached(self):
+        """Отчет, превышающий REPORTS_CACHE_MAX_SIZE,
+        передается частями и не помещается в кэш.
+        """
+        for _ in range(2):
+            response = get_report_response(**self.params)
+            self.assertIsInstance(response, StreamingHttpResponse)
+            self.assertTrue(self._get_content(response))
+        self.assertIsNone(get_cached_report_content(**self.params))
+
+
+class ReportJobStatusTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('user')
+        cls.job = ReportJob.objects.create(
+            report='assignment_matrix_report_xlsx',
+            start=datetime.date(2019, 1, 1),
+            end=datetime.date(2019, 1, 31),
+            orientation='portrait',
+            language='en',
+            user=cls.user,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_failed(self):
+        """Состояние завершившегося с ошибкой задания содержит
+        ошибку, страница задания не проверяет состояние.
+        """
+        self.job.status = ReportJob.FAILED
+        self.job.error = 'Error'
+        self.job.save()
+
+        response = self.client.get(self.job.get_status_url())
+        status = response.json()
+        self.assertTrue(status.pop('status_display'))
+        self.assertEqual(status, {
+            'status': ReportJob.FAILED,
+            'error': 'Error',
+            'download_url': None,
+        })
+
+        response = self.client.get(self.job.get_absolute_url())
+        self.assertNotContains(response, 'reports-reportjob_detail.js')
+
+    def test_pending(self):
+        response = self.client.get(self.job.get_absolute_url())
+        self.assertContains(response, 'reports-reportjob_detail.js')
+
+    def test_other_user(self):
+        """Задания других пользователей недоступны."""
+        self.client.force_login(get_user_model().objects.create_user('other'))
+        response = self.client.get(self.job.get_status_url())
+        self.assertEqual(response.status_code, 404)
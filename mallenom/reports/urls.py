@@ -1,10 +1,18 @@
-from django.urls import path
+from django.urls import path, include
 
 from . import views
 
 
 app_name = 'reports'
 
+job = [
+    path('<int:pk>/', views.ReportJobDetail.as_view(), name='detail'),
+    path('<int:pk>/status/', views.ReportJobStatus.as_view(), name='status'),
+    path('<int:pk>/download/', views.ReportJobDownload.as_view(), name='download'),
+]
+
 urlpatterns = [
     path('', views.ReportDownload.as_view(), name='report'),
+    path('bundle/', views.ReportBundleDownload.as_view(), name='bundle'),
+    path('jobs/', include((job, 'job'))),
 ]
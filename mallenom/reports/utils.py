@@ -1,15 +1,29 @@
 import datetime
-from copy import deepcopy
+from collections import Counter
+from operator import itemgetter
 
-from django.db.models import F, Value as V, Sum, PositiveSmallIntegerField
-from django.db.models.expressions import Subquery, OuterRef
+from django.db.models import F, Value as V, Sum
 from django.db.models.functions import Concat, Coalesce
 
 from workcal.models import Day
-from schedule.models import Assignment, ProjectAssignment, Absence
+from schedule.models import WeekHours, Absence
+
+from .frame import ReportFrame
 
 
 class DataBuilder:
+    # Поля данных о назначениях (по порядку значений в строках запроса)
+    assignment_fields = (
+        'employment', 'employee', 'number', 'department',
+        'position', 'staff_units', 'project', 'project_hours',
+    )
+
+    # Поля данных об отсутствиях
+    absence_fields = (
+        'employee', 'number', 'department',
+        'position', 'staff_units', 'absence_hours',
+    )
+
     def __init__(self, start, end, **kwargs):
         """Формирует данные для размещения в отчетах.
 
@@ -28,51 +42,41 @@ class DataBuilder:
         # Точность округления
         self.precision = kwargs.get('precision', 2)
 
+        # Результаты запросов к БД, общие для всех отчетов
+        self._queries = {}
+
+    def prefetch(self):
+        """Выполняет запросы к БД для всех отчетов заранее.
+
+        Экземпляр с полученными данными используется для
+        формирования нескольких отчетов без повторных
+        запросов о назначениях и отсутствиях.
+        """
+        self._get_assignment_data(('number', ))
+        self._get_absence_data(('number', ))
+
     @staticmethod
-    def _get_assignment_queryset(start, end, *fields):
-        """Формирует queryset к Assignment.
+    def _get_assignment_queryset(start, end):
+        """Формирует queryset к сводной таблице WeekHours,
+        содержащий часы по проектам для каждой должности (employment).
+
+        Записи группируются по должности и проекту,
+        поэтому данные получаются одним запросом.
 
         Args:
             start - начальная дата
             end - конечная дата
-            *fields - поля запроса
 
         Returns:
             queryset
         """
 
-        # Сумма часов по проекту для должности (employment)
-        project_hours = Subquery(
-            ProjectAssignment.objects.filter(
-                project=OuterRef('projectassignments__project'),
-                assignment__employment=OuterRef('employment'),
-                assignment__start__gte=start,
-                assignment__end__lte=end,
-            ).values('project').order_by('project').annotate(
-                sum=Coalesce(Sum('hours'), 0)
-            ).values('sum'),
-            output_field=PositiveSmallIntegerField(),
-        )
-
-        # Общая сумма часов для должности (employment)
-        employment_hours = Subquery(
-            ProjectAssignment.objects.filter(
-                assignment__employment=OuterRef('employment'),
-                assignment__start__gte=start,
-                assignment__end__lte=end,
-            ).values('assignment__employment').order_by(
-                'assignment__employment'
-            ).annotate(
-                sum=Coalesce(Sum('hours'), 0)
-            ).values('sum'),
-            output_field=PositiveSmallIntegerField(),
-        )
-
-        # Выбираем записи полностью попадающие в интервал
-        queryset = Assignment.objects.filter(
-            projects__isnull=False,
-            start__gte=start,
-            end__lte=end,
+        # Выбираем недели полностью попадающие в интервал
+        queryset = WeekHours.objects.filter(
+            week__gte=start,
+            week__lte=end - datetime.timedelta(days=6),
+        ).values(
+            'employment', 'project',
         ).annotate(
             employee=Concat(
                 F('employment__employee__last_name'), V(' '),
@@ -83,13 +87,65 @@ class DataBuilder:
             department=F('employment__staffing__department__name'),
             position=F('employment__staffing__position__name'),
             staff_units=F('employment__count'),
-            employment_hours=Coalesce(employment_hours, 0),
-            project=F('projectassignments__project__name'),
-            project_hours=Coalesce(project_hours, 0),
-        ).order_by('employee').values(*fields).distinct()
+            project_name=F('project__name'),
+            project_hours=Coalesce(Sum('hours'), 0),
+        ).order_by().values_list(
+            'employment', 'employee', 'number', 'department',
+            'position', 'staff_units', 'project_name', 'project_hours',
+        )
 
         return queryset
 
+    def _get_assignment_rows(self, start, end, fields):
+        """Формирует данные о назначениях, полностью
+        входящих в интервал.
+
+        Сводит результат запроса по должностям: сумма часов
+        для должности (employment_hours) вычисляется из часов
+        по проектам. Столбцы таблицы формируются из строк
+        запроса без промежуточных словарей.
+
+        Args:
+            start - начальная дата
+            end - конечная дата
+            fields - поля, которые должны присутсвовать в данных
+
+        Returns:
+            ReportFrame с полями fields
+        """
+
+        key = ('assignment', start, end)
+        if key not in self._queries:
+            # Упорядочиваем по сотруднику, должности и проекту
+            self._queries[key] = sorted(
+                self._get_assignment_queryset(start, end),
+                key=itemgetter(1, 2, 6),
+            )
+        rows = self._queries[key]
+
+        position = {field: index for index, field in enumerate(self.assignment_fields)}
+        employment = position['employment']
+        project_hours = position['project_hours']
+
+        # Общая сумма часов для должности (employment)
+        employment_hours = {}
+        for row in rows:
+            employment_hours[row[employment]] = employment_hours.get(
+                row[employment], 0,
+            ) + row[project_hours]
+
+        # Оставляем требуемые поля, убирая дубликаты
+        getters = [
+            (lambda row: employment_hours[row[employment]])
+            if field == 'employment_hours' else itemgetter(position[field])
+            for field in fields
+        ]
+        data = dict.fromkeys(
+            tuple(getter(row) for getter in getters) for row in rows
+        )
+
+        return ReportFrame.from_rows(data, fields)
+
     @staticmethod
     def _get_absence_queryset(start, end, *fields):
         """Формирует queryset к Absence.
@@ -100,7 +156,7 @@ class DataBuilder:
             *fields - поля запроса
 
         Returns:
-            queryset
+            queryset (кортежи значений fields)
         """
 
         # Выбираем записи частично попадающие в интервал
@@ -118,96 +174,60 @@ class DataBuilder:
             position=F('employment__staffing__position__name'),
             staff_units=F('employment__count'),
             absence_hours=F('hours'),
-        ).order_by('employee').values(*fields).distinct()
+        ).order_by('employee').values_list(*fields).distinct()
 
         return queryset
 
-    @staticmethod
-    def _update_data(data, addition, key_fields, update_fields, factor=1):
-        """Обновляет список data данными из addition:
-
-        Ищет элементы в списках data и addition, значения полей key_fields
-        которых совпадают. Суммирует значения соответствующих полей
-        update_fields, результат сохраняет в data. Если элемент из addition
-        отсутсвует в data, он туда добавляется.
-
-        Args:
-            data, addition, key_fields, update_fields
-
-        Kwargs:
-            factor - множитель, модификатор значений полей
-                update_fields из addition при добавлении
-
-        Returns:
-            модифицированную копию data
-        """
-
-        data = deepcopy(data)
-        addition = deepcopy(addition)
-
-        for item in addition:
-            # Обновляем значения update_fields в addition
-            for field in update_fields:
-                item[field] *= factor
+    def _round_groups(self, values, groups, wholes):
+        """Округляет значения из списка values так, чтобы
+        сумма округленных значений каждой группы была равна
+        округленной сумме значений группы - wholes[group].
 
-            # Ищем элемент в data по key_fields
-            index = next((
-                index for index, value in enumerate(data)
-                if all([value[field] == item[field] for field in key_fields])
-            ), None)
-
-            # Если элемент найден
-            if index is not None:
-                # Обновляем update_fields в data
-                for field in update_fields:
-                    data[index][field] += item[field]
-            else:
-                data.append(item)
-
-        return data
-
-    def _round_iterable(self, iterable, whole):
-        """Округляет значения из списка iterable так, чтобы
-        сумма округленных значений была равна округленной
-        сумме значений списка - whole.
+        Все группы округляются за один проход: остаток
+        распределяется по элементам с наибольшей отбрасываемой
+        частью внутри каждой группы.
 
         Args:
-            iterable, whole
+            values - список значений
+            groups - список групп (ключей) для каждого значения
+            wholes - словарь вида {group: whole}
 
         Returns:
             список округленных значений
         """
+        factor = 10 ** self.precision
 
         # Получаем сохраняемые и отбрасываемые при округлении
-        # части чисел. Сохраняем позицию элемнтов.
-        result = [
-            [index, *divmod(item * 10 ** self.precision, 1)]
-            for index, item in enumerate(iterable)
-        ]
-
-        # Разница между whole и суммой всех округленных элементов
-        delta = int(whole * 10 ** self.precision) - sum(
-            [int(item[1]) for item in result]
-        )
-
-        if delta > len(result):
-            raise ValueError("Iterable {iterable} sum must be"
-                             " almost equal whole value: {whole}".format(
-                                 iterable=iterable,
-                                 whole=whole,
-                             ))
-
-        # Распределяем delta по списку начиная с элементов
+        # части чисел
+        result = [divmod(item * factor, 1) for item in values]
+        rounded = [int(item[0]) for item in result]
+
+        # Разница между whole и суммой всех округленных элементов группы
+        delta = {group: int(whole * factor) for group, whole in wholes.items()}
+        for group, item in zip(groups, rounded):
+            delta[group] -= item
+
+        size = Counter(groups)
+        for group, group_delta in delta.items():
+            if group_delta > size[group]:
+                raise ValueError("Group {group} sum must be"
+                                 " almost equal whole value: {whole}".format(
+                                     group=group,
+                                     whole=wholes[group],
+                                 ))
+
+        # Распределяем delta по группам начиная с элементов
         # с наибольшей отбрасываемой частью
-        result = sorted(result, key=lambda i: i[-1], reverse=True)
-        for index in range(delta):
-            result[index][1] += 1
-
-        # Возвращаем исходный порядок элементов
-        result = sorted(result, key=lambda i: i[0])
+        for index in sorted(
+                range(len(result)), key=lambda i: result[i][1], reverse=True,
+        ):
+            group = groups[index]
+            if delta[group] > 0:
+                rounded[index] += 1
+                delta[group] -= 1
 
         # Возвращаем список с округленными значениями
-        return [item[1] / 10 ** self.precision for item in result]
+        return [item / factor for item in rounded]
 
     def _get_assignment_data(self, fields):
         """Формирует данные о назначениях.
@@ -221,12 +241,12 @@ class DataBuilder:
             fields - поля, которые должны присутсвовать в данных
 
         Returns:
-            данные о назначениях
+            ReportFrame с данными о назначениях
         """
 
         # Получаем данные из БД
         # (назначения, полностю входящие в диапазон отчета)
-        data = list(self._get_assignment_queryset(self.start, self.end, *fields))
+        data = self._get_assignment_rows(self.start, self.end, fields)
 
         # Поля для идентификации назначений в полученных данных
         search_fields = tuple(filter(
@@ -245,7 +265,7 @@ class DataBuilder:
             week_start = self.start - datetime.timedelta(days=self.start.weekday())
             week_end = self.start + datetime.timedelta(days=6 - self.start.weekday())
             # Получаем назначения на эту неделю
-            week = list(self._get_assignment_queryset(week_start, week_end, *fields))
+            week = self._get_assignment_rows(week_start, week_end, fields)
 
             # Находим долю рабочих часов в назначениях, попадающую в отчет
             total_work_hours = Day.objects.get_work_hours_count(week_start, week_end)
@@ -253,11 +273,7 @@ class DataBuilder:
             factor = assignment_work_hours / total_work_hours
 
             # Обновляем данные для отчета
-            data = self._update_data(
-                data, week,
-                search_fields, update_fields,
-                factor,
-            )
+            data = data.update(week, search_fields, update_fields, factor)
 
         # Дата конца отчета не конец недели
         if self.end.weekday() < 6:
@@ -265,7 +281,7 @@ class DataBuilder:
             week_start = self.end - datetime.timedelta(days=self.end.weekday())
             week_end = self.end + datetime.timedelta(days=6 - self.end.weekday())
             # Получаем назначения на эту неделю
-            week = list(self._get_assignment_queryset(week_start, week_end, *fields))
+            week = self._get_assignment_rows(week_start, week_end, fields)
 
             # Находим долю рабочих часов в назначениях, попадающую в отчет
             total_work_hours = Day.objects.get_work_hours_count(week_start, week_end)
@@ -273,11 +289,7 @@ class DataBuilder:
             factor = assignment_work_hours / total_work_hours
 
             # Обновляем данные для отчета
-            data = self._update_data(
-                data, week,
-                search_fields, update_fields,
-                factor,
-            )
+            data = data.update(week, search_fields, update_fields, factor)
 
         return data
 
@@ -292,43 +304,60 @@ class DataBuilder:
             fields - поля, которые должны присутсвовать в данных
 
         Returns:
-            данные об отсутствиях
+            ReportFrame с данными об отсутствиях
         """
 
         queryset_fields = list(fields)
         queryset_fields.extend(['start', 'end'])
 
-        # Получаем данные из БД
-        # (отсутсвия частично или полностью попадающие в отчет)
-        data = list(self._get_absence_queryset(self.start, self.end, *queryset_fields))
+        key = ('absence', self.start, self.end)
+        if key not in self._queries:
+            # Получаем данные из БД для всех полей отчетов
+            # (отсутсвия частично или полностью попадающие в отчет)
+            self._queries[key] = list(self._get_absence_queryset(
+                self.start, self.end, *self.absence_fields, 'start', 'end',
+            ))
 
-        for item in data:
-            # Отсутствие полностью попадает в отчет
-            if self.start <= item['start'] and self.end >= item['end']:
-                continue
+        # Оставляем требуемые поля, убирая дубликаты
+        getter = itemgetter(*(
+            (*self.absence_fields, 'start', 'end').index(field)
+            for field in queryset_fields
+        ))
+        data = ReportFrame.from_rows(
+            dict.fromkeys(getter(row) for row in self._queries[key]),
+            queryset_fields,
+        )
 
-            # Колличество рабочих часов на дни отсутствия
-            absence_work_hours = Day.objects.get_work_hours_count(item['start'], item['end'])
+        # Отсутствия, частично попадающие в отчет
+        starts, ends = data['start'], data['end']
+        partial = [
+            index for index, (start, end) in enumerate(zip(starts, ends))
+            if start < self.start or end > self.end
+        ]
 
-            # Колличество рабочих часов в дни отсутствия, попадающие в отчет
-            if item['start'] < self.start and item['end'] > self.end:
-                intersection_work_hours = Day.objects.get_work_hours_count(self.start, self.end)
-            elif item['start'] >= self.start and item['end'] > self.end:
-                intersection_work_hours = Day.objects.get_work_hours_count(item['start'], self.end)
-            elif item['start'] < self.start and item['end'] <= self.end:
-                intersection_work_hours = Day.objects.get_work_hours_count(self.start, item['end'])
+        # Колличество рабочих часов на дни отсутствия и в дни
+        # отсутствия, попадающие в отчет (для всех отсутствий сразу)
+        intervals = [(starts[index], ends[index]) for index in partial]
+        intervals.extend(
+            (max(starts[index], self.start), min(ends[index], self.end))
+            for index in partial
+        )
+        work_hours = Day.objects.get_work_hours_counts(intervals)
 
-            # Обновляем часы отсутсвия
-            item['absence_hours'] *= (intersection_work_hours / absence_work_hours)
+        # Обновляем часы отсутсвия
+        absence_hours = list(data['absence_hours'])
+        for index, absence_work_hours, intersection_work_hours in zip(
+                partial, work_hours[:len(partial)], work_hours[len(partial):],
+        ):
+            absence_hours[index] *= (intersection_work_hours / absence_work_hours)
+        data['absence_hours'] = absence_hours
 
         # Формируем данные об отсутствиях (убираем дубликаты
         # для занимаемых должностей, суммируя часы)
-        data = self._update_data([], data, ('number', ), ('absence_hours', ), 1)
+        data = ReportFrame().update(data, ('number', ), ('absence_hours', ))
 
         # Убираем лишние поля
-        data = [{key: item[key] for key in fields} for item in data]
-
-        return data
+        return data.select(fields)
 
     def assignment_report(self):
         """Формирует данные для размещения в отчете.
@@ -343,7 +372,7 @@ class DataBuilder:
             'position', 'project', 'project_hours'
         )
         data = self._get_assignment_data(fields)
-        return [[item[key] for key in fields] for item in data]
+        return data.rows(fields)
 
     def assignment_matrix_report(self, absence_name):
         """Формирует данные для размещения в отчете.
@@ -360,23 +389,17 @@ class DataBuilder:
             'employee', 'number', 'project', 'project_hours',
         )
         data = self._get_assignment_data(fields)
-        data = [[item[key] for key in fields] for item in data]
 
         # Получаем данные об отсутствиях
         absence_fields = ('employee', 'number', 'absence_hours')
         absence_data = self._get_absence_data(absence_fields)
-        absence_data = [
-            [item[key] for key in absence_fields]
-            for item in absence_data
-        ]
 
         # Добавляем часы отсутсвия к данным о назначениях
         # как назначение по проекту 'absence_name'
-        for item in absence_data:
-            item.insert(fields.index('project'), absence_name)
-        data.extend(absence_data)
+        absence_data['project'] = absence_name
+        absence_data['project_hours'] = absence_data['absence_hours']
 
-        return data
+        return data.concat(absence_data).rows(fields)
 
     def assignment_hours_check(self):
         """Формирует данные для размещения в отчете.
@@ -401,32 +424,31 @@ class DataBuilder:
         ]
         absence_data = self._get_absence_data(absence_fields)
 
-        # Обновляем данные о назначениях данными об отсутствиях
-        for item in absence_data:
-            # Ищем назначение с таким же табельным номером
-            index = next((
-                index for index, value in enumerate(data)
-                if item['number'] == value['number']
-            ), None)
-
-            if index is not None:
-                # Если назначение найдено, добавляем в него  часы отсутствия
-                data[index]['absence_hours'] = item['absence_hours']
-            else:
-                # Добавляем информацию об отсутствии
-                data.append(item)
-
-        for item in data:
-            # Эти поля должны присутствовать в каждой записи
-            item['absence_hours'] = item.get('absence_hours', 0)
-            item['employment_hours'] = item.get('employment_hours', 0)
-
-            # Вычисляем дополнительные поля для отчета
-            item['hours_assigned_total'] = item['absence_hours'] + item['employment_hours']
-            item['work_hours_total'] = work_hours_total * item['staff_units']
-            item['hours_difference'] = abs(
-                item['work_hours_total'] - item['hours_assigned_total']
+        # Добавляем к назначениям часы отсутствия с таким же
+        # табельным номером, остальные отсутствия - в конец
+        data = data.join(absence_data, ('number', ), ('absence_hours', ))
+
+        # Эти поля должны присутствовать в каждой записи
+        for field in ('absence_hours', 'employment_hours'):
+            data[field] = [0 if value is None else value for value in data[field]]
+
+        # Вычисляем дополнительные поля для отчета
+        data['hours_assigned_total'] = [
+            absence_hours + employment_hours
+            for absence_hours, employment_hours in zip(
+                data['absence_hours'], data['employment_hours'],
             )
+        ]
+        data['work_hours_total'] = [
+            work_hours_total * staff_units
+            for staff_units in data['staff_units']
+        ]
+        data['hours_difference'] = [
+            abs(work_hours - hours_assigned)
+            for work_hours, hours_assigned in zip(
+                data['work_hours_total'], data['hours_assigned_total'],
+            )
+        ]
 
         # Расширяем список полей для отчета
         fields.extend((
@@ -434,7 +456,7 @@ class DataBuilder:
             'work_hours_total', 'hours_difference',
         ))
 
-        return [[item[key] for key in fields] for item in data]
+        return data.rows(fields)
 
     def index_of_labor_distribution(self, absence_name):
         """Формирует данные для размещения в отчете.
@@ -453,66 +475,40 @@ class DataBuilder:
         )
         data = self._get_assignment_data(fields)
 
-        # Вычисляем долю от общего колличества рабочих часов
-        for item in data:
-            item['project_hours'] /= work_hours_total
-
-        data = [[item[key] for key in fields] for item in data]
-
         # Получаем данные об отсутствиях
         absence_fields = ('employee', 'number', 'staff_units', 'absence_hours',)
         absence_data = self._get_absence_data(absence_fields)
 
-        # Вычисляем долю от общего колличества рабочих часов
-        for item in absence_data:
-            item['absence_hours'] /= work_hours_total
-
-        absence_data = [
-            [item[key] for key in absence_fields]
-            for item in absence_data
-        ]
-
         # Добавляем часы отсутсвия к данным о назначениях
         # как назначение по проекту 'absence_name'
-        for item in absence_data:
-            item.insert(fields.index('project'), absence_name)
+        absence_data['project'] = absence_name
+        absence_data['project_hours'] = absence_data['absence_hours']
+        data = data.concat(absence_data)
 
-        data.extend(absence_data)
+        # Вычисляем долю от общего колличества рабочих часов
+        data['project_hours'] = [
+            hours / work_hours_total for hours in data['project_hours']
+        ]
 
         # Для каждого табельного номера суммируем часы,
         # округляем и добавляем сумму к данным номера
-        for item in data:
-            item.append(round(
-                sum(
-                    [other[4] for other in filter(
-                        lambda i: i[1] == item[1],
-                        data,
-                    )]
-                ),
-                self.precision,
-            ))
+        employment_hours = {
+            employment: round(hours, self.precision)
+            for (employment, ), hours in data.group_sum(
+                ('number', ), 'project_hours',
+            ).items()
+        }
+        data['employment_hours'] = [
+            employment_hours[employment] for employment in data['number']
+        ]
 
         # Для каждого табельного номера и полученной суммы
-        # часов необходимо округлить слагаемые
-        for employment, employment_hours in set(
-                [(item[1], item[5]) for item in data]
-        ):
-            # Получаем назначеные часы для табельного номера и позицию в данных
-            items = [
-                (index, item[4])
-                for index, item in enumerate(data)
-                if item[1] == employment
-            ]
-
-            # Округляем часы
-            indexes, hours = zip(*items)
-            hours = self._round_iterable(hours, employment_hours)
-
-            # Заменяем часы в данных округленными значениями
-            for index, hours in zip(indexes, hours):
-                data[index][4] = hours
+        # часов округляем слагаемые
+        data['project_hours'] = self._round_groups(
+            data['project_hours'], data['number'], employment_hours,
+        )
 
-        return data
+        return data.rows((*fields, 'employment_hours'))
 
     def index_of_labor_distribution_per_project(self):
         """Формирует данные для размещения в отчете.
@@ -528,35 +524,67 @@ class DataBuilder:
         )
         data = self._get_assignment_data(fields)
 
-        # Суммируем часы назначений по каждому табельному
-        # номеру сохраняем в данные
-        for item in data:
-            item['employment_hours'] = sum(
-                [other['project_hours'] for other in filter(
-                    lambda i: i['number'] == item['number'],
-                    data,
-                )]
+        # Вычисляем долю от суммы часов назначений
+        # по каждому табельному номеру
+        data['project_hours'] = [
+            hours / employment_hours
+            for hours, employment_hours in zip(
+                data['project_hours'],
+                data.transform_sum(('number', ), 'project_hours'),
             )
+        ]
+
+        # Для каждого табельного номера округляем полученые доли
+        data['project_hours'] = self._round_groups(
+            data['project_hours'],
+            data['number'],
+            dict.fromkeys(data['number'], 1),
+        )
 
-        # Вычисляем долю от общего колличества часов
-        for item in data:
-            item['project_hours'] /= item['employment_hours']
+        return data.rows(fields)
 
-        # Для каждого табельного номера необходимо округлить полученые доли
-        for employment in set([item['number'] for item in data]):
-            # Получаем доли назначений для табельного номера и позицию в данных
-            items = [
-                (index, item['project_hours'])
-                for index, item in enumerate(data)
-                if item['number'] == employment
-            ]
 
-            # Округляем доли
-            indexes, hours = zip(*items)
-            hours = self._round_iterable(hours, 1)
+class ReportMatrix:
+    """Матрица для размещения в отчетах.
 
-            # Заменяем доли в данных округленными значениями
-            for index, hours in zip(indexes, hours):
-                data[index]['project_hours'] = hours
+    Строки матрицы - сотрудники, столбцы - проекты и дополнительные
+    поля отчета. Позиции строк и столбцов хранятся в словарях,
+    поэтому ячейка матрицы определяется за O(1).
+    """
 
-        return [[item[key] for key in fields] for item in data]
+    def __init__(self, rows, columns):
+        """Создает пустую матрицу.
+
+        Args:
+            rows - заголовки строк
+            columns - заголовки столбцов
+        """
+
+        self.rows = tuple(rows)
+        self.columns = tuple(columns)
+
+        # Позиции строк и столбцов в матрице
+        self._row_index = {value: index for index, value in enumerate(self.rows)}
+        self._column_index = {value: index for index, value in enumerate(self.columns)}
+
+        self.values = [[None] * len(self.columns) for _ in self.rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        """Возвращает строки матрицы вида
+        [заголовок строки, значение, ...].
+        """
+        for row, values in zip(self.rows, self.values):
+            yield [row, *values]
+
+    def __setitem__(self, key, value):
+        """Записывает значение в ячейку матрицы.
+
+        Args:
+            key - заголовки строки и столбца (row, column)
+            value - значение
+        """
+        row, column = key
+        self.values[self._row_index[row]][self._column_index[column]] = value
@@ -1,7 +1,22 @@
+import os
+
+from django.conf import settings
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import redirect
+from django.utils.translation import get_language
+from django.views import View
+from django.views.generic import DetailView
+from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.edit import FormView
 
-from .forms import ReportDownloadForm
+from .forms import REPORT_CHOICES, ReportDownloadForm, ReportBundleForm
 from .reports import ReportBuilder
+from .models import ReportJob
+from .jobs import (
+    get_cached_report_content,
+    get_report_response,
+    get_bundle_content,
+)
 
 # Create your views here.
 
@@ -10,13 +25,138 @@ class ReportDownload(FormView):
     form_class = ReportDownloadForm
 
     def form_valid(self, form):
+        params = {
+            'report': form.cleaned_data['report'],
+            'start': form.cleaned_data['start'],
+            'end': form.cleaned_data['end'],
+            'orientation': form.cleaned_data['orientation'],
+            'language': get_language(),
+        }
+
+        if settings.REPORTS_BACKGROUND:
+            # Отчет формируется обработчиком заданий
+            # (см. команду run_report_jobs), если
+            # отсутствует в кэше
+            content = get_cached_report_content(**params)
+            if content is None:
+                job = ReportJob.objects.create(
+                    user=self.request.user,
+                    **params,
+                )
+                return redirect(job)
+        else:
+            return get_report_response(**params)
+
+        report = ReportBuilder(params['start'], params['end'])
+        return report.get_content_response(*content)
+
+
+class ReportBundleMixin:
+    """Формирует архив с несколькими отчетами за один период
+    (или задание на его формирование).
+    """
+
+    def get_bundle(self, form):
+        """Формирует архив с отчетами.
+
+        Args:
+            form - заполненная форма ReportBundleForm
+
+        Returns:
+            tuple вида (содержимое файла, тип контента, расширение
+            файла) или задание ReportJob, если архив формируется
+            обработчиком заданий
+        """
+        params = {
+            'start': form.cleaned_data['start'],
+            'end': form.cleaned_data['end'],
+            'orientation': form.cleaned_data['orientation'],
+            'language': get_language(),
+        }
+        reports = form.cleaned_data['reports']
+
+        if settings.REPORTS_BACKGROUND:
+            # Архив формируется обработчиком заданий,
+            # если хотя бы один отчет отсутствует в кэше
+            if any(
+                    get_cached_report_content(report, **params) is None
+                    for report in reports
+            ):
+                return ReportJob.objects.create(
+                    user=self.request.user,
+                    report=','.join(reports),
+                    **params,
+                )
+
+        return get_bundle_content(reports, **params)
+
+
+class ReportBundleDownload(ReportBundleMixin, FormView):
+    template_name = 'reports/report_bundle_form.html'
+    form_class = ReportBundleForm
+
+    def form_valid(self, form):
+        content = self.get_bundle(form)
+        if isinstance(content, ReportJob):
+            return redirect(content)
+
         report = ReportBuilder(
             form.cleaned_data['start'],
             form.cleaned_data['end'],
         )
+        return report.get_content_response(*content)
+
+
+class ReportJobMixin(SingleObjectMixin):
+    model = ReportJob
+
+    def get_queryset(self):
+        """Пользователю доступны только его задания."""
+        queryset = super().get_queryset()
+        if self.request.user.is_superuser:
+            return queryset
+        return queryset.filter(user=self.request.user)
+
 
-        document = getattr(report, form.cleaned_data['report'])(
-            orientation=form.cleaned_data['orientation'],
+class ReportJobDetail(ReportJobMixin, DetailView):
+    def get_context_data(self, **kwargs):
+        """Добавляет в контекст наименование отчета.
+        """
+        context = super().get_context_data(**kwargs)
+        names = dict(REPORT_CHOICES)
+        context['report_name'] = ', '.join(
+            str(names.get(report, report)) for report in self.object.reports
         )
+        return context
 
-        return report.get_response(document)
+
+class ReportJobStatus(ReportJobMixin, View):
+    def get(self, request, *args, **kwargs):
+        """Возвращает response c JSON содержащим
+        состояние задания.
+        """
+        job = self.get_object()
+        return JsonResponse({
+            'status': job.status,
+            'status_display': job.get_status_display(),
+            'error': job.error,
+            'download_url': (
+                job.get_download_url() if job.status == ReportJob.DONE else None
+            ),
+        })
+
+
+class ReportJobDownload(ReportJobMixin, View):
+    def get(self, request, *args, **kwargs):
+        """Возвращает response с файлом отчета."""
+        job = self.get_object()
+
+        if job.status != ReportJob.DONE or not os.path.exists(job.path):
+            raise Http404
+
+        return FileResponse(
+            open(job.path, 'rb'),
+            as_attachment=True,
+            filename=job.get_filename(),
+            content_type=job.content_type,
+        )
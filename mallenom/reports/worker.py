@@ -0,0 +1,16 @@
+"""Функции процессов пула обработчика заданий (см. команду
+run_report_jobs). Процессы пула запускаются заново (spawn),
+поэтому модуль не импортирует модели до вызова django.setup().
+"""
+import django
+
+
+def init():
+    """Настраивает Django в процессе пула."""
+    django.setup()
+
+
+def render(pk):
+    """Формирует отчет задания (см. jobs.render_report_job)."""
+    from .jobs import render_report_job
+    return render_report_job(pk)
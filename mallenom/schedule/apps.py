@@ -5,3 +5,7 @@ from django.utils.translation import gettext_lazy as _
 class ScheduleConfig(AppConfig):
     name = 'schedule'
     verbose_name = _('Schedule')
+
+    def ready(self):
+        # Подключаем обработчики сигналов
+        from . import signals
@@ -0,0 +1,110 @@
+from django.utils.functional import cached_property
+
+from workcal.models import Day
+
+from .models import ProjectAssignment
+
+
+class Capacity:
+    """Снимок доступных рабочих часов должности за период.
+
+    Объединяет колличество рабочих часов по производственному
+    календарю с учетом штатных единиц и уже существующие назначения
+    на проекты. Формы и formset проверяют часы (и уникальность
+    проектов назначения) по одному снимку, без отдельных
+    запросов для каждой проверки.
+    """
+
+    def __init__(self, employment, start, end, project_assignments=None):
+        """Создает снимок.
+
+        Args:
+            employment - занимаемая должность (Employment)
+            start - начало периода
+            end - конец периода
+
+        Kwargs:
+            project_assignments - существующие назначения на проекты
+                вида [(pk, project, hours),...]
+        """
+        self.employment = employment
+        self.start = start
+        self.end = end
+        self.project_assignments = {
+            pk: (project, hours)
+            for pk, project, hours in project_assignments or ()
+        }
+
+    @classmethod
+    def for_assignment(cls, assignment, project_assignments=None):
+        """Создает снимок для назначения на неделю.
+
+        Args:
+            assignment - назначение (Assignment)
+
+        Kwargs:
+            project_assignments - назначения на проекты, уже полученные
+                из БД (например, queryset formset), иначе назначения
+                на проекты получаются одним запросом
+
+        Returns:
+            Capacity
+        """
+        if project_assignments is None:
+            project_assignments = ProjectAssignment._base_manager.filter(
+                assignment=assignment,
+            ).values_list('pk', 'project', 'hours').order_by()
+        else:
+            project_assignments = [
+                (item.pk, item.project_id, item.hours)
+                for item in project_assignments
+            ]
+
+        return cls(
+            assignment.employment,
+            assignment.start,
+            assignment.end,
+            project_assignments=project_assignments,
+        )
+
+    @cached_property
+    def work_hours(self):
+        """Колличество рабочих часов по производственному календарю."""
+        return Day.objects.get_work_hours_count(self.start, self.end)
+
+    @property
+    def hours_max(self):
+        """Колличество рабочих часов с учетом штатных единиц."""
+        return self.work_hours * self.employment.count
+
+    def get_hours_available(self, exclude=()):
+        """Возвращает колличество часов, доступных для назначения.
+
+        Args:
+            exclude - pk назначений на проекты, часы которых
+                не учитываются (изменяемые записи)
+
+        Returns:
+            колличество часов
+        """
+        exclude = set(exclude)
+        return self.hours_max - sum(
+            hours for pk, (_, hours) in self.project_assignments.items()
+            if pk not in exclude
+        )
+
+    def get_projects(self, exclude=()):
+        """Возвращает проекты существующих назначений на проекты.
+
+        Args:
+            exclude - pk назначений на проекты, которые
+                не учитываются (изменяемые записи)
+
+        Returns:
+            set pk проектов
+        """
+        exclude = set(exclude)
+        return {
+            project for pk, (project, _) in self.project_assignments.items()
+            if pk not in exclude
+        }
@@ -1,12 +1,11 @@
-import datetime
-
-from django.db import models
 from django import forms
-from django.http.request import QueryDict
 from django.utils.translation import gettext_lazy as _
 
 import django_filters as filters
 
+from core.filters import PeriodFilter, PeriodFilterSetMixin
+from employee.models import EmployeeSearchToken
+
 from .models import Project, Assignment, ProjectAssignment, Absence
 
 
@@ -29,13 +28,13 @@ class ProjectFilter(filters.FilterSet):
         fields = []
 
 
-class AssignmentFilter(filters.FilterSet):
+class AssignmentFilter(PeriodFilterSetMixin, filters.FilterSet):
     employee = filters.CharFilter(
         label=_('Employee'),
         method='employee_filter',
     )
     projects = filters.ModelChoiceFilter(
-        queryset=Project.objects.all(),
+        queryset=Project.objects_plain.all(),
         label=_('Project'),
     )
     start__gte = filters.DateFilter(
@@ -54,63 +53,20 @@ class AssignmentFilter(filters.FilterSet):
             attrs={'placeholder': _('MM/DD/YYYY')},
         ),
     )
-    year_month = filters.CharFilter(
-        label=_('Month/Year'),
-        method='year_month_filter',
-        widget=forms.TextInput(
-            attrs={'placeholder': _('[MM/]YYYY')},
-        ),
-    )
+    year_month = PeriodFilter()
 
     class Meta:
         model = Assignment
         fields = []
 
-    def __init__(self, data=None, *args, **kwargs):
-        if data is None:
-            # Если фильтры не заданы, задаем
-            # фильтр year_month по текущему месяцу
-            today = datetime.date.today()
-            data = QueryDict("year_month={}/{}".format(
-                today.month,
-                today.year,
-            ))
-
-        super(AssignmentFilter, self).__init__(data, *args, **kwargs)
-
     def employee_filter(self, queryset, name, value):
-        for word in value.split():
-            queryset = queryset.filter(
-                models.Q(employment__employee__last_name__icontains=word) |
-                models.Q(employment__employee__first_name__icontains=word) |
-                models.Q(employment__employee__middle_name__icontains=word)
-            )
-        return queryset
-
-    def year_month_filter(self, queryset, name, value):
-        try:
-            # Разделяем строку фильтра [MM/]YYYY на месяц и год
-            value = list(map(int, value.split('/')))
-            value.append(None)
-            month, year, *_ = value
-            if not year:
-                # Задано только одно значение - значит это год
-                year, month = month, year
-        except ValueError:
-            return queryset.none()
-
-        if month:
-            return queryset.filter(
-                models.Q(start__month=month) & models.Q(start__year=year) |
-                models.Q(end__month=month) & models.Q(end__year=year)
-            )
-
-        return queryset.filter(
-            models.Q(start__year=year) | models.Q(end__year=year)
+        return EmployeeSearchToken.objects.search(
+            queryset, value,
+            field='employment__employee',
         )
 
 
-class ProjectAssignmentFilter(filters.FilterSet):
+class ProjectAssignmentFilter(PeriodFilterSetMixin, filters.FilterSet):
     project = filters.CharFilter(
         label=_('Project'),
         field_name='project__name',
@@ -136,63 +92,23 @@ class ProjectAssignmentFilter(filters.FilterSet):
             attrs={'placeholder': _('MM/DD/YYYY')},
         ),
     )
-    year_month = filters.CharFilter(
-        label=_('Month/Year'),
-        method='year_month_filter',
-        widget=forms.TextInput(
-            attrs={'placeholder': _('[MM/]YYYY')},
-        ),
+    year_month = PeriodFilter(
+        start_field='assignment__start',
+        end_field='assignment__end',
     )
 
     class Meta:
         model = ProjectAssignment
         fields = []
 
-    def __init__(self, data=None, *args, **kwargs):
-        if data is None:
-            # Если фильтры не заданы, задаем
-            # фильтр year_month по текущему месяцу
-            today = datetime.date.today()
-            data = QueryDict("year_month={}/{}".format(
-                today.month,
-                today.year,
-            ))
-
-        super(ProjectAssignmentFilter, self).__init__(data, *args, **kwargs)
-
     def employee_filter(self, queryset, name, value):
-        for word in value.split():
-            queryset = queryset.filter(
-                models.Q(assignment__employment__employee__last_name__icontains=word) |
-                models.Q(assignment__employment__employee__first_name__icontains=word) |
-                models.Q(assignment__employment__employee__middle_name__icontains=word)
-            )
-        return queryset
-
-    def year_month_filter(self, queryset, name, value):
-        try:
-            # Разделяем строку фильтра [MM/]YYYY на месяц и год
-            value = list(map(int, value.split('/')))
-            value.append(None)
-            month, year, *_ = value
-            if not year:
-                # Задано только одно значение - значит это год
-                year, month = month, year
-        except ValueError:
-            return queryset.none()
-
-        if month:
-            return queryset.filter(
-                models.Q(assignment__start__month=month) & models.Q(assignment__start__year=year) |
-                models.Q(assignment__end__month=month) & models.Q(assignment__end__year=year)
-            )
-
-        return queryset.filter(
-            models.Q(assignment__start__year=year) | models.Q(assignment__end__year=year)
+        return EmployeeSearchToken.objects.search(
+            queryset, value,
+            field='assignment__employment__employee',
         )
 
 
-class AbsenceFilter(filters.FilterSet):
+class AbsenceFilter(PeriodFilterSetMixin, filters.FilterSet):
     employee = filters.CharFilter(
         label=_('Employee'),
         method='employee_filter',
@@ -213,57 +129,14 @@ class AbsenceFilter(filters.FilterSet):
             attrs={'placeholder': _('MM/DD/YYYY')},
         ),
     )
-    year_month = filters.CharFilter(
-        label=_('Month/Year'),
-        method='year_month_filter',
-        widget=forms.TextInput(
-            attrs={'placeholder': _('[MM/]YYYY')},
-        ),
-    )
+    year_month = PeriodFilter()
 
     class Meta:
         model = Absence
         fields = []
 
-    def __init__(self, data=None, *args, **kwargs):
-        if data is None:
-            # Если фильтры не заданы, задаем
-            # фильтр year_month по текущему месяцу
-            today = datetime.date.today()
-            data = QueryDict("year_month={}/{}".format(
-                today.month,
-                today.year,
-            ))
-
-        super(AbsenceFilter, self).__init__(data, *args, **kwargs)
-
     def employee_filter(self, queryset, name, value):
-        for word in value.split():
-            queryset = queryset.filter(
-                models.Q(employment__employee__last_name__icontains=word) |
-                models.Q(employment__employee__first_name__icontains=word) |
-                models.Q(employment__employee__middle_name__icontains=word)
-            )
-        return queryset
-
-    def year_month_filter(self, queryset, name, value):
-        try:
-            # Разделяем строку фильтра [MM/]YYYY на месяц и год
-            value = list(map(int, value.split('/')))
-            value.append(None)
-            month, year, *_ = value
-            if not year:
-                # Задано только одно значение - значит это год
-                year, month = month, year
-        except ValueError:
-            return queryset.none()
-
-        if month:
-            return queryset.filter(
-                models.Q(start__month=month) & models.Q(start__year=year) |
-                models.Q(end__month=month) & models.Q(end__year=year)
-            )
-
-        return queryset.filter(
-            models.Q(start__year=year) | models.Q(end__year=year)
+        return EmployeeSearchToken.objects.search(
+            queryset, value,
+            field='employment__employee',
         )
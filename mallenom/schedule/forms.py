@@ -1,12 +1,12 @@
 import datetime
 
-from django.db import models
 from django import forms
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 from employee.models import Employee, Employment
-from workcal.models import Day
 
+from .capacity import Capacity
 from .models import Project, Assignment, ProjectAssignment, Absence
 
 
@@ -19,7 +19,12 @@ class ProjectForm(forms.ModelForm):
 class AssignmentForm(forms.ModelForm):
     employee = forms.ModelChoiceField(
         required=True,
-        queryset=Employee.objects.filter(staff_units_count__gt=0),
+        # Сотрудники, занимающие штатные еденицы
+        queryset=Employee.objects_plain.filter(
+            pk__in=Employment._base_manager.filter(
+                count__gt=0,
+            ).values('employee'),
+        ),
         label=Employee._meta.verbose_name,
     )
     check_hours = forms.BooleanField(
@@ -54,7 +59,7 @@ class AssignmentForm(forms.ModelForm):
         employment = cleaned_data['employment']
 
         # Знанимаемя должность должна соответствовать сотруднику
-        if employee != employment.employee:
+        if employee.pk != employment.employee_id:
             self.add_error(
                 'employment',
                 forms.ValidationError(
@@ -112,11 +117,21 @@ class ProjectAssignmentForm(forms.ModelForm):
         model = ProjectAssignment
         fields = '__all__'
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, capacity=None, **kwargs):
         """В форме должны отображаться только активыне проекты.
+
+        Kwargs:
+            capacity - снимок доступных часов назначения (Capacity),
+                общий для всех форм formset
         """
+        self.capacity = capacity
         super().__init__(*args, **kwargs)
-        self.fields['project'].queryset = Project.objects.filter(status=True)
+        self.fields['assignment'].queryset = Assignment.objects_plain.select_related(
+            'employment__employee',
+            'employment__staffing__department',
+            'employment__staffing__position',
+        )
+        self.fields['project'].queryset = Project.objects_plain.filter(status=True)
 
     def clean(self):
         """Колличество часов в назначении не должно превышать максимально
@@ -133,27 +148,12 @@ class ProjectAssignmentForm(forms.ModelForm):
         hours = cleaned_data['hours']
         assignment = cleaned_data['assignment']
 
-        work_hours_max = Day.objects.get_work_hours_count(
-            assignment.start,
-            assignment.end,
-        )
+        capacity = self.capacity or Capacity.for_assignment(assignment)
 
-        hours_assigned = self._meta.model.objects.filter(
-            assignment=assignment,
+        # Доступные часы без учета изменяемой записи
+        hours_available = capacity.get_hours_available(
+            exclude=(self.instance.pk, ),
         )
-        if self.instance.pk:
-            hours_assigned = hours_assigned.exclude(
-                pk=self.instance.pk
-            )
-        hours_assigned = hours_assigned.aggregate(
-            hours=models.functions.Coalesce(
-                models.Sum('hours'), 0
-            ),
-        )['hours']
-
-        staff_units_count = assignment.employment.count
-
-        hours_available = work_hours_max * staff_units_count - hours_assigned
 
         if hours > hours_available:
             self.add_error(
@@ -169,6 +169,27 @@ class ProjectAssignmentForm(forms.ModelForm):
             )
         return cleaned_data
 
+    def validate_unique(self):
+        """Проект не должен повторяться в назначении.
+
+        При наличии снимка уникальность проверяется по нему,
+        без запроса к БД для каждой формы formset.
+        """
+        if self.capacity is None:
+            return super().validate_unique()
+
+        project = self.cleaned_data.get('project')
+        if project is None:
+            return
+
+        if project.pk in self.capacity.get_projects(exclude=(self.instance.pk, )):
+            self.add_error(
+                None,
+                self.instance.unique_error_message(
+                    self._meta.model, ('assignment', 'project'),
+                ),
+            )
+
 
 class ProjectAssignmentFormSetForm(ProjectAssignmentForm):
     check_hours = None
@@ -180,7 +201,12 @@ class ProjectAssignmentFormSetForm(ProjectAssignmentForm):
 class AbsenceForm(forms.ModelForm):
     employee = forms.ModelChoiceField(
         required=True,
-        queryset=Employee.objects.filter(staff_units_count__gt=0),
+        # Сотрудники, занимающие штатные еденицы
+        queryset=Employee.objects_plain.filter(
+            pk__in=Employment._base_manager.filter(
+                count__gt=0,
+            ).values('employee'),
+        ),
         label=Employee._meta.verbose_name,
     )
 
@@ -209,7 +235,7 @@ class AbsenceForm(forms.ModelForm):
         employment = cleaned_data['employment']
 
         # Занимаемая должность должна соответствовать сотруднику
-        if employee != employment.employee:
+        if employee.pk != employment.employee_id:
             self.add_error(
                 'employment',
                 forms.ValidationError(
@@ -244,10 +270,7 @@ class AbsenceForm(forms.ModelForm):
         # Кол-во часов не должно превышать допустимое
         # кол-во рабочих часов за период
         hours = cleaned_data['hours']
-        hours_max = Day.objects.get_work_hours_count(
-            start,
-            end,
-        ) * employment.count
+        hours_max = Capacity(employment, start, end).hours_max
 
         if hours > hours_max:
             self.add_error(
@@ -300,6 +323,25 @@ class AbsenceForm(forms.ModelForm):
 
 
 class BaseProjectAssignmentFormSet(forms.BaseInlineFormSet):
+    @cached_property
+    def capacity(self):
+        """Снимок доступных часов назначения, общий для всех форм.
+
+        Назначения на проекты уже получены formset,
+        снимок создается без запросов к БД.
+        """
+        if self.instance.pk is None:
+            return None
+        return Capacity.for_assignment(
+            self.instance,
+            project_assignments=self.get_queryset(),
+        )
+
+    def get_form_kwargs(self, index):
+        kwargs = super().get_form_kwargs(index)
+        kwargs['capacity'] = self.capacity
+        return kwargs
+
     def clean(self):
         """Кол-во часов не должно превышать допустимое
         кол-во рабочих часов за период.
@@ -316,23 +358,16 @@ class BaseProjectAssignmentFormSet(forms.BaseInlineFormSet):
             return cleaned_data
 
         hours = []
-
-        assignment = self.instance
+        pks = []
 
         for form in self.forms:
+            pks.append(form.instance.pk)
             if self.can_delete and self._should_delete_form(form):
                 continue
             else:
                 hours.append(form.cleaned_data['hours'])
 
-        work_hours_max = Day.objects.get_work_hours_count(
-            assignment.start,
-            assignment.end,
-        )
-
-        staff_units_count = assignment.employment.count
-
-        hours_available = work_hours_max * staff_units_count
+        hours_available = self.capacity.get_hours_available(exclude=pks)
 
         if sum(hours) > hours_available:
             message = _('%(hours_name)s must be less than or equal to'
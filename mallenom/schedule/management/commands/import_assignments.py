@@ -0,0 +1,67 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from schedule.upsert import bulk_upsert
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports projects' assignments from CSV file with columns:"
+        " employment (ID number), week (Monday, YYYY-MM-DD), project, hours"
+    )
+
+    fields = ('employment', 'week', 'project', 'hours')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help="Path of CSV file",
+        )
+        parser.add_argument(
+            '--encoding', default='utf-8',
+            help="Encoding of CSV file",
+        )
+        parser.add_argument(
+            '--delimiter', default=',',
+            help="Delimiter of CSV file columns",
+        )
+        parser.add_argument(
+            '--no-check-hours', action='store_false', dest='check_hours',
+            help="Do not check hours per week against work hours",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['source'], encoding=options['encoding'],
+                      newline='') as file:
+                reader = csv.DictReader(file, delimiter=options['delimiter'])
+                missing = set(self.fields) - set(reader.fieldnames or ())
+                if missing:
+                    raise CommandError("Missing columns: {}".format(
+                        ', '.join(sorted(missing)),
+                    ))
+                rows = list(reader)
+        except (OSError, LookupError, UnicodeDecodeError, csv.Error) as error:
+            raise CommandError("Import error ({type}): {error}".format(
+                error=error,
+                type=type(error).__name__,
+            ))
+
+        created, updated, errors = bulk_upsert(
+            rows, check_hours=options['check_hours'],
+        )
+
+        for row, item, error in errors:
+            # Первая строка файла - заголовок
+            self.stderr.write("Row {}: {}: {}".format(
+                row + 1, dict(item), error,
+            ))
+
+        message = "Import finished: {} assignments added, {} assignments updated, {} rows rejected".format(
+            len(created), len(updated), len(errors),
+        )
+        if errors:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
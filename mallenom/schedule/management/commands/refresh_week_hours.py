@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from schedule.models import WeekHours
+
+
+class Command(BaseCommand):
+    help = "Rebuilds weekly hours table from projects' assignments"
+
+    def handle(self, *args, **options):
+        count = WeekHours.objects.refresh()
+
+        self.stdout.write(self.style.SUCCESS(
+            "Weekly hours table rebuilt: {} rows".format(count)
+        ))
@@ -0,0 +1,63 @@
+# Generated by Django 2.2.7 on 2026-10-18 09:37
+
+import core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+def fill_week_hours(apps, schema_editor):
+    ProjectAssignment = apps.get_model('schedule', 'ProjectAssignment')
+    WeekHours = apps.get_model('schedule', 'WeekHours')
+
+    queryset = ProjectAssignment.objects.values(
+        'project',
+        employment=models.F('assignment__employment'),
+        week=models.F('assignment__start'),
+    ).annotate(
+        total=models.Sum('hours'),
+    ).order_by()
+
+    WeekHours.objects.bulk_create(
+        WeekHours(
+            employment_id=item['employment'],
+            project_id=item['project'],
+            week=item['week'],
+            hours=item['total'],
+        ) for item in queryset
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0002_change_count_verbose_name'),
+        ('schedule', '0007_change_absences_from_employee_to_employment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeekHours',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField(validators=[core.validators.validate_monday], verbose_name='Week')),
+                ('hours', models.PositiveIntegerField(verbose_name='Hours')),
+                ('employment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='week_hours', to='employee.Employment', verbose_name='Position')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='week_hours', to='schedule.Project', verbose_name='Project')),
+            ],
+            options={
+                'verbose_name': 'Weekly hours',
+                'verbose_name_plural': 'Weekly hours',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='weekhours',
+            index=models.Index(fields=['week', 'employment'], name='schedule_weekhours_week_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='weekhours',
+            unique_together={('employment', 'project', 'week')},
+        ),
+        migrations.RunPython(
+            fill_week_hours,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.7 on 2026-10-18 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0008_create_weekhours_model'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='absence',
+            index=models.Index(fields=['start', 'end'], name='schedule_absence_start_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='absence',
+            index=models.Index(fields=['end', 'start'], name='schedule_absence_end_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['start', 'end'], name='schedule_assign_start_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['end', 'start'], name='schedule_assign_end_start_idx'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 import datetime
 
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import validate_unicode_slug, MaxValueValidator
@@ -17,16 +17,30 @@ from employee.models import Employment
 
 # Create your models here.
 
-class ProjectManager(models.Manager):
-    def get_queryset(self):
-        return super().get_queryset().annotate(
-            hours=models.functions.Coalesce(
-                models.Sum('projectassignments__hours'), 0
-            ),
+class ProjectQuerySet(models.QuerySet):
+    def with_stats(self):
+        """Добавляет часы и колличество назначений по проекту."""
+        # Часы по проекту из сводной таблицы (WeekHours)
+        hours = models.Subquery(
+            WeekHours.objects.filter(
+                project=models.OuterRef('pk'),
+            ).values('project').order_by('project').annotate(
+                sum=models.Sum('hours'),
+            ).values('sum'),
+            output_field=models.IntegerField(),
+        )
+
+        return self.annotate(
+            hours=models.functions.Coalesce(hours, 0),
             assignments_count=models.Count('projectassignments'),
         )
 
 
+class ProjectManager(models.Manager.from_queryset(ProjectQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().with_stats()
+
+
 class Project(models.Model):
     name = models.CharField(
         max_length=128,
@@ -52,6 +66,8 @@ class Project(models.Model):
     )
 
     objects = ProjectManager()
+    # Без аннотаций, статистика добавляется методом with_stats()
+    objects_plain = ProjectQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('Project')
@@ -86,7 +102,28 @@ class Project(models.Model):
         )
 
 
-class AssignmentManager(models.Manager):
+class AssignmentQuerySet(models.QuerySet):
+    def with_stats(self):
+        """Добавляет часы по назначению."""
+        # Часы по назначению из сводной таблицы (WeekHours)
+        hours = models.Subquery(
+            WeekHours.objects.filter(
+                employment=models.OuterRef('employment'),
+                week=models.OuterRef('start'),
+            ).values('employment', 'week').order_by(
+                'employment', 'week',
+            ).annotate(
+                sum=models.Sum('hours'),
+            ).values('sum'),
+            output_field=models.IntegerField(),
+        )
+
+        return self.annotate(
+            hours=models.functions.Coalesce(hours, 0),
+        )
+
+
+class AssignmentManager(models.Manager.from_queryset(AssignmentQuerySet)):
     def get_queryset(self):
         return super().get_queryset().select_related(
             'employment__employee',
@@ -94,11 +131,7 @@ class AssignmentManager(models.Manager):
             'employment__staffing__position',
         ).prefetch_related(
             'projects',
-        ).annotate(
-            hours=models.functions.Coalesce(
-                models.Sum('projectassignments__hours'), 0
-            ),
-        )
+        ).with_stats()
 
 
 class Assignment(models.Model):
@@ -135,12 +168,25 @@ class Assignment(models.Model):
     )
 
     objects = AssignmentManager()
+    # Без аннотаций, статистика добавляется методом with_stats()
+    objects_plain = AssignmentQuerySet.as_manager()
 
     class Meta:
         verbose_name = _("Employee's assignments")
         verbose_name_plural = _("Employees' assignments")
         unique_together = (('employment', 'start', 'end',),)
         ordering = ['-start', ]
+        indexes = [
+            # Индексы для выборки назначений по интервалам дат
+            models.Index(
+                fields=['start', 'end'],
+                name='schedule_assign_start_end_idx',
+            ),
+            models.Index(
+                fields=['end', 'start'],
+                name='schedule_assign_end_start_idx',
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(
@@ -299,6 +345,17 @@ class Absence(models.Model):
         verbose_name_plural = _("Employees' absences")
         unique_together = (('employment', 'start', 'end'),)
         ordering = ['-start']
+        indexes = [
+            # Индексы для выборки отсутствий по интервалам дат
+            models.Index(
+                fields=['start', 'end'],
+                name='schedule_absence_start_end_idx',
+            ),
+            models.Index(
+                fields=['end', 'start'],
+                name='schedule_absence_end_start_idx',
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(start__lte=models.F('end')),
@@ -333,3 +390,148 @@ class Absence(models.Model):
             'schedule:absence:delete',
             kwargs={'pk': self.pk},
         )
+
+
+class WeekHoursManager(models.Manager):
+    # Максимальное колличество должностей в одном запросе
+    chunk_size = 500
+
+    @staticmethod
+    def _get_hours(queryset):
+        """Формирует записи сводной таблицы по назначениям
+        на проекты.
+
+        Args:
+            queryset - queryset к ProjectAssignment
+
+        Returns:
+            список WeekHours
+        """
+        queryset = queryset.values(
+            'project',
+            employment=models.F('assignment__employment'),
+            week=models.F('assignment__start'),
+        ).annotate(
+            total=models.Sum('hours'),
+        ).order_by()
+
+        return [
+            WeekHours(
+                employment_id=item['employment'],
+                project_id=item['project'],
+                week=item['week'],
+                hours=item['total'],
+            ) for item in queryset
+        ]
+
+    def refresh(self, keys=None):
+        """Пересчитывает сводную таблицу по назначениям на проекты.
+
+        Args:
+            keys - список вида [(employment_id, week),...], для
+                которых необходимо пересчитать часы, если не задан -
+                пересчитывается вся таблица
+
+        Returns:
+            колличество записей в пересчитанной части таблицы
+        """
+        with transaction.atomic(using=self.db):
+            if keys is None:
+                # Записи таблицы не имеют зависимостей, поэтому
+                # удаляются одним запросом (без сигналов post_delete)
+                self.all()._raw_delete(self.db)
+                return len(self.bulk_create(
+                    self._get_hours(ProjectAssignment.objects.all())
+                ))
+
+            # Недели для каждой должности
+            employment_weeks = {}
+            for employment, week in keys:
+                employment_weeks.setdefault(employment, set()).add(week)
+
+            # Должности с одинаковыми наборами недель
+            # пересчитываются вместе
+            groups = {}
+            for employment, weeks in employment_weeks.items():
+                groups.setdefault(tuple(sorted(weeks)), []).append(employment)
+
+            count = 0
+            for weeks, employments in groups.items():
+                employments.sort()
+                for index in range(0, len(employments), self.chunk_size):
+                    chunk = employments[index:index + self.chunk_size]
+
+                    self.filter(
+                        employment__in=chunk,
+                        week__in=weeks,
+                    )._raw_delete(self.db)
+
+                    count += len(self.bulk_create(self._get_hours(
+                        ProjectAssignment.objects.filter(
+                            assignment__employment__in=chunk,
+                            assignment__start__in=weeks,
+                        )
+                    )))
+
+            return count
+
+
+class WeekHours(models.Model):
+    """Сводная таблица часов по должностям, проектам и неделям.
+
+    Содержит сумму часов из назначений на проекты (ProjectAssignment)
+    для каждой должности, проекта и недели (дата понедельника).
+    Обновляется при изменении назначений (см. signals), может быть
+    пересчитана командой refresh_week_hours.
+    """
+
+    employment = models.ForeignKey(
+        Employment,
+        null=False,
+        blank=False,
+        on_delete=models.CASCADE,
+        related_name='week_hours',
+        verbose_name=_('Position'),
+    )
+    project = models.ForeignKey(
+        Project,
+        null=False,
+        blank=False,
+        on_delete=models.CASCADE,
+        related_name='week_hours',
+        verbose_name=_('Project'),
+    )
+    week = models.DateField(
+        null=False,
+        blank=False,
+        validators=[
+            validate_monday,
+        ],
+        verbose_name=_('Week'),
+    )
+    hours = models.PositiveIntegerField(
+        null=False,
+        blank=False,
+        verbose_name=_('Hours'),
+    )
+
+    objects = WeekHoursManager()
+
+    class Meta:
+        verbose_name = _('Weekly hours')
+        verbose_name_plural = _('Weekly hours')
+        unique_together = (('employment', 'project', 'week'),)
+        indexes = [
+            models.Index(
+                fields=['week', 'employment'],
+                name='schedule_weekhours_week_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return "{week}: {employment} {project} ({hours})".format(
+            week=self.week,
+            employment=self.employment,
+            project=self.project,
+            hours=self.hours,
+        )
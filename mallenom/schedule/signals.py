@@ -0,0 +1,46 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Assignment, ProjectAssignment, WeekHours
+
+
+def _get_keys(sender, **filters):
+    """Возвращает ключи сводной таблицы (WeekHours) вида
+    (employment_id, week) для назначений или назначений на проекты.
+    """
+    if sender is ProjectAssignment:
+        fields = ('assignment__employment', 'assignment__start')
+    else:
+        fields = ('employment', 'start')
+
+    return set(
+        sender._base_manager.filter(**filters).values_list(*fields).order_by()
+    )
+
+
+@receiver(pre_save, sender=Assignment)
+@receiver(pre_save, sender=ProjectAssignment)
+def remember_week_hours_keys(sender, instance, **kwargs):
+    """Запоминает ключи сводной таблицы до изменения
+    назначения (должность или неделя могут измениться).
+    """
+    instance._week_hours_keys = set()
+    if instance.pk is not None:
+        instance._week_hours_keys = _get_keys(sender, pk=instance.pk)
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_save, sender=ProjectAssignment)
+@receiver(post_delete, sender=Assignment)
+@receiver(post_delete, sender=ProjectAssignment)
+def refresh_week_hours(sender, instance, **kwargs):
+    """Пересчитывает часы в сводной таблице (WeekHours)
+    при изменении назначений.
+    """
+    keys = getattr(instance, '_week_hours_keys', set())
+    if sender is ProjectAssignment:
+        keys |= _get_keys(Assignment, pk=instance.assignment_id)
+    else:
+        keys.add((instance.employment_id, instance.start))
+
+    WeekHours.objects.refresh(keys)
@@ -2,21 +2,25 @@ from django.utils.translation import gettext_lazy as _
 
 import django_tables2 as tables
 
+from core.tables import TotalsTableMixin
+
 from .models import Project, Assignment, ProjectAssignment, Absence
 
 
-class ProjectTable(tables.Table):
+class ProjectTable(TotalsTableMixin, tables.Table):
+    totals = ('assignments_count', 'hours')
+
     name = tables.LinkColumn()
     assignments_count = tables.Column(
         verbose_name=_("Assignments count"),
         footer=lambda table: _('Total: {}').format(
-            sum(x.assignments_count for x in table.data)
+            table.get_total('assignments_count')
         )
     )
     hours = tables.Column(
         verbose_name=_("Hours"),
         footer=lambda table: _('Total: {}').format(
-            sum(x.hours for x in table.data)
+            table.get_total('hours')
         )
     )
     delete = tables.CheckBoxColumn(accessor="pk")
@@ -32,7 +36,9 @@ class ProjectTable(tables.Table):
         empty_text = _("There are no records available")
 
 
-class AssignmentTable(tables.Table):
+class AssignmentTable(TotalsTableMixin, tables.Table):
+    totals = ('hours', )
+
     employee = tables.Column(
         linkify=(
             'employee:employee:detail',
@@ -52,7 +58,7 @@ class AssignmentTable(tables.Table):
     hours = tables.LinkColumn(
         verbose_name=_("Hours"),
         footer=lambda table: _('Total: {}').format(
-            sum(x.hours for x in table.data)
+            table.get_total('hours')
         ),
     )
     delete = tables.CheckBoxColumn(accessor="pk")
@@ -70,7 +76,9 @@ class AssignmentTable(tables.Table):
         empty_text = _("There are no records available")
 
 
-class ProjectAssignmentTable(tables.Table):
+class ProjectAssignmentTable(TotalsTableMixin, tables.Table):
+    totals = ('hours', )
+
     project = tables.LinkColumn()
     employee = tables.Column(
         linkify=(
@@ -92,7 +100,7 @@ class ProjectAssignmentTable(tables.Table):
             {'pk': tables.A('assignment.pk'), },
         ),
         footer=lambda table: _('Total: {}').format(
-            sum(x.hours for x in table.data)
+            table.get_total('hours')
         ),
     )
     delete = tables.CheckBoxColumn(accessor="pk")
@@ -110,7 +118,9 @@ class ProjectAssignmentTable(tables.Table):
         empty_text = _("There are no records available")
 
 
-class AbsenceTable(tables.Table):
+class AbsenceTable(TotalsTableMixin, tables.Table):
+    totals = ('hours', )
+
     employee = tables.Column(
         linkify=(
             'employee:employee:detail',
@@ -123,7 +133,7 @@ class AbsenceTable(tables.Table):
     )
     hours = tables.LinkColumn(
         footer=lambda table: _('Total: {}').format(
-            sum(x.hours for x in table.data)
+            table.get_total('hours')
         )
     )
     delete = tables.CheckBoxColumn(accessor="pk")
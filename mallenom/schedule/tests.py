@@ -1,3 +1,415 @@
+import datetime
+import io
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import models
 from django.test import TestCase
+from django.urls import reverse
+
+from employee.models import Employee, Employment
+from staffing.models import Department, Position, Staffing
+
+from .forms import ProjectAssignmentForm, ProjectAssignmentFormSet
+from .models import Assignment, Project, ProjectAssignment, WeekHours
+from .upsert import bulk_upsert
 
 # Create your tests here.
+
+
+class ScheduleMixin:
+    """Должности (табельные номера N0, N1, N2), проекты
+    (P0, P1 и закрытый Closed) и недели для тестов.
+    """
+    weeks = [
+        datetime.date(2019, 1, 7) + datetime.timedelta(weeks=week)
+        for week in range(4)
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        staffing = Staffing.objects.create(
+            department=Department.objects.create(name='Department'),
+            position=Position.objects.create(name='Position'),
+            count=3,
+        )
+        employee = Employee.objects.create(last_name='Last', first_name='First')
+        cls.employments = [
+            Employment.objects.create(
+                number='N{}'.format(number),
+                employee=employee,
+                staffing=staffing,
+                count=count,
+            ) for number, count in enumerate((1, 0.5, 1))
+        ]
+        cls.projects = [
+            Project.objects.create(name='P{}'.format(number))
+            for number in range(2)
+        ]
+        cls.closed_project = Project.objects.create(name='Closed', status=False)
+
+    @staticmethod
+    def create_assignment(employment, week, **hours):
+        """Создает назначение на неделю с часами
+        по проектам вида {project: hours}.
+        """
+        assignment = Assignment.objects.create(
+            employment=employment,
+            start=week,
+            end=week + datetime.timedelta(days=6),
+        )
+        for project, project_hours in hours.items():
+            ProjectAssignment.objects.create(
+                assignment=assignment,
+                project=Project.objects.get(name=project),
+                hours=project_hours,
+            )
+        return assignment
+
+
+class WeekHoursTest(ScheduleMixin, TestCase):
+    def assertWeekHoursValid(self):
+        """Сводная таблица совпадает с часами назначений на проекты."""
+        expected = ProjectAssignment.objects.values_list(
+            'assignment__employment', 'project', 'assignment__start',
+        ).annotate(
+            models.Sum('hours'),
+        ).order_by()
+
+        self.assertTrue(expected)
+        self.assertEqual(
+            set(WeekHours.objects.values_list(
+                'employment', 'project', 'week', 'hours',
+            )),
+            set(expected),
+        )
+
+    def setUp(self):
+        first, second, third = self.employments
+        self.create_assignment(first, self.weeks[0], P0=10, P1=20)
+        self.create_assignment(first, self.weeks[3], P0=30)
+        self.create_assignment(second, self.weeks[1], P1=15)
+        self.create_assignment(third, self.weeks[2], P0=5)
+
+    def test_save_and_delete(self):
+        self.assertWeekHoursValid()
+
+        project_assignment = ProjectAssignment.objects.get(
+            assignment__employment=self.employments[0],
+            assignment__start=self.weeks[0],
+            project__name='P0',
+        )
+        project_assignment.hours = 12
+        project_assignment.save()
+        self.assertWeekHoursValid()
+
+        project_assignment.delete()
+        self.assertWeekHoursValid()
+
+    def test_assignment_move(self):
+        """Часы переносятся при изменении должности
+        и недели назначения.
+        """
+        assignment = Assignment.objects.get(
+            employment=self.employments[0], start=self.weeks[0],
+        )
+        assignment.employment = self.employments[1]
+        assignment.start = self.weeks[2]
+        assignment.end = self.weeks[2] + datetime.timedelta(days=6)
+        assignment.save()
+
+        self.assertWeekHoursValid()
+        self.assertFalse(WeekHours.objects.filter(
+            employment=self.employments[0], week=self.weeks[0],
+        ).exists())
+
+    def test_bulk_upsert(self):
+        created, updated, errors = bulk_upsert([
+            {'employment': 'N0', 'week': self.weeks[0], 'project': 'P0', 'hours': 1},
+            {'employment': 'N2', 'week': self.weeks[1], 'project': 'P1', 'hours': 2},
+        ])
+        self.assertEqual((len(created), len(updated), errors), (1, 1, []))
+        self.assertWeekHoursValid()
+
+    def test_refresh_keys_only(self):
+        """Пересчитываются только заданные недели должностей,
+        а не все недели между первой и последней.
+        """
+        WeekHours.objects.update(hours=1)
+
+        count = WeekHours.objects.refresh([
+            (self.employments[0].pk, self.weeks[0]),
+            (self.employments[2].pk, self.weeks[3]),
+            (self.employments[2].pk, self.weeks[2]),
+        ])
+
+        # N0 на первой неделе (2 проекта) и N2 на третьей
+        self.assertEqual(count, 3)
+        self.assertEqual(
+            WeekHours.objects.filter(hours=1).count(),
+            WeekHours.objects.count() - 3,
+        )
+
+        self.assertEqual(WeekHours.objects.refresh(), 5)
+        self.assertWeekHoursValid()
+
+
+class BulkUpsertTest(ScheduleMixin, TestCase):
+    def setUp(self):
+        self.create_assignment(self.employments[0], self.weeks[0], P0=10)
+
+    def get_hours(self):
+        return set(ProjectAssignment.objects.values_list(
+            'assignment__employment__number', 'assignment__start',
+            'project__name', 'hours',
+        ))
+
+    def test_insert_and_update(self):
+        """Недостающие назначения создаются, часы существующих
+        изменяются, строки без изменений не сохраняются.
+        """
+        created, updated, errors = bulk_upsert([
+            {'employment': 'N0', 'week': self.weeks[0], 'project': 'P0', 'hours': 12},
+            {'employment': 'N0', 'week': str(self.weeks[0]), 'project': 'P1', 'hours': '8'},
+            {'employment': 'N2', 'week': self.weeks[1], 'project': 'P0', 'hours': 40},
+        ])
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(created), 2)
+        self.assertEqual(len(updated), 1)
+        self.assertEqual(self.get_hours(), {
+            ('N0', self.weeks[0], 'P0', 12),
+            ('N0', self.weeks[0], 'P1', 8),
+            ('N2', self.weeks[1], 'P0', 40),
+        })
+        self.assertEqual(Assignment.objects.count(), 2)
+
+        created, updated, errors = bulk_upsert([
+            {'employment': 'N0', 'week': self.weeks[0], 'project': 'P0', 'hours': 12},
+        ])
+        self.assertEqual((created, updated, errors), ([], [], []))
+
+    def test_invalid_rows(self):
+        """Строки с ошибками не сохраняются, остальные сохраняются."""
+        rows = [
+            {'employment': 'N0', 'week': self.weeks[0] + datetime.timedelta(days=1),
+             'project': 'P0', 'hours': 1},
+            {'employment': 'N9', 'week': self.weeks[0], 'project': 'P0', 'hours': 1},
+            {'employment': 'N0', 'week': self.weeks[0], 'project': 'Closed', 'hours': 1},
+            {'employment': 'N0', 'week': self.weeks[0], 'project': 'P1', 'hours': 0},
+            {'employment': 'N0', 'week': self.weeks[1], 'project': 'P1', 'hours': 5},
+            {'employment': 'N0', 'week': self.weeks[1], 'project': 'P1', 'hours': 6},
+        ]
+        created, updated, errors = bulk_upsert(rows)
+
+        self.assertEqual([(row, item) for row, item, _ in errors], [
+            (1, rows[0]), (2, rows[1]), (3, rows[2]), (4, rows[3]), (6, rows[5]),
+        ])
+        self.assertEqual(len(created), 1)
+        self.assertIn(('N0', self.weeks[1], 'P1', 5), self.get_hours())
+
+    def test_over_limit(self):
+        """Строки недели, часы которой превышают колличество
+        рабочих часов с учетом ставки, не сохраняются.
+        """
+        rows = [
+            # Ставка 0.5: не более 28 часов в неделю
+            {'employment': 'N1', 'week': self.weeks[0], 'project': 'P0', 'hours': 20},
+            {'employment': 'N1', 'week': self.weeks[0], 'project': 'P1', 'hours': 10},
+            # С учетом существующих 10 часов по P0
+            {'employment': 'N0', 'week': self.weeks[0], 'project': 'P1', 'hours': 50},
+            {'employment': 'N2', 'week': self.weeks[0], 'project': 'P1', 'hours': 56},
+        ]
+        created, updated, errors = bulk_upsert(rows)
+
+        self.assertEqual([row for row, _, _ in errors], [1, 2, 3])
+        self.assertEqual(len(created), 1)
+        self.assertEqual(self.get_hours(), {
+            ('N0', self.weeks[0], 'P0', 10),
+            ('N2', self.weeks[0], 'P1', 56),
+        })
+
+        created, updated, errors = bulk_upsert(rows, check_hours=False)
+        self.assertEqual((len(created), errors), (3, []))
+
+
+class ImportAssignmentsTest(ScheduleMixin, TestCase):
+    def import_csv(self, content):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write(content)
+        try:
+            call_command('import_assignments', file.name, stdout=stdout, stderr=stderr)
+        finally:
+            os.remove(file.name)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import(self):
+        stdout, stderr = self.import_csv(
+            "employment,week,project,hours\n"
+            "N0,{week},P0,10\n"
+            "N0,{week},P0,12\n".format(week=self.weeks[0])
+        )
+
+        self.assertIn("1 assignments added", stdout)
+        self.assertIn("1 rows rejected", stdout)
+        # Первая строка файла - заголовок
+        self.assertIn("Row 3:", stderr)
+        self.assertEqual(ProjectAssignment.objects.get().hours, 10)
+
+    def test_missing_columns(self):
+        with self.assertRaisesMessage(CommandError, "Missing columns: hours"):
+            self.import_csv("employment,week,project\n")
+        self.assertFalse(ProjectAssignment.objects.exists())
+
+
+class ProjectListTest(ScheduleMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_superuser(
+            'admin', 'admin@example.com', 'password',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_server_side_table(self):
+        """Таблица списка упорядочивается на стороне сервера,
+        даже если состоит из одной страницы.
+        """
+        response = self.client.get(reverse('schedule:project:list'), {'sort': 'name'})
+
+        self.assertContains(response, 'data-server-side="true"')
+        self.assertEqual(
+            [row.record.name for row in response.context['table'].page.object_list],
+            ['Closed', 'P0', 'P1'],
+        )
+
+
+class ProjectAssignmentFormTest(ScheduleMixin, TestCase):
+    def setUp(self):
+        # Не более 56 часов в неделю (календарь не заполнен)
+        self.assignment = self.create_assignment(
+            self.employments[0], self.weeks[0], P0=10, P1=20,
+        )
+
+    def get_form(self, project, hours, instance=None, check_hours=True):
+        return ProjectAssignmentForm(data={
+            'assignment': self.assignment.pk,
+            'project': Project.objects.get(name=project).pk,
+            'hours': hours,
+            'check_hours': check_hours,
+        }, instance=instance)
+
+    def test_hours(self):
+        instance = ProjectAssignment.objects.get(project__name='P0')
+        self.assertTrue(self.get_form('P0', 36, instance=instance).is_valid())
+
+        form = self.get_form('P0', 37, instance=instance)
+        self.assertFalse(form.is_valid())
+        self.assertIn('hours', form.errors)
+
+        self.assertTrue(self.get_form('P0', 37, instance=instance, check_hours=False).is_valid())
+
+    def test_duplicate(self):
+        form = self.get_form('P1', 1)
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.non_field_errors())
+
+        self.assertFalse(self.get_form('Closed', 1).is_valid())
+
+
+class ProjectAssignmentFormSetTest(ScheduleMixin, TestCase):
+    def setUp(self):
+        Project.objects.create(name='P2')
+        # Не более 56 часов в неделю (календарь не заполнен)
+        self.assignment = self.create_assignment(
+            self.employments[0], self.weeks[0], P0=10, P1=20, P2=5,
+        )
+        self.project_assignments = list(
+            ProjectAssignment.objects.filter(
+                assignment=self.assignment,
+            ).order_by('project__name')
+        )
+
+    def get_formset(self, rows, new_rows=(), check_hours=True):
+        """Возвращает formset с данными вида [(project, hours, delete),...]
+        для существующих (rows) и новых (new_rows) назначений на проекты.
+        """
+        prefix = ProjectAssignmentFormSet.get_default_prefix()
+        data = {
+            '{}-TOTAL_FORMS'.format(prefix): len(rows) + len(new_rows),
+            '{}-INITIAL_FORMS'.format(prefix): len(rows),
+            '{}-MIN_NUM_FORMS'.format(prefix): 0,
+            '{}-MAX_NUM_FORMS'.format(prefix): 1000,
+        }
+        if check_hours:
+            data['check_hours'] = 'on'
+
+        instances = self.project_assignments + [None] * len(new_rows)
+        for index, (instance, (project, hours, delete)) in enumerate(
+                zip(instances, [*rows, *new_rows]),
+        ):
+            data.update({
+                '{}-{}-id'.format(prefix, index): instance.pk if instance else '',
+                '{}-{}-assignment'.format(prefix, index): self.assignment.pk,
+                '{}-{}-project'.format(prefix, index): Project.objects.get(name=project).pk,
+                '{}-{}-hours'.format(prefix, index): hours,
+            })
+            if delete:
+                data['{}-{}-DELETE'.format(prefix, index)] = 'on'
+
+        return ProjectAssignmentFormSet(data, instance=self.assignment)
+
+    def test_valid(self):
+        formset = self.get_formset([('P0', 30, False), ('P1', 20, False), ('P2', 6, False)])
+        self.assertTrue(formset.is_valid())
+
+    def test_over_limit(self):
+        formset = self.get_formset([('P0', 31, False), ('P1', 20, False), ('P2', 6, False)])
+        self.assertFalse(formset.is_valid())
+        self.assertTrue(formset.non_form_errors())
+
+        formset = self.get_formset(
+            [('P0', 31, False), ('P1', 20, False), ('P2', 6, False)],
+            check_hours=False,
+        )
+        self.assertTrue(formset.is_valid())
+
+    def test_delete(self):
+        """Часы удаляемых назначений на проекты не учитываются."""
+        formset = self.get_formset([('P0', 36, False), ('P1', 20, False), ('P2', 5, True)])
+        self.assertTrue(formset.is_valid())
+
+    def test_new_row(self):
+        formset = self.get_formset(
+            [('P0', 10, False), ('P1', 20, False), ('P2', 5, False)],
+            [('P1', 1, False)],
+        )
+        self.assertFalse(formset.is_valid())
+        self.assertTrue(formset.forms[3].non_field_errors())
+
+    def test_duplicate(self):
+        formset = self.get_formset([('P0', 10, False), ('P0', 20, False), ('P2', 5, False)])
+        self.assertFalse(formset.is_valid())
+
+    def test_swapped_projects(self):
+        """Проекты меняются местами: как и при проверке уникальности
+        запросами к БД, проект сравнивается с сохраненными записями.
+        """
+        formset = self.get_formset([('P1', 10, False), ('P0', 20, False), ('P2', 5, False)])
+        self.assertFalse(formset.is_valid())
+        self.assertTrue(formset.forms[0].non_field_errors())
+        self.assertTrue(formset.forms[1].non_field_errors())
+
+    def test_query_count(self):
+        """Часы и уникальность проектов проверяются без
+        запросов для каждой формы (снимок Capacity).
+        """
+        formset = self.get_formset([('P0', 30, False), ('P1', 20, False), ('P2', 6, False)])
+        with self.assertNumQueries(10):
+            self.assertTrue(formset.is_valid())
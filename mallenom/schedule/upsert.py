@@ -0,0 +1,270 @@
+import datetime
+
+from django.db import transaction
+from django.utils.translation import gettext
+
+from core.signals import bulk_changed
+from employee.models import Employment
+from workcal.models import Day
+
+from .models import Assignment, Project, ProjectAssignment, WeekHours
+
+
+class ProjectAssignmentUpsert:
+    """Добавление или изменение назначений на проекты набором строк.
+
+    Каждая строка задает часы по проекту на неделю для должности:
+    недостающие назначения (Assignment) создаются, часы существующих
+    назначений на проекты изменяются. Проверка данных выполняется
+    для всего набора сразу несколькими запросами, строки с ошибками
+    не сохраняются.
+    """
+
+    def __init__(self, rows, *, check_hours=True):
+        """
+        Args:
+            rows - список строк вида [{'employment': табельный номер,
+                'week': понедельник недели (date или строка YYYY-MM-DD),
+                'project': название проекта, 'hours': часы},...]
+
+        Kwargs:
+            check_hours - проверять, что сумма часов по проектам за неделю
+                не превышает колличество рабочих часов с учетом
+                штатных единиц (строки недели с превышением не сохраняются)
+        """
+        self.rows = rows
+        self.check_hours = check_hours
+        self.errors = []
+
+    @staticmethod
+    def _parse_week(value):
+        """Возвращает дату понедельника недели или None."""
+        if isinstance(value, str):
+            try:
+                value = datetime.datetime.strptime(value.strip(), '%Y-%m-%d').date()
+            except ValueError:
+                return None
+
+        if isinstance(value, datetime.date) and not value.weekday():
+            return value
+        return None
+
+    @staticmethod
+    def _parse_hours(value):
+        """Возвращает колличество часов или None."""
+        if isinstance(value, str):
+            value = value.strip()
+            if not value.isdigit():
+                return None
+            value = int(value)
+
+        if type(value) is int and 0 < value <= 168:
+            return value
+        return None
+
+    def _get_weeks(self, employments, projects):
+        """Проверяет строки и группирует их по неделям должностей.
+
+        Args:
+            employments - занимаемые должности вида {номер: (pk, ставка)}
+            projects - активные проекты вида {название: pk}
+
+        Returns:
+            строки вида {(employment, week): {project: (row, item, hours)}}
+        """
+        weeks = {}
+        for row, item in enumerate(self.rows, 1):
+            week = self._parse_week(item.get('week'))
+            hours = self._parse_hours(item.get('hours'))
+            employment = employments.get(item.get('employment'))
+            project = projects.get(item.get('project'))
+
+            if week is None:
+                self.errors.append((row, item, gettext("Invalid week")))
+            elif employment is None:
+                self.errors.append((row, item, gettext("Unknown position")))
+            elif project is None:
+                self.errors.append((row, item, gettext("Unknown project")))
+            elif hours is None:
+                self.errors.append((row, item, gettext("Invalid hours")))
+            else:
+                week_rows = weeks.setdefault((employment[0], week), {})
+                if project in week_rows:
+                    self.errors.append((row, item, gettext("Duplicate row")))
+                else:
+                    week_rows[project] = (row, item, hours)
+
+        return weeks
+
+    def _check_hours(self, weeks, hours_exists, staff_units):
+        """Убирает из weeks недели, сумма часов которых превышает
+        колличество рабочих часов с учетом штатных единиц.
+
+        Args:
+            weeks - строки по неделям должностей (см. _get_weeks)
+            hours_exists - существующие часы по проектам вида
+                {(employment, week): {project: hours}}
+            staff_units - штатные единицы вида {employment: ставка}
+        """
+        keys = list(weeks)
+        work_hours = Day.objects.get_work_hours_counts([
+            (week, week + datetime.timedelta(days=6)) for _, week in keys
+        ])
+
+        for key, work_hours_max in zip(keys, work_hours):
+            week_hours = dict(hours_exists.get(key, {}))
+            week_hours.update(
+                (project, hours)
+                for project, (_, _, hours) in weeks[key].items()
+            )
+
+            hours_available = work_hours_max * staff_units[key[0]]
+            if sum(week_hours.values()) > hours_available:
+                message = gettext(
+                    "Hours per week must be less than or equal to {}"
+                ).format(hours_available)
+                self.errors.extend(
+                    (row, item, message)
+                    for row, item, _ in weeks.pop(key).values()
+                )
+
+        self.errors.sort(key=lambda error: error[0])
+
+    @staticmethod
+    def _get_assignments(weeks):
+        """Возвращает назначения на недели weeks
+        вида {(employment, start): pk}.
+        """
+        return {
+            (employment, start): pk
+            for pk, employment, start in Assignment._base_manager.filter(
+                start__in=weeks,
+            ).values_list('pk', 'employment', 'start').order_by()
+        }
+
+    def _save(self, weeks, week_list, hours_exists):
+        """Сохраняет назначения на проекты.
+
+        Args:
+            weeks - строки по неделям должностей (см. _get_weeks)
+            week_list - недели строк
+            hours_exists - существующие часы по проектам
+
+        Returns:
+            tuple вида (список добавленных назначений на проекты,
+            список измененных назначений на проекты)
+        """
+        with transaction.atomic():
+            assignments = self._get_assignments(week_list)
+
+            assignments_new = [
+                Assignment(
+                    employment_id=employment,
+                    start=week,
+                    end=week + datetime.timedelta(days=6),
+                ) for employment, week in weeks
+                if (employment, week) not in assignments
+            ]
+            if assignments_new:
+                Assignment._base_manager.bulk_create(assignments_new)
+                # bulk_create не возвращает id записей для всех БД
+                assignments = self._get_assignments(week_list)
+
+            # Существующие назначения на проекты
+            project_assignments = {
+                (assignment, project): pk
+                for pk, assignment, project in ProjectAssignment._base_manager.filter(
+                    assignment__start__in=week_list,
+                ).values_list('pk', 'assignment', 'project').order_by()
+            }
+
+            created, updated = [], []
+            for key, week_rows in weeks.items():
+                assignment = assignments[key]
+                for project, (_, _, hours) in week_rows.items():
+                    pk = project_assignments.get((assignment, project))
+                    if pk is None:
+                        created.append(ProjectAssignment(
+                            assignment_id=assignment,
+                            project_id=project,
+                            hours=hours,
+                        ))
+                    elif hours_exists.get(key, {}).get(project) != hours:
+                        updated.append(ProjectAssignment(
+                            pk=pk,
+                            assignment_id=assignment,
+                            project_id=project,
+                            hours=hours,
+                        ))
+
+            created = ProjectAssignment.objects.bulk_create(created)
+            ProjectAssignment.objects.bulk_update(updated, ['hours'])
+
+            # bulk_create и bulk_update не отправляют сигнал post_save
+            WeekHours.objects.refresh(weeks)
+
+        return created, updated
+
+    def save(self):
+        """Проверяет и сохраняет строки.
+
+        Returns:
+            tuple вида (список добавленных назначений на проекты,
+            список измененных назначений на проекты,
+            список ошибок вида [(номер строки, строка, ошибка),...])
+        """
+        self.errors = []
+
+        # Занимаемые должности и активные проекты
+        employments = {
+            number: (pk, count)
+            for number, pk, count in Employment._base_manager.filter(
+                count__gt=0,
+            ).values_list('number', 'pk', 'count').order_by()
+        }
+        projects = dict(
+            Project._base_manager.filter(
+                status=True,
+            ).values_list('name', 'pk').order_by()
+        )
+
+        weeks = self._get_weeks(employments, projects)
+        if not weeks:
+            return [], [], self.errors
+
+        week_list = sorted(set(week for _, week in weeks))
+
+        # Существующие часы по проектам вида
+        # {(employment, week): {project: hours}}
+        hours_exists = {}
+        for employment, project, week, hours in WeekHours.objects.filter(
+                week__in=week_list,
+        ).values_list('employment', 'project', 'week', 'hours').order_by():
+            if (employment, week) in weeks:
+                hours_exists.setdefault((employment, week), {})[project] = hours
+
+        if self.check_hours:
+            self._check_hours(weeks, hours_exists, dict(employments.values()))
+            if not weeks:
+                return [], [], self.errors
+
+        created, updated = self._save(weeks, week_list, hours_exists)
+
+        # Версия данных для отчетов изменяется
+        # обработчиком сигнала (см. reports.signals)
+        if created or updated:
+            bulk_changed.send(sender=ProjectAssignment)
+
+        return created, updated, self.errors
+
+
+def bulk_upsert(rows, *, check_hours=True):
+    """Добавляет или изменяет назначения на проекты одной
+    транзакцией (см. ProjectAssignmentUpsert).
+
+    Returns:
+        tuple вида (список добавленных назначений на проекты,
+        список измененных назначений на проекты,
+        список ошибок вида [(номер строки, строка, ошибка),...])
+    """
+    return ProjectAssignmentUpsert(rows, check_hours=check_hours).save()
@@ -12,6 +12,7 @@ from django_filters.views import FilterView
 from core.views import (
     ActionTableDeleteMixin,
     DeleteMessageMixin,
+    PaginatedTableMixin,
     SingleFormSetMixin,
 )
 
@@ -38,10 +39,9 @@ from .filters import (
 
 # Create your views here.
 
-class ProjectList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class ProjectList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = Project
     table_class = ProjectTable
-    table_pagination = False
     filterset_class = ProjectFilter
     template_name = 'schedule/project_list.html'
     action_table_model = Project
@@ -87,10 +87,10 @@ class ProjectDelete(DeleteMessageMixin, DeleteView):
     success_url = reverse_lazy('schedule:project:list')
 
 
-class AssignmentList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class AssignmentList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = Assignment
     table_class = AssignmentTable
-    table_pagination = False
+    table_lazy_pagination = True
     filterset_class = AssignmentFilter
     template_name = 'schedule/assignment_list.html'
     action_table_model = Assignment
@@ -149,10 +149,10 @@ class AssignmentDelete(DeleteMessageMixin, DeleteView):
     success_url = reverse_lazy('schedule:assignment:list')
 
 
-class ProjectAssignmentList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class ProjectAssignmentList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = ProjectAssignment
     table_class = ProjectAssignmentTable
-    table_pagination = False
+    table_lazy_pagination = True
     filterset_class = ProjectAssignmentFilter
     template_name = 'schedule/projectassignment_list.html'
     action_table_model = ProjectAssignment
@@ -185,10 +185,10 @@ class ProjectAssignmentDelete(DeleteMessageMixin, DeleteView):
     success_url = reverse_lazy('schedule:projectassignment:list')
 
 
-class AbsenceList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class AbsenceList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = Absence
     table_class = AbsenceTable
-    table_pagination = False
+    table_lazy_pagination = True
     filterset_class = AbsenceFilter
     template_name = 'schedule/absence_list.html'
     action_table_model = Absence
@@ -24,6 +24,11 @@ class StaffingForm(forms.ModelForm):
         model = Staffing
         fields = '__all__'
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['department'].queryset = Department.objects_plain.all()
+        self.fields['position'].queryset = Position.objects_plain.all()
+
     def clean_count(self):
         """Колличество штатных единиц в рассписании не должно
         быть меньше чем занято по штатной расстановке.
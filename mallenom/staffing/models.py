@@ -10,17 +10,20 @@ from core.utils import get_unique_slug
 
 # Create your models here.
 
-class DepartmentManager(models.Manager):
-    def get_queryset(self):
+class DepartmentQuerySet(models.QuerySet):
+    def with_stats(self):
+        """Добавляет колличество должностей, штатных едениц
+        по расписанию и занятых штатных едениц.
+        """
         staff_units_held = Subquery(
-            Staffing.objects.filter(
+            Staffing.objects_plain.filter(
                 department=OuterRef('pk')
             ).values('department').order_by('department').annotate(
                 sum=Coalesce(models.Sum('employments__count'), 0.0)
             ).values('sum')
         )
 
-        return super().get_queryset().annotate(
+        return self.annotate(
             positions_count=models.Count('positions'),
             staff_units_count=models.functions.Coalesce(
                 models.Sum('staffing__count'), 0
@@ -29,6 +32,11 @@ class DepartmentManager(models.Manager):
         )
 
 
+class DepartmentManager(models.Manager.from_queryset(DepartmentQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().with_stats()
+
+
 class Department(models.Model):
     name = models.CharField(
         max_length=128,
@@ -55,6 +63,8 @@ class Department(models.Model):
     )
 
     objects = DepartmentManager()
+    # Без аннотаций, статистика добавляется методом with_stats()
+    objects_plain = DepartmentQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('Department')
@@ -89,17 +99,20 @@ class Department(models.Model):
         )
 
 
-class PositionManager(models.Manager):
-    def get_queryset(self):
+class PositionQuerySet(models.QuerySet):
+    def with_stats(self):
+        """Добавляет колличество подразделений, штатных едениц
+        по расписанию и занятых штатных едениц.
+        """
         staff_units_held = Subquery(
-            Staffing.objects.filter(
+            Staffing.objects_plain.filter(
                 position=OuterRef('pk')
             ).values('position').order_by('position').annotate(
                 sum=Coalesce(models.Sum('employments__count'), 0.0)
             ).values('sum')
         )
 
-        return super().get_queryset().annotate(
+        return self.annotate(
             departments_count=models.Count('departments'),
             staff_units_count=models.functions.Coalesce(
                 models.Sum('staffing__count'), 0
@@ -108,6 +121,11 @@ class PositionManager(models.Manager):
         )
 
 
+class PositionManager(models.Manager.from_queryset(PositionQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().with_stats()
+
+
 class Position(models.Model):
     name = models.CharField(
         max_length=128,
@@ -127,6 +145,8 @@ class Position(models.Model):
     )
 
     objects = PositionManager()
+    # Без аннотаций, статистика добавляется методом with_stats()
+    objects_plain = PositionQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('Position')
@@ -161,17 +181,23 @@ class Position(models.Model):
         )
 
 
-class StaffingManager(models.Manager):
-    def get_queryset(self):
-        return super().get_queryset().select_related(
-            'department', 'position',
-        ).annotate(
+class StaffingQuerySet(models.QuerySet):
+    def with_stats(self):
+        """Добавляет колличество занятых штатных едениц."""
+        return self.annotate(
             staff_units_held=models.functions.Coalesce(
                 models.Sum('employments__count'), 0.0
             )
         )
 
 
+class StaffingManager(models.Manager.from_queryset(StaffingQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'department', 'position',
+        ).with_stats()
+
+
 class Staffing(models.Model):
     department = models.ForeignKey(
         Department,
@@ -200,6 +226,8 @@ class Staffing(models.Model):
     )
 
     objects = StaffingManager()
+    # Без аннотаций, статистика добавляется методом with_stats()
+    objects_plain = StaffingQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('Staff unit')
@@ -208,10 +236,23 @@ class Staffing(models.Model):
         ordering = ['position__name', 'department__name']
 
     def __str__(self):
+        return self.get_label(self.position, self.department)
+
+    @staticmethod
+    def get_label(position, department):
+        """Возвращает наименование штатной единицы (см. __str__).
+
+        Args:
+            position - должность или ее наименование
+            department - подразделение или его наименование
+
+        Returns:
+            наименование штатной единицы
+        """
         return _("{position} ({department_verbose}: {department})").format(
-            position=self.position,
-            department_verbose=self.department._meta.verbose_name,
-            department=self.department,
+            position=position,
+            department_verbose=Department._meta.verbose_name,
+            department=department,
         )
 
     def get_absolute_url(self):
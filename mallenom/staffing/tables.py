@@ -2,10 +2,14 @@ from django.utils.translation import gettext_lazy as _
 
 import django_tables2 as tables
 
+from core.tables import TotalsTableMixin
+
 from .models import Department, Position, Staffing
 
 
-class DepartmentTable(tables.Table):
+class DepartmentTable(TotalsTableMixin, tables.Table):
+    totals = ('staff_units_count', 'staff_units_held')
+
     name = tables.LinkColumn(
         verbose_name=_('Department'),
     )
@@ -15,13 +19,13 @@ class DepartmentTable(tables.Table):
     staff_units_count = tables.Column(
         verbose_name=_("Staff units count"),
         footer=lambda table: _('Total: {}').format(
-            sum(x.staff_units_count for x in table.data)
+            table.get_total('staff_units_count')
         )
     )
     staff_units_held = tables.Column(
         verbose_name=_("Staff units held"),
         footer=lambda table: _('Total: {}').format(
-            sum(x.staff_units_held for x in table.data)
+            table.get_total('staff_units_held')
         )
     )
     delete = tables.CheckBoxColumn(accessor="pk")
@@ -37,7 +41,9 @@ class DepartmentTable(tables.Table):
         empty_text = _("There are no records available")
 
 
-class PositionTable(tables.Table):
+class PositionTable(TotalsTableMixin, tables.Table):
+    totals = ('staff_units_count', 'staff_units_held')
+
     name = tables.LinkColumn(
         verbose_name=_('Position'),
     )
@@ -47,13 +53,13 @@ class PositionTable(tables.Table):
     staff_units_count = tables.Column(
         verbose_name=_("Staff units count"),
         footer=lambda table: _('Total: {}').format(
-            sum(x.staff_units_count for x in table.data)
+            table.get_total('staff_units_count')
         )
     )
     staff_units_held = tables.Column(
         verbose_name=_("Staff units held"),
         footer=lambda table: _('Total: {}').format(
-            sum(x.staff_units_held for x in table.data)
+            table.get_total('staff_units_held')
         )
     )
     delete = tables.CheckBoxColumn(accessor="pk")
@@ -69,7 +75,9 @@ class PositionTable(tables.Table):
         empty_text = _("There are no records available")
 
 
-class StaffingTable(tables.Table):
+class StaffingTable(TotalsTableMixin, tables.Table):
+    totals = ('count', 'staff_units_held')
+
     department = tables.Column(
         linkify=(
             'staffing:department:detail',
@@ -80,13 +88,13 @@ class StaffingTable(tables.Table):
     )
     count = tables.Column(
         footer=lambda table: _('Total: {}').format(
-            sum(x.count for x in table.data)
+            table.get_total('count')
         )
     )
     staff_units_held = tables.Column(
         verbose_name=_("Staff units held"),
         footer=lambda table: _('Total: {}').format(
-            sum(x.staff_units_held for x in table.data)
+            table.get_total('staff_units_held')
         )
     )
     delete = tables.CheckBoxColumn(accessor="pk")
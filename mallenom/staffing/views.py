@@ -12,6 +12,7 @@ from django_filters.views import FilterView
 from core.views import (
     ActionTableDeleteMixin,
     DeleteMessageMixin,
+    PaginatedTableMixin,
     SingleFormSetMixin,
 )
 
@@ -27,10 +28,9 @@ from .filters import DepartmentFilter, PositionFilter, StaffingFilter
 
 # Create your views here.
 
-class DepartmentList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class DepartmentList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = Department
     table_class = DepartmentTable
-    table_pagination = False
     filterset_class = DepartmentFilter
     template_name = 'staffing/department_list.html'
     action_table_model = Department
@@ -79,10 +79,9 @@ class DepartmentDelete(DeleteMessageMixin, DeleteView):
     success_url = reverse_lazy('staffing:department:list')
 
 
-class PositionList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class PositionList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = Position
     table_class = PositionTable
-    table_pagination = False
     filterset_class = PositionFilter
     template_name = 'staffing/position_list.html'
     action_table_model = Position
@@ -128,10 +127,9 @@ class PositionDelete(DeleteMessageMixin, DeleteView):
     success_url = reverse_lazy('staffing:position:list')
 
 
-class StaffingList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class StaffingList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = Staffing
     table_class = StaffingTable
-    table_pagination = False
     filterset_class = StaffingFilter
     template_name = 'staffing/staffing_list.html'
     action_table_model = Staffing
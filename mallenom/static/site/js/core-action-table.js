@@ -7,6 +7,13 @@ $(document).ready(function() {
     // Make table DataTable
     var table = $('.table-container table')
 
+    // Table is paginated and ordered on server side
+    // (see core.views.PaginatedTableMixin)
+    if (table.is('[data-server-side]')) {
+        table.addClass("hover")
+        return;
+    }
+
     var datatable_options = {
         "filter": false,
         "lengthMenu": [ [10, 25, 50, 100, -1], [10, 25, 50, 100, "All"] ],
@@ -0,0 +1,24 @@
+$(document).ready(function() {
+    // Poll report job status until it is finished
+    var job = $("#report-job")
+    var url = job.data('status-url')
+
+    var timer = setInterval(function() {
+        $.getJSON(url, function(job_json) {
+            $("#report-job-status").text(job_json.status_display);
+
+            if (job_json.status == 'done') {
+                clearInterval(timer);
+                $("#report-job-download")
+                    .attr('href', job_json.download_url)
+                    .show();
+            } else if (job_json.status == 'failed') {
+                clearInterval(timer);
+                $("#report-job-error").text(job_json.error);
+            }
+        }).fail(function() {
+            // Stop polling if status is not available
+            clearInterval(timer);
+        });
+    }, 2000);
+});
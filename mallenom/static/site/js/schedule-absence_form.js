@@ -12,10 +12,10 @@ $(document).ready(function() {
         // In edit form
         var employment_selected = employment_field.val();
         // Get related employments in JSON
-        var url = `/api/employee/${employee_field.val()}/employment`;
+        var url = `/api/employee/${employee_field.val()}/employment/`;
         $.getJSON(url, function(employment_json) {
             var employment_valid_pks = employment_json.map(
-                (value) => value.pk
+                (value) => value.id
             )
             employment_field.html(employment_field_backup)
             employment_field.find('option').filter(function() {
@@ -36,10 +36,10 @@ $(document).ready(function() {
         }
         else {
             var employment_selected = employment_field.val();
-            var url = `/api/employee/${employee_field.val()}/employment`;
+            var url = `/api/employee/${employee_field.val()}/employment/`;
             $.getJSON(url, function(employment_json) {
                 var employment_valid_pks = employment_json.map(
-                    (value) => value.pk
+                    (value) => value.id
                 )
                 employment_field.html(employment_field_backup)
                 employment_field.find('option').filter(function() {
@@ -5,3 +5,7 @@ from django.utils.translation import gettext_lazy as _
 class WorkCalConfig(AppConfig):
     name = 'workcal'
     verbose_name = _('Work calendar')
+
+    def ready(self):
+        # Подключаем обработчики сигналов
+        from . import signals
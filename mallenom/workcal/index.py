@@ -0,0 +1,200 @@
+import calendar
+import threading
+import time
+from itertools import accumulate
+
+from django.db import transaction
+
+from core.utils import (
+    get_cache_version,
+    get_shared_cache,
+    incr_cache_version,
+)
+
+
+class WorkCalendarIndex:
+    """Индекс производственного календаря.
+
+    Для каждого года хранит массивы накопленных сумм (prefix sum)
+    выходных дней, нестандартных рабочих дней и часов в нестандартные
+    рабочие дни. Позволяет получить колличество рабочих дней и часов
+    в любом интервале без обращения к БД.
+
+    Индекс строится при первом обращении и сбрасывается при
+    изменении дней или типов дней (см. signals).
+
+    Помимо индекса хранит в общем для всех процессов кэше
+    (см. core.utils.get_shared_cache) номер версии данных календаря.
+    Номер меняется при каждом сбросе индекса и проверяется перед
+    каждым использованием индекса, поэтому индекс, построенный
+    другим процессом до изменения календаря, не используется.
+    Номер также используется в ключах кэша, зависящих от календаря.
+
+    Чтобы не обращаться к общему кэшу при каждом вычислении,
+    полученный номер используется в течение version_check_interval
+    секунд. Сброс индекса в текущем процессе учитывается сразу,
+    в других процессах - не позднее, чем через этот интервал.
+    """
+
+    # Ключ номера версии данных календаря в кэше
+    version_key = 'workcal:version'
+
+    # Интервал проверки номера версии в общем кэше (секунды)
+    version_check_interval = 1
+
+    def __init__(self):
+        # (версия данных, {year: (rest, uncommon, uncommon_hours)})
+        self._years = None
+        # (версия данных, время проверки)
+        self._version = None
+        # Номер версии индекса, увеличивается при сбросе
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Сбрасывает индекс. Индекс будет построен заново
+        при следующем обращении (в том числе после завершения
+        текущей транзакции).
+        """
+        self._reset()
+        transaction.on_commit(self._reset)
+
+    def _reset(self):
+        incr_cache_version(get_shared_cache(), self.version_key)
+
+        with self._lock:
+            self._generation += 1
+            self._years = None
+            self._version = None
+
+    @property
+    def version(self):
+        """Номер версии данных календаря."""
+        now = time.monotonic()
+        checked = self._version
+        if checked is not None and now - checked[1] < self.version_check_interval:
+            return checked[0]
+
+        version = get_cache_version(get_shared_cache(), self.version_key)
+        self._version = (version, now)
+        return version
+
+    def _build(self):
+        """Строит индекс по данным из БД.
+
+        Returns:
+            словарь вида {year: (rest, uncommon, uncommon_hours)},
+            где каждый элемент - список накопленных сумм по дням года
+        """
+        from .models import Day
+
+        days = {}
+        for date, hours in Day.objects.values_list(
+                'date', 'day_type__hours',
+        ).order_by():
+            days.setdefault(date.year, {})[date.timetuple().tm_yday] = hours
+
+        years = {}
+        for year, year_days in days.items():
+            length = 366 if calendar.isleap(year) else 365
+            rest = [0] * (length + 1)
+            uncommon = [0] * (length + 1)
+            uncommon_hours = [0] * (length + 1)
+
+            for yday, hours in year_days.items():
+                if hours:
+                    uncommon[yday] = 1
+                    uncommon_hours[yday] = hours
+                else:
+                    rest[yday] = 1
+
+            years[year] = (
+                list(accumulate(rest)),
+                list(accumulate(uncommon)),
+                list(accumulate(uncommon_hours)),
+            )
+
+        return years
+
+    def _get_years(self):
+        # Индекс мог быть сброшен в другом процессе
+        version = self.version
+        if self._years is not None:
+            years_version, years = self._years
+            if years_version == version:
+                return years
+
+        generation = self._generation
+        years = self._build()
+
+        with self._lock:
+            # Индекс мог быть сброшен во время построения
+            if generation == self._generation:
+                self._years = (version, years)
+
+        return years
+
+    def get_counts(self, start, end):
+        """Возвращает колличество дней в интервале по категориям.
+
+        Args:
+            start - начало интервала
+            end - конец интервала
+
+        Returns:
+            tuple вида (всего дней, выходных дней,
+            нестандартных рабочих дней, часов в нестандартные дни)
+        """
+        return self._get_counts(self._get_years(), start, end)
+
+    def get_counts_many(self, intervals):
+        """Возвращает колличество дней по категориям
+        для нескольких интервалов (см. get_counts).
+
+        Индекс получается один раз для всех интервалов,
+        одинаковые интервалы вычисляются один раз.
+
+        Args:
+            intervals - список вида [(start, end),...]
+
+        Returns:
+            список tuple в порядке интервалов
+        """
+        years = self._get_years()
+
+        counts = {}
+        for interval in intervals:
+            if interval not in counts:
+                counts[interval] = self._get_counts(years, *interval)
+
+        return [counts[interval] for interval in intervals]
+
+    @staticmethod
+    def _get_counts(years, start, end):
+        if start > end:
+            start, end = end, start
+
+        result = [(end - start).days + 1, 0, 0, 0]
+
+        for year in range(start.year, end.year + 1):
+            arrays = years.get(year)
+            if arrays is None:
+                # Год отсутствует в календаре
+                continue
+
+            first = 0
+            if year == start.year:
+                first = start.timetuple().tm_yday - 1
+
+            last = len(arrays[0]) - 1
+            if year == end.year:
+                last = end.timetuple().tm_yday
+
+            for index, array in enumerate(arrays, 1):
+                result[index] += array[last] - array[first]
+
+        return tuple(result)
+
+
+# Индекс, общий для процесса
+calendar_index = WorkCalendarIndex()
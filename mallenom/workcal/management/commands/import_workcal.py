@@ -0,0 +1,83 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from workcal.models import Day
+from workcal.utils import WorkCalendarParser
+
+
+class Command(BaseCommand):
+    help = "Imports work calendar from CSV file (path or URL)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help="Path or URL (http://, https://, file://) of CSV file",
+        )
+        parser.add_argument(
+            '--year', action='append', type=int, dest='years',
+            help="Import only specified year (can be repeated)",
+        )
+        parser.add_argument(
+            '--language', default='ru',
+            choices=WorkCalendarParser.languages,
+            help="Language of CSV file",
+        )
+        parser.add_argument(
+            '--jobs', type=int, default=1,
+            help="Number of processes used to parse years",
+        )
+        parser.add_argument(
+            '--update', action='store_true',
+            help="Update day type of days already present in calendar",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            parser = WorkCalendarParser(language=options['language'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        created_total, updated_total, errors_total = 0, 0, 0
+
+        try:
+            with WorkCalendarParser.open(options['source']) as file, \
+                    transaction.atomic():
+                # Анализируем и сохраняем данные по годам
+                for year, days in parser.iter_days(
+                        file,
+                        years=options['years'],
+                        jobs=options['jobs'],
+                ):
+                    created, updated, errors = Day.objects.bulk_import(
+                        days, update=options['update'],
+                    )
+
+                    for row, day, error in errors:
+                        self.stderr.write("{}, row {}: {}: {}".format(
+                            year, row, day, error,
+                        ))
+
+                    self.stdout.write(
+                        "{}: {} days added, {} days updated, {} rows rejected".format(
+                            year, len(created), len(updated), len(errors),
+                        )
+                    )
+
+                    created_total += len(created)
+                    updated_total += len(updated)
+                    errors_total += len(errors)
+        except (OSError, ValueError, LookupError, csv.Error) as error:
+            raise CommandError("Import error ({type}): {error}".format(
+                error=error,
+                type=type(error).__name__,
+            ))
+
+        message = "Import finished: {} days added, {} days updated, {} rows rejected".format(
+            created_total, updated_total, errors_total,
+        )
+        if errors_total:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -1,7 +1,9 @@
-from django.db import models
+import datetime
+
+from django.db import models, transaction
 from django.conf import settings
 from django.urls import reverse
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import gettext, gettext_lazy as _
 from django.core.validators import (
     validate_unicode_slug,
     MaxValueValidator,
@@ -9,7 +11,10 @@ from django.core.validators import (
 )
 
 from core.validators import validate_slug
-from core.utils import get_unique_slug
+from core.signals import bulk_changed
+from core.utils import get_unique_slug, set_unique_slugs
+
+from .index import calendar_index
 
 # Create your models here.
 
@@ -152,8 +157,8 @@ class DayManager(models.Manager):
             start - начало интервала
             end - конец интервала
         """
-        days_total = abs(end - start).days + 1
-        return days_total - self.get_rest_days(start, end).count()
+        days_total, rest_days, *_ = calendar_index.get_counts(start, end)
+        return days_total - rest_days
 
     def get_work_hours_count(self, start, end,
                              day_hours=settings.WORK_DAY_HOURS):
@@ -163,14 +168,99 @@ class DayManager(models.Manager):
             start - начало интервала
             end - конец интервала
         """
-        work_days = self.get_work_days_count(start, end)
-        uncommon_days = self.get_uncommon_days(start, end).aggregate(
-            count=models.Count('id'),
-            hours=models.functions.Coalesce(
-                models.Sum('day_type__hours'), 0
-            ),
+        days_total, rest_days, uncommon_days, uncommon_hours = (
+            calendar_index.get_counts(start, end)
         )
-        return (work_days - uncommon_days['count']) * day_hours + uncommon_days['hours']
+        work_days = days_total - rest_days
+        return (work_days - uncommon_days) * day_hours + uncommon_hours
+
+    def get_work_hours_counts(self, intervals,
+                              day_hours=settings.WORK_DAY_HOURS):
+        """Возвращает колличество рабочих часов
+        для нескольких интервалов (см. get_work_hours_count).
+
+        Args:
+            intervals - список вида [(start, end),...]
+
+        Returns:
+            список колличеств рабочих часов в порядке интервалов
+        """
+        return [
+            (days_total - rest_days - uncommon_days) * day_hours + uncommon_hours
+            for days_total, rest_days, uncommon_days, uncommon_hours
+            in calendar_index.get_counts_many(intervals)
+        ]
+
+    def bulk_import(self, days, *, update=False):
+        """Добавляет дни в календарь одной транзакцией.
+
+        Проверка данных выполняется для всего набора сразу,
+        дни с ошибками не добавляются.
+
+        Args:
+            days - список дней вида
+                [{'date': dateObject, 'day_type': id},...]
+
+        Kwargs:
+            update - изменять тип дней, уже присутствующих
+                в календаре (иначе такие дни пропускаются)
+
+        Returns:
+            tuple вида (список добавленных дней, список измененных дней,
+            список ошибок вида [(номер строки, день, ошибка),...])
+        """
+        errors = []
+        dates = [day.get('date') for day in days]
+        valid_dates = [date for date in dates if isinstance(date, datetime.date)]
+
+        # Сущесвующие в базе дни и типы дней
+        days_exists = {}
+        if valid_dates:
+            days_exists = {
+                date: (pk, day_type)
+                for date, pk, day_type in self.filter(
+                    date__gte=min(valid_dates),
+                    date__lte=max(valid_dates),
+                ).values_list('date', 'id', 'day_type').order_by()
+            }
+        day_types = set(DayType.objects.values_list('id', flat=True).order_by())
+
+        # Дни для добавления и изменения
+        days_new = {}
+        days_changed = {}
+        for row, day in enumerate(days, 1):
+            date, day_type = day.get('date'), day.get('day_type')
+
+            if not isinstance(date, datetime.date):
+                errors.append((row, day, gettext("Invalid date")))
+            elif day_type not in day_types:
+                errors.append((row, day, gettext("Unknown day type")))
+            elif date in days_new or date in days_changed:
+                errors.append((row, day, gettext("Duplicate date")))
+            elif date not in days_exists:
+                days_new[date] = day_type
+            elif update and days_exists[date][1] != day_type:
+                days_changed[date] = day_type
+
+        days_new = set_unique_slugs([
+            self.model(date=date, day_type_id=day_type)
+            for date, day_type in days_new.items()
+        ], 'slug', 'date', unique=True)
+        days_changed = [
+            self.model(id=days_exists[date][0], date=date, day_type_id=day_type)
+            for date, day_type in days_changed.items()
+        ]
+
+        with transaction.atomic():
+            created = self.bulk_create(days_new)
+            self.bulk_update(days_changed, ['day_type'])
+
+        # bulk_create и bulk_update не отправляют сигнал post_save,
+        # версия календаря общая для всех процессов (см. workcal.signals)
+        if created or days_changed:
+            bulk_changed.send(sender=self.model)
+
+        return created, days_changed, errors
 
 
 class Day(models.Model):
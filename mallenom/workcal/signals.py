@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.signals import bulk_changed
+
+from .models import DayType, Day
+from .index import calendar_index
+
+
+@receiver(bulk_changed, sender=Day)
+@receiver(post_save, sender=Day)
+@receiver(post_delete, sender=Day)
+@receiver(post_save, sender=DayType)
+@receiver(post_delete, sender=DayType)
+def invalidate_calendar_index(sender, **kwargs):
+    """Сбрасывает индекс производственного календаря
+    при изменении дней или типов дней.
+    """
+    calendar_index.invalidate()
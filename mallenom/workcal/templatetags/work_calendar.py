@@ -2,9 +2,12 @@ import calendar
 import datetime
 
 from django import template
+from django.core.cache import cache
 from django.urls import reverse
+from django.utils.encoding import iri_to_uri
 
 from workcal.models import Day
+from workcal.index import calendar_index
 
 
 register = template.Library()
@@ -22,13 +25,31 @@ def work_calendar(parser, token):
 
 
 class WorkCalendarNode(template.Node):
+    # Время хранения календаря в кэше (секунды)
+    cache_timeout = 24 * 60 * 60
+
     def __init__(self, year):
         self.year = template.Variable(year)
 
     def render(self, context):
         year = self.year.resolve(context)
         locale = context.get('request').LANGUAGE_CODE
-        return WorkCalendar(locale=locale).formatyear(theyear=year)
+
+        # Календарь кэшируется для года и языка. Номер версии
+        # данных календаря общий для всех процессов (см.
+        # calendar_index.version), после изменения календаря
+        # в любом процессе используется новый ключ, а записи
+        # со старыми ключами удаляются по истечении cache_timeout
+        key = 'workcal:calendar:{version}:{year}:{locale}'.format(
+            version=calendar_index.version,
+            year=year,
+            locale=locale,
+        )
+        html = cache.get(key)
+        if html is None:
+            html = WorkCalendar(locale=locale).formatyear(theyear=year)
+            cache.set(key, html, self.cache_timeout)
+        return html
 
 
 class WorkCalendar(calendar.LocaleHTMLCalendar):
@@ -60,20 +81,40 @@ class WorkCalendar(calendar.LocaleHTMLCalendar):
             if locale == locales['en']:
                 calendar.month_name = month_name_en
 
-        # Дни, присутствующие в БД
-        self.unusual_days = {
-            day.date: {
-                'css_class': day.day_type.css_class,
-                'url': day.get_absolute_url(),
-            } for day in Day.objects.all()
-        }
+        self.unusual_days = {}
 
         self.cssclass_year_head = 'year-head'
 
         self.day_create_url = reverse('workcal:day:create')
 
+        # Шаблон ссылки на день (вместо reverse для каждого дня)
+        placeholder = 'slug'
+        self.day_url_prefix, self.day_url_suffix = reverse(
+            'workcal:day:detail',
+            kwargs={'slug': placeholder},
+        ).rsplit(placeholder, 1)
+
         super(WorkCalendar, self).__init__(firstweekday, locale)
 
+    def formatyear(self, theyear, width=3):
+        """Переопределен для получения из БД
+        только дней текущего года.
+        """
+        self.unusual_days = {
+            day['date']: {
+                'css_class': day['day_type__css_class'],
+                'url': '{}{}{}'.format(
+                    self.day_url_prefix,
+                    iri_to_uri(day['slug']),
+                    self.day_url_suffix,
+                ),
+            } for day in Day.objects.filter(
+                date__year=theyear,
+            ).values('date', 'slug', 'day_type__css_class').order_by()
+        }
+
+        return super(WorkCalendar, self).formatyear(theyear, width=width)
+
     def formatmonth(self, theyear, themonth, withyear=True):
         """Переопределен для добавления переменных year и month
         для доступа из formatday к данным о текущем годе и месяце.
@@ -1,3 +1,225 @@
+import calendar
+import datetime
+import os
+import random
+import time
+import tracemalloc
+from collections import deque
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import models
 from django.test import TestCase
 
-# Create your tests here.
+from . import index
+from .models import DayType, Day
+from .utils import WorkCalendarParser
+
+# Тесты производительности зависят от нагрузки на систему
+# и запускаются только при заданной переменной окружения BENCHMARK
+benchmark = skipUnless(
+    os.environ.get('BENCHMARK'), "Set BENCHMARK=1 to run benchmarks",
+)
+
+
+def get_calendar_csv(years, start=2000):
+    """Возвращает производственный календарь в csv формате
+    на years лет: выходные дни, сокращенные (отметка '*')
+    и перенесенные (отметка '+') дни.
+    """
+    header = WorkCalendarParser.year['ru']
+    months = WorkCalendarParser.months['ru']
+    rows = ['{},{}'.format(header, ','.join(months))]
+
+    for year in range(start, start + years):
+        cells = []
+        for month in range(1, 13):
+            days = []
+            for day in range(1, calendar.monthrange(year, month)[1] + 1):
+                weekday = calendar.weekday(year, month, day)
+                if weekday >= 5:
+                    days.append('{}{}'.format(day, '+' if day == 1 else ''))
+                elif weekday == 4 and day % 7 == 0:
+                    days.append('{}*'.format(day))
+            cells.append('"{}"'.format(','.join(days)))
+        rows.append('{},{}'.format(year, ','.join(cells)))
+
+    return '\n'.join(rows)
+
+
+def get_intervals(count, start, end, seed=0):
+    """Возвращает count интервалов вида (start, end)
+    длиной до 30 дней между датами start и end.
+    """
+    generator = random.Random(seed)
+    days = (end - start).days
+    result = []
+    for _ in range(count):
+        first = start + datetime.timedelta(days=generator.randint(0, days))
+        last = first + datetime.timedelta(days=generator.randint(0, 30))
+        result.append((first, min(last, end)))
+    return result
+
+
+def get_work_hours_count_reference(start, end,
+                                   day_hours=settings.WORK_DAY_HOURS):
+    """Прежняя реализация Day.objects.get_work_hours_count
+    (запросы к БД для каждого интервала), используется
+    для проверки результатов.
+    """
+    work_days = (end - start).days + 1 - Day.objects.get_rest_days(
+        start, end,
+    ).count()
+    uncommon_days = Day.objects.get_uncommon_days(start, end).aggregate(
+        count=models.Count('id'),
+        hours=models.functions.Coalesce(
+            models.Sum('day_type__hours'), 0
+        ),
+    )
+    return (work_days - uncommon_days['count']) * day_hours + uncommon_days['hours']
+
+
+class WorkCalendarParserMixin:
+    @classmethod
+    def setUpTestData(cls):
+        DayType.objects.create(name='Rest', hours=0, csv_mark='')
+        DayType.objects.create(name='Short', hours=7, csv_mark='*')
+        DayType.objects.create(name='Moved', hours=0, csv_mark='+')
+
+
+class WorkCalendarParserTest(WorkCalendarParserMixin, TestCase):
+    def test_iter_dates_matches_convert_year(self):
+        """Дни, полученные построчно, совпадают с днями
+        списков по годам (_convertYear, get_days_list).
+        """
+        data = get_calendar_csv(3)
+        parser = WorkCalendarParser(data)
+
+        expected = [
+            (day['date'], day['day_type'])
+            for day in parser.get_days_list()
+        ]
+        self.assertTrue(expected)
+        self.assertEqual(list(parser.iter_dates(data)), expected)
+
+        for year, days in parser.iter_days(data):
+            self.assertEqual(days, parser._convertYear(
+                *next(row for row in parser._get_rows(data) if row[0] == year)
+            ))
+            self.assertEqual(
+                list(parser.iter_dates(data, years=[year])),
+                [(day['date'], day['day_type']) for day in days],
+            )
+
+    def test_invalid_day(self):
+        parser = WorkCalendarParser()
+        for day in ('5?', '32', '*'):
+            with self.assertRaises(ValueError):
+                parser._convertYear(2000, {1: [day]})
+
+
+class WorkCalendarParserMemoryTest(WorkCalendarParserMixin, TestCase):
+    """Построчный анализ календаря на 50 лет
+    не требует памяти для списков дней.
+    """
+    years = 50
+
+    def _get_peak(self, function):
+        tracemalloc.start()
+        try:
+            function()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_memory(self):
+        data = get_calendar_csv(self.years)
+
+        list_peak = self._get_peak(
+            lambda: WorkCalendarParser(data).get_days_list()
+        )
+        parser = WorkCalendarParser()
+        iter_peak = self._get_peak(
+            lambda: deque(parser.iter_dates(data), maxlen=0)
+        )
+
+        self.assertLess(iter_peak, list_peak / 4)
+
+
+class WorkHoursCountsMixin(WorkCalendarParserMixin):
+    # Календарь на 2 года
+    start = datetime.date(2000, 1, 1)
+    end = datetime.date(2001, 12, 31)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        data = get_calendar_csv(2, start=cls.start.year)
+        for _, days in WorkCalendarParser().iter_days(data):
+            Day.objects.bulk_import(days)
+
+
+class WorkHoursCountsTest(WorkHoursCountsMixin, TestCase):
+    def test_matches_reference(self):
+        """Колличество рабочих часов для нескольких интервалов
+        совпадает с результатом запросов к БД для каждого интервала.
+        """
+        intervals = get_intervals(200, self.start, self.end)
+        # Повторяющиеся интервалы и интервалы вне календаря
+        intervals.extend(intervals[:20])
+        intervals.append((datetime.date(1999, 12, 1), datetime.date(2000, 1, 10)))
+
+        self.assertEqual(
+            Day.objects.get_work_hours_counts(intervals),
+            [get_work_hours_count_reference(*interval) for interval in intervals],
+        )
+
+
+class WorkCalendarIndexTest(WorkHoursCountsMixin, TestCase):
+    def test_version_checked_once_per_interval(self):
+        """Номер версии читается из общего кэша не чаще раза
+        за интервал, сброс в текущем процессе учитывается сразу.
+        """
+        interval = (datetime.date(2000, 1, 1), datetime.date(2000, 1, 31))
+        hours = Day.objects.get_work_hours_count(*interval)
+
+        with mock.patch.object(
+                index, 'get_cache_version', wraps=index.get_cache_version,
+        ) as get_cache_version:
+            for _ in range(100):
+                Day.objects.get_work_hours_count(*interval)
+            self.assertLessEqual(get_cache_version.call_count, 1)
+
+            day = Day.objects.get(date=datetime.date(2000, 1, 1))
+            day.delete()
+            self.assertEqual(
+                Day.objects.get_work_hours_count(*interval),
+                hours + settings.WORK_DAY_HOURS,
+            )
+
+
+@benchmark
+class WorkHoursCountsBenchmark(WorkHoursCountsMixin, TestCase):
+    """Колличество рабочих часов для 10000 отсутствий,
+    частично входящих в отчет, вычисляется за один проход.
+    """
+    count = 10000
+
+    def test_faster_than_single(self):
+        intervals = get_intervals(self.count, self.start, self.end)
+        # Индекс строится до измерений
+        Day.objects.get_work_hours_counts(intervals[:1])
+
+        started = time.perf_counter()
+        expected = [
+            Day.objects.get_work_hours_count(*interval)
+            for interval in intervals
+        ]
+        single_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = Day.objects.get_work_hours_counts(intervals)
+        result_time = time.perf_counter() - started
+
+        self.assertEqual(result, expected)
+        self.assertLess(result_time, single_time)
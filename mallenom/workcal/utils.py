@@ -1,7 +1,13 @@
 import datetime
 import csv
+import io
+import os
+import pathlib
+import string
 import urllib.request
-from copy import deepcopy
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 
 from django.utils.translation import ugettext_lazy as _
 
@@ -90,8 +96,8 @@ class WorkCalendarParser:
         }
 
         if data:
-            if isinstance(data, str):
-                # Передана строка с данными
+            if isinstance(data, (str, io.IOBase)):
+                # Передана строка или файл с данными
                 self.calendar = self._parser(data)
             elif isinstance(data, dict):
                 # Передан календарь
@@ -111,10 +117,8 @@ class WorkCalendarParser:
         Kwargs:
             ...
         """
-        data = ''
-        with open(fileName, 'r') as file:
-            data = file.read()
-        return cls(data=data, **kwargs)
+        with open(fileName, 'r', encoding='utf-8', newline='') as file:
+            return cls(data=file, **kwargs)
 
     @classmethod
     def fromURL(cls, url, **kwargs):
@@ -126,97 +130,182 @@ class WorkCalendarParser:
         Kwargs:
             ...
         """
-        data = ''
-        with urllib.request.urlopen(url) as file:
-            data = file.read().decode('utf-8')
-        return cls(data=data, **kwargs)
+        with cls.open(url) as file:
+            return cls(data=file, **kwargs)
 
-    def _convertYear(self, year, months):
-        """Преобразует данные о днях в структуру вида
-        [{'date': dateObject, 'day_type': id},...]
+    @staticmethod
+    @contextmanager
+    def open(source):
+        """Открывает набор данных для построчного чтения.
+
+        Args:
+            source: путь к файлу или ссылка на файл
+                (в том числе file://)
+
+        Returns:
+            текстовый файловый объект
+        """
+        if '://' not in source:
+            # Передан путь к файлу
+            source = pathlib.Path(source).resolve().as_uri()
+
+        with urllib.request.urlopen(source) as response:
+            yield io.TextIOWrapper(response, encoding='utf-8', newline='')
+
+    def _iterYear(self, year, months):
+        """Возвращает дни года в виде (dateObject, day_type_id)
 
         Args:
             year - текущий год
             months - месяцы и дни в виде:
                {month: [day,...],...}
         """
-
-        result = []
+        day_types = self.day_types
 
         for month, days in months.items():
             for day in days:
-                day_type = None
+                value = day.strip()
+                # Отметка о типе дня - символы, кроме цифр, без повторов
+                # (у обычного дня без отметок - пустая строка)
+                mark = ''.join(dict.fromkeys(
+                    value.strip(string.digits + string.whitespace),
+                ))
+                day_type = day_types.get(mark) if value else None
+
+                if day_type is None:
+                    # Неизвестная отметка
+                    raise ValueError(_("Unknown day type: '{}'").format(day))
+
                 try:
-                    # Если обычный день, без отметок, получаем дату
-                    date = datetime.date(year, month, int(day))
-                    # Добавляем запись
-                    result.append({'date': date, 'day_type': self.day_types['']})
+                    # Убираем отметку и получаем дату
+                    date = datetime.date(
+                        year,
+                        month,
+                        int(value.strip(mark) if mark else value),
+                    )
                 except ValueError:
-                    # Проходим по известным типам дней
-                    for day_type_mark, day_type_id in self.day_types.items():
-                        if day_type_mark and day_type_mark in day:
-                            # Если присутстует отметка о типе дня
-                            try:
-                                # Убираем отметку и получаем дату
-                                date = datetime.date(
-                                    year,
-                                    month,
-                                    int(day.strip(day_type_mark)),
-                                )
-                            except ValueError:
-                                raise ValueError(
-                                    _("Invalid day format: '{}'").format(day)
-                                )
-
-                            # Добавляем запись
-                            result.append(
-                                {'date': date, 'day_type': day_type_id}
-                            )
-                            day_type = day_type_id
-                            break
-
-                    if day_type is None:
-                        # Неизвестная отметка
-                        raise ValueError(_("Unknown day type: '{}'").format(day))
+                    raise ValueError(
+                        _("Invalid day format: '{}'").format(day)
+                    )
 
-        return result
+                yield date, day_type
 
-    def _parser(self, data):
-        """Парсер набора данных в csv формате
-        возвращает структуру вида:
-        {year: [{date: dateObject, day_type: id},...],...}
+    def _convertYear(self, year, months):
+        """Преобразует данные о днях в структуру вида
+        [{'date': dateObject, 'day_type': id},...]
 
         Args:
-            data: набор данных в csv формате
+            year - текущий год
+            months - месяцы и дни в виде:
+               {month: [day,...],...}
         """
+        return [
+            {'date': date, 'day_type': day_type}
+            for date, day_type in self._iterYear(year, months)
+        ]
 
-        # Преобразуем csv в список из словарей где каждый элемент
-        # содержит данные одной строки из файла, а его ключи - поля csv
+    def _get_rows(self, data):
+        """Построчно читает набор данных в csv формате,
+        возвращает строки вида (year, {month: [day,...],...})
+
+        Args:
+            data: набор данных в csv формате (строка
+                или итерируемый объект со строками)
+        """
+        if isinstance(data, str):
+            data = data.splitlines()
+
+        # Каждая строка файла - словарь, ключи которого - поля csv
         try:
-            data = csv.DictReader(
-                data.splitlines(),
+            rows = csv.DictReader(
+                data,
                 delimiter=self.csv_config['cellDelimeter'],
                 quotechar=self.csv_config['quote'],
             )
-        except csv.Error as error:
-            raise csv.Error(_("CSV module exception: {error}").format(error))
-
-        # Преобразуем список в словарь требуемого вида
-        try:
-            data = {
-                int(row[self.year]):
-                self._convertYear(
+            for row in rows:
+                yield (
                     int(row[self.year]),
                     # {month: [day,...],...}
                     {index + 1: row[month].split(self.csv_config['valueDelimeter'])
                      for index, month in enumerate(self.months)},
                 )
-                for row in data
-            }
+        except csv.Error as error:
+            raise csv.Error(_("CSV module exception: {error}").format(
+                error=error,
+            ))
         except LookupError as error:
             raise LookupError(_("Invalid CSV format: {}").format(error))
 
-        return data
+    def _parser(self, data):
+        """Парсер набора данных в csv формате
+        возвращает структуру вида:
+        {year: [{date: dateObject, day_type: id},...],...}
+
+        Args:
+            data: набор данных в csv формате
+        """
+        return {
+            year: self._convertYear(year, months)
+            for year, months in self._get_rows(data)
+        }
+
+    def _convertRow(self, row):
+        """Преобразует строку вида (year, months)
+        в (year, [{'date': dateObject, 'day_type': id},...])
+        """
+        return row[0], self._convertYear(*row)
+
+    def iter_days(self, data, *, years=None, jobs=1):
+        """Построчно анализирует набор данных в csv формате,
+        не загружая его в память целиком. Возвращает
+        данные по годам в виде:
+        (year, [{date: dateObject, day_type: id},...])
+
+        Args:
+            data: набор данных в csv формате (строка
+                или итерируемый объект со строками)
+
+        Kwargs:
+            years: только дни определенных годов
+            jobs: колличество процессов для анализа годов
+        """
+        rows = self._get_rows(data)
+        if years:
+            rows = (row for row in rows if row[0] in years)
+
+        if jobs is None or jobs > 1:
+            jobs = jobs or os.cpu_count() or 1
+
+            # Годы анализируются параллельно, порядок сохраняется.
+            # Executor.map читает весь набор данных сразу, поэтому
+            # одновременно передается не более 2 * jobs годов
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = deque()
+                for row in rows:
+                    if len(futures) >= 2 * jobs:
+                        yield futures.popleft().result()
+                    futures.append(executor.submit(self._convertRow, row))
+
+                while futures:
+                    yield futures.popleft().result()
+        else:
+            yield from map(self._convertRow, rows)
+
+    def iter_dates(self, data, *, years=None):
+        """Построчно анализирует набор данных в csv формате,
+        не загружая его в память целиком. Возвращает дни
+        в виде (dateObject, day_type_id)
+
+        Args:
+            data: набор данных в csv формате (строка
+                или итерируемый объект со строками)
+
+        Kwargs:
+            years: только дни определенных годов
+        """
+        for year, months in self._get_rows(data):
+            if not years or year in years:
+                yield from self._iterYear(year, months)
 
     def get_days_list(self, year=None):
         """Возвращает список дней в формате
@@ -227,11 +316,11 @@ class WorkCalendarParser:
         """
         if not year:
             result = [
-                deepcopy(data)
+                dict(data)
                 for _, year_data in self.calendar.items()
                 for data in year_data
             ]
         else:
-            result = deepcopy(self.calendar.get(year, []))
+            result = [dict(data) for data in self.calendar.get(year, [])]
 
         return result
@@ -1,6 +1,5 @@
 import datetime
 
-from django.forms.models import model_to_dict
 from django.contrib import messages
 from django.utils.translation import ugettext_lazy as _
 from django.urls import reverse_lazy
@@ -19,6 +18,7 @@ from django_filters.views import FilterView
 from core.views import (
     ActionTableDeleteMixin,
     DeleteMessageMixin,
+    PaginatedTableMixin,
 )
 from core.logger import log
 
@@ -66,10 +66,10 @@ class DayTypeDelete(DeleteMessageMixin, DeleteView):
     success_url = reverse_lazy('workcal:daytype:list')
 
 
-class DayList(SingleTableMixin, ActionTableDeleteMixin, FilterView):
+class DayList(PaginatedTableMixin, SingleTableMixin, ActionTableDeleteMixin, FilterView):
     model = Day
     table_class = DayTable
-    table_pagination = False
+    table_lazy_pagination = True
     filterset_class = DayFilter
     template_name = 'workcal/day_list.html'
     action_table_model = Day
@@ -192,43 +192,31 @@ class CalendarUpload(FormView):
         return self.form_valid(form, data)
 
     def form_valid(self, form, data):
-        # Сущесвующие в базе дни
-        days_exists = list(Day.objects.filter(
-            date__year=form.cleaned_data['year'],
-        ).values_list('date', flat=True))
+        log.info("Starting import CSV...")
 
-        # Дни для добавления
-        days_raw = filter(
-            lambda x: x['date'] not in days_exists,
-            data,
-        )
+        # Добавляем дни одной транзакцией
+        created, updated, errors = Day.objects.bulk_import(data)
 
-        log.info("Starting import CSV...")
-        errors = False
-
-        for day_raw in days_raw:
-            # Добавляем дни, используя форму
-            day_form = DayForm(day_raw)
-            if day_form.is_valid():
-                day_form.save()
-            else:
-                errors = True
-                log.error("{}: {} ".format(
-                    model_to_dict(day_form.instance),
-                    day_form.errors.as_data(),
-                ))
+        for row, day, error in errors:
+            log.error("Row {}: {}: {}".format(row, day, error))
 
         if errors:
             log.error("CSV import finished with errors")
             messages.error(
                 self.request,
-                _("CSV import finished with errors (see more in logs)"),
+                _("CSV import finished with errors: {created} days added,"
+                  " {errors} rows rejected (see more in logs)").format(
+                      created=len(created),
+                      errors=len(errors),
+                  ),
             )
         else:
             log.info("CSV import finished without errors")
             messages.success(
                 self.request,
-                _("CSV import finished without errors"),
+                _("CSV import finished without errors: {created} days added").format(
+                    created=len(created),
+                ),
             )
 
         return super().form_valid(form)